@@ -1,11 +1,12 @@
 import logging
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from psycopg_pool import AsyncConnectionPool
 
 from emberlog_api.app.api.v1.routers.sse import publish_incident
 from emberlog_api.app.db.pool import get_pool
+from emberlog_api.app.db.replica import get_read_pool, remember_write
 from emberlog_api.app.db.repositories import incidents
 from emberlog_api.models.incident import (
     IncidentIn,
@@ -34,7 +35,7 @@ async def list_incidents(
     address_search: str | None = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
-    pool: AsyncConnectionPool = Depends(get_pool),
+    pool: AsyncConnectionPool = Depends(get_read_pool),
 ):
     limit = page_size
     offset = (page - 1) * page_size
@@ -54,8 +55,18 @@ async def list_incidents(
 
 
 @router.get("/{incident_id}", name="get_incident", response_model=IncidentOut)
-async def get_incident(incident_id: int, pool: AsyncConnectionPool = Depends(get_pool)):
-    resp = await incidents.select_incident(pool=pool, incident_id=incident_id)
+async def get_incident(
+    incident_id: int,
+    pool: AsyncConnectionPool = Depends(get_read_pool),
+    primary: AsyncConnectionPool = Depends(get_pool),
+):
+    try:
+        resp = await incidents.select_incident(pool=pool, incident_id=incident_id)
+    except ValueError:
+        if pool is primary:
+            raise
+        # not replicated yet, e.g. a client following the Location of a fresh POST
+        resp = await incidents.select_incident(pool=primary, incident_id=incident_id)
     return resp
 
 
@@ -66,9 +77,13 @@ async def get_incident(incident_id: int, pool: AsyncConnectionPool = Depends(get
     name="create_incident",
 )
 async def create_incident(
-    request: Request, payload: IncidentIn, pool: AsyncConnectionPool = Depends(get_pool)
+    request: Request,
+    response: Response,
+    payload: IncidentIn,
+    pool: AsyncConnectionPool = Depends(get_pool),
 ):
     resp = await incidents.insert_incident(pool=pool, payload=payload)
+    remember_write(request, response)
     resp_id = resp["id"]
     resp_created_at = resp["created_at"]
     location = request.url_for("get_incident", incident_id=resp_id)
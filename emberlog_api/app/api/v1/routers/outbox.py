@@ -0,0 +1,78 @@
+import logging
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from psycopg_pool import AsyncConnectionPool
+
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.pool import get_pool
+from emberlog_api.app.db.repositories import outbox as outbox_repo
+from emberlog_api.models.outbox import (
+    OutboxDeadListOut,
+    OutboxRequeueIn,
+    OutboxRequeueOut,
+)
+
+log = logging.getLogger("emberlog_api.v1.routers.outbox")
+
+router = APIRouter(prefix="/admin/outbox", tags=["admin"])
+
+
+@router.get("/dead", name="list_dead_outbox", response_model=OutboxDeadListOut)
+async def list_dead_outbox(
+    *,
+    event_type: str | None = Query(None),
+    error_search: str | None = Query(None),
+    from_created_at: datetime | None = Query(None),
+    to_created_at: datetime | None = Query(None),
+    include_payload: bool = Query(False),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    pool: AsyncConnectionPool = Depends(get_pool),
+):
+    items, total = await outbox_repo.list_dead_outbox(
+        pool=pool,
+        event_type=event_type,
+        error_search=error_search,
+        from_created_at=from_created_at,
+        to_created_at=to_created_at,
+        include_payload=include_payload,
+        limit=page_size,
+        offset=(page - 1) * page_size,
+    )
+    return OutboxDeadListOut(items=items, total=total, page=page, page_size=page_size)
+
+
+@router.post(
+    "/dead/requeue",
+    name="requeue_dead_outbox",
+    response_model=OutboxRequeueOut,
+)
+async def requeue_dead_outbox(
+    body: OutboxRequeueIn, pool: AsyncConnectionPool = Depends(get_pool)
+):
+    if body.limit > settings.outbox_replay_max_rows:
+        raise HTTPException(
+            status_code=422,
+            detail=f"limit must be <= {settings.outbox_replay_max_rows}",
+        )
+    rate_per_s = min(
+        body.rate_per_s or settings.outbox_replay_rate_per_s,
+        settings.outbox_replay_rate_per_s,
+    )
+    ids = await outbox_repo.requeue_dead_outbox(
+        pool=pool,
+        ids=body.ids,
+        event_type=body.event_type,
+        error_search=body.error_search,
+        from_created_at=body.from_created_at,
+        to_created_at=body.to_created_at,
+        limit=body.limit,
+        rate_per_s=rate_per_s,
+    )
+    spread_s = max(len(ids) - 1, 0) / rate_per_s
+    log.info(
+        "dead outbox rows requeued",
+        extra={"requeued": len(ids), "rate_per_s": rate_per_s, "spread_s": spread_s},
+    )
+    return OutboxRequeueOut(requeued=len(ids), ids=ids, spread_s=spread_s)
@@ -1,17 +1,34 @@
+import heapq
 import logging
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
+from typing import Any, Awaitable, Callable, Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from psycopg_pool import AsyncConnectionPool
 
-from emberlog_api.app.db.pool import get_pool
+from emberlog_api.app.core.http_cache import SnapshotValidator, snapshot_validator
+from emberlog_api.app.core.response_cache import CachedResponse, ResponseCache
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.replica import get_read_pool
+from emberlog_api.app.db.repositories import decode_history as history_repo
 from emberlog_api.app.db.repositories import traffic as traffic_repo
+from emberlog_api.app.services.decode_history import rollup_retention
+from emberlog_api.app.services.live_calls import (
+    group_from_sys_name,
+    normalize_live_calls,
+    to_iso_z,
+)
+from emberlog_api.app.services.talkgroup_catalog import talkgroup_catalog
+from emberlog_api.app.services.traffic_state import traffic_state
+from emberlog_api.utils import jsoncodec
 
 log = logging.getLogger("emberlog_api.v1.routers.traffic")
 
 router = APIRouter(prefix="/traffic", tags=["traffic"])
 
+response_cache = ResponseCache(max_entries=settings.traffic_response_cache_max_entries)
+
 
 class TrafficDecodeSiteOut(BaseModel):
     group: str
@@ -36,6 +53,10 @@ class TrafficSummaryOut(BaseModel):
     decode_sites: list[TrafficDecodeSiteOut]
 
 
+class TrafficSummariesOut(BaseModel):
+    instances: list[TrafficSummaryOut]
+
+
 class TrafficLiveCallOut(BaseModel):
     id: str
     started_at: str | None
@@ -62,18 +83,35 @@ class TrafficLiveCallOut(BaseModel):
 class TrafficLiveCallsOut(BaseModel):
     instance_id: str
     updated_at: str | None
+    total_count: int = 0  # calls matching the filters, before limit/offset
     calls: list[TrafficLiveCallOut]
 
 
-def _to_iso_z(value: datetime | None) -> str | None:
-    if value is None:
-        return None
-    dt = value.astimezone(UTC)
-    return dt.isoformat().replace("+00:00", "Z")
+class TrafficDecodeHistoryPointOut(BaseModel):
+    bucket_start: str
+    min_pct: float
+    avg_pct: float
+    max_pct: float
+    samples: int
+
+
+class TrafficDecodeHistorySeriesOut(BaseModel):
+    group: str
+    sys_num: int
+    sys_name: str
+    points: list[TrafficDecodeHistoryPointOut]
+
+
+class TrafficDecodeHistoryOut(BaseModel):
+    instance_id: str
+    resolution: str
+    from_recorded_at: str | None
+    to_recorded_at: str | None
+    series: list[TrafficDecodeHistorySeriesOut]
 
 
-def _group_from_sys_name(sys_name: str) -> str:
-    return sys_name.split("-", 1)[0] if sys_name else ""
+# most buckets a single series may return; "auto" picks the finest rollup under it
+MAX_HISTORY_POINTS = 1000
 
 
 def _decode_status(decode_rate_pct: float) -> str:
@@ -98,32 +136,106 @@ def _parse_sys_name_filter(values: list[str] | None) -> set[str] | None:
     return normalized or None
 
 
-@router.get("/summary", response_model=TrafficSummaryOut)
-async def get_traffic_summary(
-    *,
-    instance_id: str = Query("trunk-recorder"),
-    pool: AsyncConnectionPool = Depends(get_pool),
-) -> TrafficSummaryOut:
-    try:
-        decode_rows = await traffic_repo.list_decode_rate_latest(
-            pool=pool,
-            instance_id=instance_id,
-        )
-        recorders_row = await traffic_repo.select_recorders_snapshot_latest(
-            pool=pool,
-            instance_id=instance_id,
-        )
-        calls_row = await traffic_repo.select_calls_active_snapshot_latest(
-            pool=pool,
-            instance_id=instance_id,
-        )
-    except Exception:
-        log.exception(
-            "failed to read traffic summary data",
-            extra={"instance_id": instance_id, "endpoint": "traffic.summary"},
-        )
-        raise
+def _pick_history_resolution(from_at: datetime, to_at: datetime, now: datetime) -> str:
+    span = to_at - from_at
+    retention = rollup_retention()
+    for resolution, (_table, width) in history_repo.ROLLUPS.items():
+        if span / width <= MAX_HISTORY_POINTS and from_at >= now - retention[resolution]:
+            return resolution
+    return "1h"
+
+
+LiveCallSort = Literal["started_at", "elapsed", "sys_name", "talkgroup"]
 
+_LIVE_CALL_SORT_KEYS = {
+    "started_at": lambda c: (
+        c["started_at_epoch"] is not None,
+        c["started_at_epoch"] if c["started_at_epoch"] is not None else float(c["elapsed_s"]),
+    ),
+    "elapsed": lambda c: c["elapsed_s"],
+    "sys_name": lambda c: (c["sys_name"], c["talkgroup_id"] or 0),
+    "talkgroup": lambda c: ((c["talkgroup"] or "").lower(), c["talkgroup_id"] or 0),
+}
+_LIVE_CALL_DEFAULT_ORDER = {
+    "started_at": "desc",
+    "elapsed": "desc",
+    "sys_name": "asc",
+    "talkgroup": "asc",
+}
+
+
+def _page_live_calls(
+    calls: list[dict[str, Any]],
+    sort: LiveCallSort | None,
+    order: Literal["asc", "desc"] | None,
+    limit: int | None,
+    offset: int,
+) -> list[dict[str, Any]]:
+    """Sort and slice the filtered calls; top-k selection when a limit is set."""
+    if sort is None or (sort == "started_at" and order in (None, "desc")):
+        # ingest already stored them newest first
+        return calls[offset : offset + limit] if limit is not None else calls[offset:]
+
+    key = _LIVE_CALL_SORT_KEYS[sort]
+    descending = (order or _LIVE_CALL_DEFAULT_ORDER[sort]) == "desc"
+    if limit is None:
+        return sorted(calls, key=key, reverse=descending)[offset:]
+
+    # O(n log k) instead of sorting every call a wallboard will never show
+    k = offset + limit
+    top = heapq.nlargest(k, calls, key=key) if descending else heapq.nsmallest(k, calls, key=key)
+    return top[offset:]
+
+
+def _normalize_legacy_snapshot(
+    instance_id: str, calls_json: Any
+) -> list[dict[str, Any]] | None:
+    if not isinstance(calls_json, dict):
+        reason = "calls_json_not_object"
+    elif not isinstance(calls_json.get("calls"), list):
+        reason = "calls_not_list"
+    else:
+        return normalize_live_calls(calls_json["calls"])
+
+    log.error(
+        "live calls snapshot payload is malformed",
+        extra={
+            "instance_id": instance_id,
+            "endpoint": "traffic.live_calls",
+            "reason": reason,
+        },
+    )
+    return None
+
+
+# (decode rows, recorders row, calls row) of one instance
+_TrafficRows = tuple[list[dict[str, Any]], dict[str, Any] | None, dict[str, Any] | None]
+
+
+async def _read_traffic_rows(pool: AsyncConnectionPool, instance_id: str) -> _TrafficRows:
+    """Decode rows, recorders row and calls row for one instance.
+
+    Served from the in-memory traffic state when enabled, else straight from Postgres.
+    """
+    if settings.traffic_state_enabled:
+        state = await traffic_state.get(pool, instance_id)
+        if state is None:
+            return [], None, None
+        return list(state.decode_rows.values()), state.recorders_row, state.calls_row
+
+    # one checkout and one round trip, so pool waits are paid once
+    return await traffic_repo.select_traffic_summary_latest(
+        pool=pool,
+        instance_id=instance_id,
+    )
+
+
+def _build_summary(
+    instance_id: str,
+    decode_rows: list[dict[str, Any]],
+    recorders_row: dict[str, Any] | None,
+    calls_row: dict[str, Any] | None,
+) -> TrafficSummaryOut:
     log.debug(
         "traffic summary source snapshot",
         extra={
@@ -147,7 +259,7 @@ async def get_traffic_summary(
         control_channel_hz = row.get("control_channel_hz")
         decode_sites.append(
             TrafficDecodeSiteOut(
-                group=_group_from_sys_name(sys_name),
+                group=group_from_sys_name(sys_name),
                 sys_num=int(row["sys_num"]),
                 sys_name=sys_name,
                 decode_rate_pct=decode_rate_pct,
@@ -161,7 +273,7 @@ async def get_traffic_summary(
                     if row.get("decoderate_interval_s") is not None
                     else None
                 ),
-                updated_at=_to_iso_z(updated_at)
+                updated_at=to_iso_z(updated_at)
                 if isinstance(updated_at, datetime)
                 else None,
                 status=_decode_status(decode_rate_pct),
@@ -197,58 +309,207 @@ async def get_traffic_summary(
 
     last_seen_at = max(seen_times) if seen_times else None
 
-    response = TrafficSummaryOut(
+    return TrafficSummaryOut(
         instance_id=instance_id,
-        last_seen_at=_to_iso_z(last_seen_at),
+        last_seen_at=to_iso_z(last_seen_at),
         active_calls_count=active_calls_count,
         recorders_total=recorders_total,
         recorders_recording=recorders_recording,
         recorders_idle=recorders_idle,
         recorders_available=recorders_available,
-        recorders_updated_at=_to_iso_z(recorders_updated_at),
+        recorders_updated_at=to_iso_z(recorders_updated_at),
         decode_sites=decode_sites,
     )
-    log.info(
-        "traffic summary served",
-        extra={
-            "instance_id": instance_id,
-            "decode_sites_count": len(response.decode_sites),
-            "active_calls_count": response.active_calls_count,
-            "recorders_total": response.recorders_total,
-            "last_seen_at": response.last_seen_at,
-        },
+
+
+async def _read_traffic_rows_many(
+    pool: AsyncConnectionPool, instance_ids: list[str] | None
+) -> dict[str, _TrafficRows]:
+    """Like `_read_traffic_rows` for many instances (None = all) in one round trip."""
+    if settings.traffic_state_enabled:
+        states = await traffic_state.get_many(pool, instance_ids)
+        return {
+            iid: (list(state.decode_rows.values()), state.recorders_row, state.calls_row)
+            for iid, state in states.items()
+        }
+
+    decode_rows, recorders_rows, calls_rows = await traffic_repo.select_traffic_latest(
+        pool, instance_ids=instance_ids, include_calls=False
     )
-    return response
+    by_instance: dict[str, _TrafficRows] = {}
+    for row in decode_rows:
+        by_instance.setdefault(row["instance_id"], ([], None, None))[0].append(row)
+    for row in recorders_rows:
+        decode, _, calls = by_instance.get(row["instance_id"], ([], None, None))
+        by_instance[row["instance_id"]] = (decode, row, calls)
+    for row in calls_rows:
+        decode, recorders, _ = by_instance.get(row["instance_id"], ([], None, None))
+        by_instance[row["instance_id"]] = (decode, recorders, row)
+    return by_instance
+
+
+def _rows_timestamps(rows: _TrafficRows) -> list[datetime | None]:
+    decode_rows, recorders_row, calls_row = rows
+    timestamps = [row.get("updated_at") for row in decode_rows]
+    timestamps.append(recorders_row.get("updated_at") if recorders_row else None)
+    timestamps.append(calls_row.get("updated_at") if calls_row else None)
+    return timestamps
+
+
+def _summary_validator(rows_by_instance: dict[str, _TrafficRows]) -> SnapshotValidator:
+    parts: list[object] = []
+    timestamps: list[datetime | None] = []
+    for iid in sorted(rows_by_instance):
+        instance_timestamps = _rows_timestamps(rows_by_instance[iid])
+        # the per-instance timestamp count keeps rows from shifting between instances
+        parts.extend((iid, len(instance_timestamps)))
+        timestamps.extend(instance_timestamps)
+    return snapshot_validator(("summary", *parts), timestamps)
+
+
+def _parse_instance_ids(value: str) -> list[str] | None:
+    """``a,b,c`` -> ids in request order; ``*`` -> None (every instance)."""
+    if value.strip() == "*":
+        return None
+    ids: list[str] = []
+    for item in value.split(","):
+        stripped = item.strip()
+        if stripped and stripped not in ids:
+            ids.append(stripped)
+    return ids
+
+
+def _encode(model: BaseModel) -> bytes:
+    return jsoncodec.dumps(model.model_dump(mode="json"))
+
+
+async def _cached(
+    pool: AsyncConnectionPool,
+    request: Request,
+    key: tuple[Any, ...],
+    instance_ids: list[str] | None,
+    read: Callable[[], Awaitable[CachedResponse]],
+) -> Response:
+    """Serve ``key`` from the response cache (304 when the client is current).
+
+    ``read`` fetches the snapshot rows and returns their validator with a deferred
+    render, so even without a cache entry a current client gets its 304 before
+    anything is normalized or encoded. Entries are invalidated by changes to
+    ``instance_ids`` only (None = any instance).
+    """
+    if not settings.traffic_response_cache_enabled:
+        cached = await read()
+    else:
+        # only the state store knows when snapshots change; without it just coalesce
+        version = (
+            await traffic_state.current_version(pool, instance_ids)
+            if settings.traffic_state_enabled
+            else None
+        )
+        cached = await response_cache.get_or_build(key, version, read)
+    return cached.to_response(request, settings.traffic_cache_max_age_s)
 
 
-@router.get("/live-calls", response_model=TrafficLiveCallsOut)
-async def get_traffic_live_calls(
+@router.get("/summary", response_model=TrafficSummaryOut | TrafficSummariesOut)
+async def get_traffic_summary(
     *,
-    instance_id: str = Query("trunk-recorder"),
-    sys_name: list[str] | None = Query(
-        None,
-        description="Optional sys_name filters; supports repeated params and comma-separated values.",
+    instance_id: str = Query(
+        "trunk-recorder",
+        description="One instance, a comma-separated list, or * for every instance.",
     ),
-    q: str | None = Query(None),
-    hide_encrypted: bool = Query(False),
-    pool: AsyncConnectionPool = Depends(get_pool),
-) -> TrafficLiveCallsOut:
-    q_present = bool(q)
-    try:
-        snapshot_row = await traffic_repo.select_calls_active_snapshot_latest(
-            pool=pool,
-            instance_id=instance_id,
+    request: Request,
+    pool: AsyncConnectionPool = Depends(get_read_pool),
+) -> Response:
+    if instance_id.strip() == "*" or "," in instance_id:
+        instance_ids = _parse_instance_ids(instance_id)
+        return await _cached(
+            pool,
+            request,
+            ("summary", tuple(instance_ids) if instance_ids is not None else "*"),
+            instance_ids,
+            lambda: _read_traffic_summaries(pool, instance_ids),
         )
+
+    async def read() -> CachedResponse:
+        try:
+            rows = await _read_traffic_rows(pool, instance_id)
+        except Exception:
+            log.exception(
+                "failed to read traffic summary data",
+                extra={"instance_id": instance_id, "endpoint": "traffic.summary"},
+            )
+            raise
+
+        def render() -> bytes:
+            summary = _build_summary(instance_id, *rows)
+            log.info(
+                "traffic summary built",
+                extra={
+                    "instance_id": instance_id,
+                    "decode_sites_count": len(summary.decode_sites),
+                    "active_calls_count": summary.active_calls_count,
+                    "recorders_total": summary.recorders_total,
+                    "last_seen_at": summary.last_seen_at,
+                },
+            )
+            return _encode(summary)
+
+        return CachedResponse(_summary_validator({instance_id: rows}), render)
+
+    return await _cached(pool, request, ("summary", instance_id), [instance_id], read)
+
+
+async def _read_traffic_summaries(
+    pool: AsyncConnectionPool, instance_ids: list[str] | None
+) -> CachedResponse:
+    try:
+        rows_by_instance = await _read_traffic_rows_many(pool, instance_ids)
     except Exception:
         log.exception(
-            "failed to read live calls snapshot",
-            extra={"instance_id": instance_id, "endpoint": "traffic.live_calls"},
+            "failed to read traffic summary data",
+            extra={"instance_ids": instance_ids, "endpoint": "traffic.summary"},
         )
         raise
 
+    # explicitly requested instances are always listed, like the single-instance form
+    ordered_ids = instance_ids if instance_ids is not None else sorted(rows_by_instance)
+    rows_by_instance = {
+        iid: rows_by_instance.get(iid, ([], None, None)) for iid in ordered_ids
+    }
+
+    def render() -> bytes:
+        summaries = TrafficSummariesOut(
+            instances=[_build_summary(iid, *rows_by_instance[iid]) for iid in ordered_ids]
+        )
+        log.info(
+            "traffic summaries built",
+            extra={
+                "instance_ids": ordered_ids,
+                "instances_count": len(summaries.instances),
+            },
+        )
+        return _encode(summaries)
+
+    return CachedResponse(_summary_validator(rows_by_instance), render)
+
+
+def _build_live_calls(
+    instance_id: str,
+    snapshot_row: dict[str, Any] | None,
+    *,
+    sys_name_filter: set[str] | None,
+    q_match: Callable[[dict[str, Any]], bool] | None,
+    hide_encrypted: bool,
+    emergency_only: bool,
+    sort: LiveCallSort | None,
+    order: Literal["asc", "desc"] | None,
+    limit: int | None,
+    offset: int,
+) -> TrafficLiveCallsOut:
+    q_present = q_match is not None
     if snapshot_row is None:
         log.info(
-            "traffic live-calls served",
+            "traffic live-calls built",
             extra={
                 "instance_id": instance_id,
                 "returned_calls_count": 0,
@@ -260,39 +521,17 @@ async def get_traffic_live_calls(
         return TrafficLiveCallsOut(instance_id=instance_id, updated_at=None, calls=[])
 
     updated_at = snapshot_row.get("updated_at")
-    calls_json = snapshot_row.get("calls_json")
-    if not isinstance(calls_json, dict):
-        log.error(
-            "live calls snapshot payload is malformed",
-            extra={
-                "instance_id": instance_id,
-                "endpoint": "traffic.live_calls",
-                "reason": "calls_json_not_object",
-            },
-        )
-        return TrafficLiveCallsOut(
-            instance_id=instance_id,
-            updated_at=_to_iso_z(updated_at) if isinstance(updated_at, datetime) else None,
-            calls=[],
-        )
-
-    calls = calls_json.get("calls")
+    calls = snapshot_row.get("calls_normalized_json")
     if not isinstance(calls, list):
-        log.error(
-            "live calls snapshot payload is malformed",
-            extra={
-                "instance_id": instance_id,
-                "endpoint": "traffic.live_calls",
-                "reason": "calls_not_list",
-            },
-        )
-        return TrafficLiveCallsOut(
-            instance_id=instance_id,
-            updated_at=_to_iso_z(updated_at) if isinstance(updated_at, datetime) else None,
-            calls=[],
-        )
+        # snapshot written before calls were normalized at ingest
+        calls = _normalize_legacy_snapshot(instance_id, snapshot_row.get("calls_json"))
+        if calls is None:
+            return TrafficLiveCallsOut(
+                instance_id=instance_id,
+                updated_at=to_iso_z(updated_at) if isinstance(updated_at, datetime) else None,
+                calls=[],
+            )
 
-    sys_name_filter = _parse_sys_name_filter(sys_name)
     log.debug(
         "parsed live-calls filters",
         extra={
@@ -303,123 +542,32 @@ async def get_traffic_live_calls(
             "hide_encrypted": hide_encrypted,
         },
     )
-    q_lower = q.lower() if q else None
 
     input_calls_count = len(calls)
     after_sys_name_count = 0
     after_q_count = 0
     after_hide_encrypted_count = 0
-    normalized_calls: list[tuple[float | None, int, TrafficLiveCallOut]] = []
+    # records are already normalized and sorted newest first; only filter here
+    filtered_calls: list[dict[str, Any]] = []
     for call in calls:
-        if not isinstance(call, dict):
-            continue
-
-        call_sys_name = str(call.get("sys_name") or "")
-
-        if sys_name_filter and call_sys_name not in sys_name_filter:
+        if sys_name_filter and call["sys_name"] not in sys_name_filter:
             continue
         after_sys_name_count += 1
 
-        encrypted = bool(call.get("encrypted", False))
-        if hide_encrypted and encrypted:
+        if hide_encrypted and call["encrypted"]:
             continue
         after_hide_encrypted_count += 1
 
-        alpha_tag = str(call.get("talkgroup_alpha_tag") or "")
-        description = str(call.get("talkgroup_description") or "")
-        if q_lower and q_lower not in alpha_tag.lower() and q_lower not in description.lower():
+        if emergency_only and not call["emergency"]:
             continue
-        after_q_count += 1
-
-        start_epoch_raw = call.get("start_time")
-        started_at_dt: datetime | None = None
-        started_at_epoch: float | None = None
-        if start_epoch_raw is not None:
-            try:
-                started_at_epoch = float(start_epoch_raw)
-                started_at_dt = datetime.fromtimestamp(started_at_epoch, tz=UTC)
-            except (TypeError, ValueError, OSError):
-                started_at_epoch = None
-                started_at_dt = None
-
-        elapsed_raw = call.get("elapsed")
-        try:
-            elapsed_s = int(elapsed_raw) if elapsed_raw is not None else 0
-        except (TypeError, ValueError):
-            elapsed_s = 0
-
-        src_num_raw = call.get("src_num")
-        rec_num_raw = call.get("rec_num")
-        try:
-            src_num = int(src_num_raw) if src_num_raw is not None else None
-        except (TypeError, ValueError):
-            src_num = None
-        try:
-            rec_num = int(rec_num_raw) if rec_num_raw is not None else None
-        except (TypeError, ValueError):
-            rec_num = None
-
-        freq_raw = call.get("freq")
-        try:
-            freq_mhz = float(freq_raw) / 1_000_000.0 if freq_raw is not None else None
-        except (TypeError, ValueError):
-            freq_mhz = None
 
-        try:
-            sys_num = int(call["sys_num"]) if call.get("sys_num") is not None else None
-        except (TypeError, ValueError):
-            sys_num = None
-
-        talkgroup_raw = call.get("talkgroup")
-        try:
-            talkgroup_id = int(talkgroup_raw) if talkgroup_raw is not None else None
-        except (TypeError, ValueError):
-            talkgroup_id = None
+        if q_match is not None and not q_match(call):
+            continue
+        after_q_count += 1
 
-        unit_raw = call.get("unit")
-        try:
-            unit = int(unit_raw) if unit_raw is not None else None
-        except (TypeError, ValueError):
-            unit = None
-
-        tdma_slot_raw = call.get("tdma_slot")
-        try:
-            tdma_slot = int(tdma_slot_raw) if tdma_slot_raw is not None else None
-        except (TypeError, ValueError):
-            tdma_slot = None
-
-        normalized = TrafficLiveCallOut(
-            id=str(call.get("id") or ""),
-            started_at=_to_iso_z(started_at_dt),
-            elapsed_s=elapsed_s,
-            sys_num=sys_num,
-            sys_name=call_sys_name,
-            group=_group_from_sys_name(call_sys_name),
-            talkgroup_id=talkgroup_id,
-            talkgroup=(str(call.get("talkgroup_alpha_tag")) if call.get("talkgroup_alpha_tag") is not None else None),
-            description=(str(call.get("talkgroup_description")) if call.get("talkgroup_description") is not None else None),
-            category=(str(call.get("talkgroup_group")) if call.get("talkgroup_group") is not None else None),
-            tag=(str(call.get("talkgroup_tag")) if call.get("talkgroup_tag") is not None else None),
-            freq_mhz=freq_mhz,
-            encrypted=encrypted,
-            emergency=bool(call.get("emergency", False)),
-            phase2_tdma=bool(call.get("phase2_tdma", False)),
-            tdma_slot=tdma_slot,
-            unit=unit,
-            src_num=src_num,
-            rec_num=rec_num,
-            recorder_id=(f"{src_num}_{rec_num}" if src_num is not None and rec_num is not None else None),
-        )
-        normalized_calls.append((started_at_epoch, elapsed_s, normalized))
-
-    normalized_calls.sort(
-        key=lambda item: (
-            item[0] is not None,
-            item[0] if item[0] is not None else float(item[1]),
-        ),
-        reverse=True,
-    )
+        filtered_calls.append(call)
 
+    page = _page_live_calls(filtered_calls, sort, order, limit, offset)
     log.debug(
         "live-calls filtering complete",
         extra={
@@ -428,23 +576,207 @@ async def get_traffic_live_calls(
             "after_sys_name_count": after_sys_name_count,
             "after_q_count": after_q_count,
             "after_hide_encrypted_count": after_hide_encrypted_count,
-            "returned_calls_count": len(normalized_calls),
-            "sort_mode": "started_at_desc_else_elapsed_desc",
+            "matched_calls_count": len(filtered_calls),
+            "returned_calls_count": len(page),
+            "sort": sort or "started_at",
+            "order": order,
+            "limit": limit,
+            "offset": offset,
         },
     )
-    response = TrafficLiveCallsOut(
+    live_calls = TrafficLiveCallsOut(
         instance_id=instance_id,
-        updated_at=_to_iso_z(updated_at) if isinstance(updated_at, datetime) else None,
-        calls=[item[2] for item in normalized_calls],
+        updated_at=to_iso_z(updated_at) if isinstance(updated_at, datetime) else None,
+        total_count=len(filtered_calls),
+        calls=page,
     )
     log.info(
-        "traffic live-calls served",
+        "traffic live-calls built",
         extra={
             "instance_id": instance_id,
-            "returned_calls_count": len(response.calls),
+            "returned_calls_count": len(live_calls.calls),
             "hide_encrypted": hide_encrypted,
+            "emergency_only": emergency_only,
             "q_present": q_present,
             "sys_name_filter_count": len(sys_name_filter) if sys_name_filter else 0,
         },
     )
+    return live_calls
+
+
+@router.get("/live-calls", response_model=TrafficLiveCallsOut)
+async def get_traffic_live_calls(
+    *,
+    instance_id: str = Query("trunk-recorder"),
+    sys_name: list[str] | None = Query(
+        None,
+        description="Optional sys_name filters; supports repeated params and comma-separated values.",
+    ),
+    q: str | None = Query(None),
+    hide_encrypted: bool = Query(False),
+    emergency_only: bool = Query(False),
+    sort: LiveCallSort | None = Query(
+        None, description="Default: started_at, newest first (elapsed when unknown)."
+    ),
+    order: Literal["asc", "desc"] | None = Query(
+        None, description="Default: desc for started_at/elapsed, asc for sys_name/talkgroup."
+    ),
+    limit: int | None = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    request: Request,
+    pool: AsyncConnectionPool = Depends(get_read_pool),
+) -> Response:
+    sys_name_filter = _parse_sys_name_filter(sys_name)
+    q_lower = q.lower() if q else None
+    parts = (
+        "live-calls",
+        instance_id,
+        tuple(sorted(sys_name_filter)) if sys_name_filter else (),
+        q_lower,
+        hide_encrypted,
+        emergency_only,
+        sort,
+        order,
+        limit,
+        offset,
+    )
+
+    async def read() -> CachedResponse:
+        try:
+            if settings.traffic_state_enabled:
+                state = await traffic_state.get(pool, instance_id)
+                snapshot_row = state.calls_row if state is not None else None
+            else:
+                snapshot_row = await traffic_repo.select_calls_active_snapshot_latest(
+                    pool=pool,
+                    instance_id=instance_id,
+                )
+        except Exception:
+            log.exception(
+                "failed to read live calls snapshot",
+                extra={"instance_id": instance_id, "endpoint": "traffic.live_calls"},
+            )
+            raise
+
+        q_match = None
+        if q_lower:
+            if settings.talkgroup_catalog_enabled:
+                await talkgroup_catalog.refresh(pool)
+            # resolves q against the catalog once; per call it is a lookup
+            q_match = talkgroup_catalog.matcher(instance_id, q_lower)
+
+        def render() -> bytes:
+            return _encode(
+                _build_live_calls(
+                    instance_id,
+                    snapshot_row,
+                    sys_name_filter=sys_name_filter,
+                    q_match=q_match,
+                    hide_encrypted=hide_encrypted,
+                    emergency_only=emergency_only,
+                    sort=sort,
+                    order=order,
+                    limit=limit,
+                    offset=offset,
+                )
+            )
+
+        validator = snapshot_validator(
+            parts, [snapshot_row.get("updated_at") if snapshot_row else None]
+        )
+        return CachedResponse(validator, render)
+
+    return await _cached(pool, request, parts, [instance_id], read)
+
+
+@router.get("/decode-history", response_model=TrafficDecodeHistoryOut)
+async def get_traffic_decode_history(
+    *,
+    instance_id: str = Query("trunk-recorder"),
+    sys_name: list[str] | None = Query(
+        None,
+        description="Optional sys_name filters; supports repeated params and comma-separated values.",
+    ),
+    from_recorded_at: datetime | None = Query(None, description="Defaults to 24h before to_recorded_at."),
+    to_recorded_at: datetime | None = Query(None, description="Defaults to now."),
+    resolution: Literal["auto", "1m", "5m", "1h"] = Query("auto"),
+    pool: AsyncConnectionPool = Depends(get_read_pool),
+) -> TrafficDecodeHistoryOut:
+    now = datetime.now(UTC)
+    to_at = to_recorded_at or now
+    from_at = from_recorded_at or to_at - timedelta(hours=24)
+    if to_at.tzinfo is None:
+        to_at = to_at.replace(tzinfo=UTC)
+    if from_at.tzinfo is None:
+        from_at = from_at.replace(tzinfo=UTC)
+    if from_at >= to_at:
+        raise HTTPException(
+            status_code=422, detail="from_recorded_at must be before to_recorded_at"
+        )
+
+    if resolution == "auto":
+        resolution = _pick_history_resolution(from_at, to_at, now)
+    # auto falls back to the coarsest rollup, which may still be too many points
+    if (to_at - from_at) / history_repo.ROLLUPS[resolution][1] > MAX_HISTORY_POINTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"range exceeds {MAX_HISTORY_POINTS} points at resolution {resolution}",
+        )
+
+    sys_name_filter = _parse_sys_name_filter(sys_name)
+    try:
+        rows = await history_repo.list_decode_rollup(
+            pool,
+            instance_id=instance_id,
+            resolution=resolution,
+            from_at=from_at,
+            to_at=to_at,
+            sys_names=sorted(sys_name_filter) if sys_name_filter else None,
+        )
+    except Exception:
+        log.exception(
+            "failed to read decode history",
+            extra={"instance_id": instance_id, "endpoint": "traffic.decode_history"},
+        )
+        raise
+
+    # rows arrive ordered by sys_num, bucket_start
+    series: dict[int, TrafficDecodeHistorySeriesOut] = {}
+    for row in rows:
+        sys_num = int(row["sys_num"])
+        entry = series.get(sys_num)
+        if entry is None:
+            row_sys_name = str(row["sys_name"])
+            entry = series[sys_num] = TrafficDecodeHistorySeriesOut(
+                group=group_from_sys_name(row_sys_name),
+                sys_num=sys_num,
+                sys_name=row_sys_name,
+                points=[],
+            )
+        entry.points.append(
+            TrafficDecodeHistoryPointOut(
+                bucket_start=to_iso_z(row["bucket_start"]),
+                min_pct=float(row["min_pct"]),
+                avg_pct=float(row["avg_pct"]),
+                max_pct=float(row["max_pct"]),
+                samples=int(row["sample_count"]),
+            )
+        )
+
+    response = TrafficDecodeHistoryOut(
+        instance_id=instance_id,
+        resolution=resolution,
+        from_recorded_at=to_iso_z(from_at),
+        to_recorded_at=to_iso_z(to_at),
+        series=sorted(series.values(), key=lambda item: (item.group, item.sys_name)),
+    )
+    log.info(
+        "traffic decode-history served",
+        extra={
+            "instance_id": instance_id,
+            "resolution": resolution,
+            "series_count": len(response.series),
+            "points_count": len(rows),
+        },
+    )
     return response
@@ -0,0 +1,115 @@
+"""
+Background services: the outbox drain, the MQTT consumer and decode history upkeep.
+
+Started by the API lifespan (unless RUN_BACKGROUND_WORKERS=false) or by the
+standalone worker in ``emberlog_api.app.worker``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+from emberlog_api.app.core.leader import run_as_leader
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.pool import Pools
+from emberlog_api.app.notifier.drain.drain import (
+    OutboxDrain,
+    OutboxDrainConfig,
+    RoutePolicy,
+    Router,
+)
+from emberlog_api.app.notifier.notifier import NotifierClient
+from emberlog_api.app.services.decode_history import run_decode_history_maintenance
+from emberlog_api.app.services.mqtt_consumer import start_mqtt_consumer
+
+log = logging.getLogger("emberlog_api.core.background")
+
+
+class BackgroundServices:
+    # MQTT writes use the "ingest" pool; the drain and maintenance jobs use "background"
+    POOL_NAMES = ("ingest", "background")
+
+    def __init__(self, pools: Pools):
+        self.pools = pools
+        self.notifier: Optional[NotifierClient] = None
+        self.drain: Optional[OutboxDrain] = None
+        self.mqtt_task: Optional[asyncio.Task] = None
+        self.history_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        nc = NotifierClient()
+        self.notifier = nc
+
+        # map event types -> handlers
+        router = Router(
+            {
+                "incident.created": nc.on_new_incident,
+                # add more handlers here when ready
+            },
+            policies={
+                "incident.created": RoutePolicy(
+                    max_concurrency=settings.notifier_max_concurrency,
+                    rate_per_s=settings.notifier_rate_per_s,
+                    burst=settings.notifier_rate_burst,
+                    failure_threshold=settings.notifier_breaker_failure_threshold,
+                    reset_timeout_s=settings.notifier_breaker_reset_s,
+                ),
+            },
+            batch_routes=(
+                {"incident.created": nc.on_new_incidents}
+                if settings.notifier_batch_enabled
+                else None
+            ),
+        )
+
+        # the drain is safe to run in every process (FOR UPDATE SKIP LOCKED)
+        drain_config = OutboxDrainConfig(
+            pool=self.pools["background"],
+            batch_size=settings.outbox_batch_size,
+            max_concurrency=settings.outbox_max_concurrency,
+        )
+        self.drain = OutboxDrain(cfg=drain_config, router=router)
+        await self.drain.start()
+
+        # the consumer writes latest-only snapshots: one process is enough,
+        # unless a shared subscription splits the messages across replicas
+        if settings.mqtt_leader_election and not settings.mqtt_shared_group:
+            self.mqtt_task = asyncio.create_task(
+                run_as_leader(
+                    "mqtt_consumer",
+                    lambda: start_mqtt_consumer(self.pools["ingest"]),
+                    dsn=settings.database_url,
+                    retry_interval_s=settings.leader_retry_interval_s,
+                )
+            )
+        else:
+            self.mqtt_task = asyncio.create_task(
+                start_mqtt_consumer(self.pools["ingest"])
+            )
+
+        # partition DDL and retention deletes: one process at a time
+        if settings.decode_history_enabled:
+            self.history_task = asyncio.create_task(
+                run_as_leader(
+                    "decode_history_maintenance",
+                    lambda: run_decode_history_maintenance(self.pools["background"]),
+                    dsn=settings.database_url,
+                    retry_interval_s=settings.leader_retry_interval_s,
+                )
+            )
+
+    async def stop(self) -> None:
+        # stop producers first, then the drain, then the notifier transport
+        for task in (self.mqtt_task, self.history_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self.drain:
+            await self.drain.stop()
+        if self.notifier:
+            await self.notifier.close()
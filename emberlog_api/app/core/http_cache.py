@@ -0,0 +1,61 @@
+"""
+HTTP validators for snapshot-backed endpoints: ETag, Last-Modified and 304s.
+
+Endpoints derive a validator from the snapshot timestamps and their normalized
+filters *before* building a body, so an unchanged poll costs a lookup and a
+hash, not a serialization.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+class SnapshotValidator:
+    def __init__(self, parts: tuple[object, ...], last_modified: datetime | None):
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+        # weak: equal validators mean equivalent JSON, not byte-identical encodings
+        self.etag = f'W/"{digest}"'
+        self.last_modified = last_modified
+
+    def headers(self, max_age_s: int) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": f"max-age={max_age_s}"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """True when the client's cached copy is still current (RFC 9110 13.2.2)."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag.removeprefix("W/") in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        # HTTP dates have second precision
+        return self.last_modified.replace(microsecond=0) <= since
+
+    def not_modified(self, max_age_s: int) -> Response:
+        return Response(status_code=304, headers=self.headers(max_age_s))
+
+
+def snapshot_validator(
+    parts: tuple[object, ...], timestamps: list[datetime | None]
+) -> SnapshotValidator:
+    """Validator over ``parts`` (instance, filters, ...) and the snapshot timestamps."""
+    seen = [ts for ts in timestamps if isinstance(ts, datetime)]
+    return SnapshotValidator(
+        parts + tuple(ts.isoformat() for ts in seen), max(seen) if seen else None
+    )
@@ -0,0 +1,90 @@
+"""
+Leader election for singleton background jobs, using Postgres advisory locks.
+
+Each job holds a session-level advisory lock on a dedicated connection (not a
+pool connection, since the lock lives and dies with the session). Whoever gets
+the lock runs the job; the others retry. If the lock connection is lost the job
+is cancelled, because another process may already have taken over.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from typing import Awaitable, Callable
+
+import psycopg
+
+from emberlog_api.app.core.metrics import Gauge
+
+log = logging.getLogger("emberlog_api.core.leader")
+
+LEADER = Gauge(
+    "emberlog_leader", "1 while this process holds the job's advisory lock", ["job"]
+)
+
+
+def advisory_lock_key(name: str) -> int:
+    """Stable signed 64-bit key for pg_advisory_lock, derived from the job name."""
+    digest = hashlib.blake2b(f"emberlog:{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+async def run_as_leader(
+    name: str,
+    job: Callable[[], Awaitable[None]],
+    *,
+    dsn: str,
+    retry_interval_s: float = 10.0,
+    check_interval_s: float = 5.0,
+) -> None:
+    """Run ``job`` only while holding the advisory lock for ``name``; loops until cancelled."""
+    key = advisory_lock_key(name)
+    LEADER.set(0, job=name)
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(
+                dsn, autocommit=True
+            ) as conn:
+                cur = await conn.execute("SELECT pg_try_advisory_lock(%s)", (key,))
+                row = await cur.fetchone()
+                if not row or not row[0]:
+                    log.debug("not leader for %s; retry in %.0fs", name, retry_interval_s)
+                else:
+                    log.info("acquired leadership", extra={"job": name})
+                    LEADER.set(1, job=name)
+                    try:
+                        await _run_while_locked(conn, job, check_interval_s)
+                    finally:
+                        LEADER.set(0, job=name)
+                        log.info("released leadership", extra={"job": name})
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("leader election failed", extra={"job": name})
+
+        await asyncio.sleep(retry_interval_s)
+
+
+async def _run_while_locked(
+    conn: psycopg.AsyncConnection,
+    job: Callable[[], Awaitable[None]],
+    check_interval_s: float,
+) -> None:
+    task = asyncio.create_task(job())
+    try:
+        while not task.done():
+            done, _ = await asyncio.wait({task}, timeout=check_interval_s)
+            if done:
+                break
+            # a dead lock connection means we may no longer be the leader
+            await conn.execute("SELECT 1")
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -1,51 +1,64 @@
-import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from emberlog_api.app.db.pool import build_pool
-from emberlog_api.app.notifier.drain.drain import (
-    OutboxDrain,
-    OutboxDrainConfig,
-    Router,
-)
-from emberlog_api.app.notifier.notifier import NotifierClient
-from emberlog_api.app.services.mqtt_consumer import start_mqtt_consumer
+from emberlog_api.app.core.background import BackgroundServices
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.pool import Pools
+from emberlog_api.app.db.replica import ReadRouter
+from emberlog_api.app.services.talkgroup_catalog import talkgroup_catalog
+from emberlog_api.app.services.traffic_state import traffic_state
+from emberlog_api.utils.jsoncodec import install_json_codec
+
+log = logging.getLogger("emberlog_api.core.lifespan")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # 1) open shared DB pool
-    pool = build_pool()
-    await pool.open(wait=True)
+    # JSON/JSONB columns (calls_json, recorders_json, ...) decode with the fast codec
+    install_json_codec(settings.json_codec)
+
+    # 1) open DB pools: requests get their own, background work gets the others
+    pool_names = ["api"]
+    if settings.run_background_workers:
+        pool_names.extend(BackgroundServices.POOL_NAMES)
+    if settings.database_read_url:
+        pool_names.append("read")
+    pools = Pools(pool_names)
+    await pools.open()
+    pool = pools["api"]
+    app.state.pools = pools
     app.state.pool = pool
-    nc = NotifierClient()
-
-    # 2) build router (map event types -> handlers)
-    router = Router(
-        {
-            "incident.created": nc.on_new_incident,
-            # add more handlers here when ready
-        }
-    )
-
-    # 3) start the drain
-    outboxConfig = OutboxDrainConfig(pool=pool)
-    drain = OutboxDrain(cfg=outboxConfig, router=router)
-    await drain.start()
-    app.state.drain = drain
-    mqtt_task = asyncio.create_task(start_mqtt_consumer(pool))
-    app.state.mqtt_task = mqtt_task
+    app.state.read_router = None
+    if settings.database_read_url:
+        app.state.read_router = ReadRouter(
+            pools["read"],
+            max_lag_s=settings.read_replica_max_lag_s,
+            check_interval_s=settings.read_replica_lag_check_interval_s,
+        )
+    if settings.traffic_state_enabled:
+        # warm start so the first dashboard poll is served from memory; on
+        # failure the store loads itself on that first poll instead
+        try:
+            await traffic_state.load(pool)
+        except Exception:
+            log.exception("failed to warm-start traffic state")
+    if settings.talkgroup_catalog_enabled:
+        await talkgroup_catalog.refresh(pool)
+
+    # 2) drain + consumers, unless a separate worker process runs them
+    background = None
+    if settings.run_background_workers:
+        background = BackgroundServices(pools)
+        await background.start()
+    app.state.background = background
 
     try:
-        # 4) hand control to FastAPI
+        # 3) hand control to FastAPI
         yield
     finally:
-        # 5) stop drain first, then close pool
-        mqtt_task.cancel()
-        try:
-            await mqtt_task
-        except asyncio.CancelledError:
-            pass
-        await drain.stop()
-        await pool.close()
+        # 4) stop background work first, then close pools
+        if background is not None:
+            await background.stop()
+        await pools.close()
@@ -0,0 +1,122 @@
+"""
+Per-process cache of encoded responses for endpoints polled by many viewers.
+
+Entries are keyed by endpoint, instance and normalized filters and tagged with
+the version of the data they were built from; a lookup with a newer version
+misses. Concurrent misses for the same key and version share one build, so a
+hundred dashboards polling the same instance cost one read and one encode.
+
+A build only reads the data and derives its validator; the body is encoded the
+first time a client actually needs it, so 304s never pay for serialization,
+cached or not.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable
+
+from fastapi import Request, Response
+
+from emberlog_api.app.core.http_cache import SnapshotValidator
+from emberlog_api.app.core.metrics import Counter
+
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "emberlog_response_cache_lookups_total",
+    "Cached-endpoint requests by outcome: hit, coalesced onto a running build, or miss",
+    ["endpoint", "result"],
+)
+
+
+class CachedResponse:
+    def __init__(self, validator: SnapshotValidator, render: Callable[[], bytes]):
+        self.validator = validator
+        self._render: Callable[[], bytes] | None = render
+        self._body: bytes | None = None
+
+    @property
+    def body(self) -> bytes:
+        """Encoded on first use, then shared by every request holding this entry."""
+        if self._body is None:
+            assert self._render is not None
+            self._body = self._render()
+            self._render = None  # drop the rows it closed over
+        return self._body
+
+    def to_response(self, request: Request, max_age_s: int) -> Response:
+        if self.validator.matches(request):
+            return self.validator.not_modified(max_age_s)
+        return Response(
+            content=self.body,
+            media_type="application/json",
+            headers=self.validator.headers(max_age_s),
+        )
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[Hashable, ...], tuple[Hashable, CachedResponse]] = (
+            OrderedDict()
+        )
+        self._inflight: dict[tuple[Hashable, ...], asyncio.Future[CachedResponse]] = {}
+
+    async def get_or_build(
+        self,
+        key: tuple[Hashable, ...],
+        version: Hashable | None,
+        build: Callable[[], Awaitable[CachedResponse]],
+    ) -> CachedResponse:
+        """Cached entry for ``key`` at ``version``, else the result of one shared ``build``.
+
+        With ``version=None`` (data source cannot tell when it changed) concurrent
+        requests are still coalesced but nothing is kept afterwards.
+        """
+        endpoint = str(key[0])
+        if version is not None:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                RESPONSE_CACHE_LOOKUPS.inc(endpoint=endpoint, result="hit")
+                return entry[1]
+
+        flight_key = (*key, version)
+        running = self._inflight.get(flight_key)
+        if running is not None:
+            RESPONSE_CACHE_LOOKUPS.inc(endpoint=endpoint, result="coalesced")
+        else:
+            RESPONSE_CACHE_LOOKUPS.inc(endpoint=endpoint, result="miss")
+            # its own task, so no request (not even the one that started it)
+            # can cancel the build out from under the others
+            running = asyncio.ensure_future(self._build(key, version, build))
+            self._inflight[flight_key] = running
+            running.add_done_callback(
+                lambda task: self._build_done(flight_key, task)
+            )
+        return await asyncio.shield(running)
+
+    async def _build(
+        self,
+        key: tuple[Hashable, ...],
+        version: Hashable | None,
+        build: Callable[[], Awaitable[CachedResponse]],
+    ) -> CachedResponse:
+        cached = await build()
+        if version is not None:
+            self._entries[key] = (version, cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def _build_done(
+        self, flight_key: tuple[Hashable, ...], task: asyncio.Task[CachedResponse]
+    ) -> None:
+        if self._inflight.get(flight_key) is task:
+            del self._inflight[flight_key]
+        if not task.cancelled():
+            task.exception()  # waiters re-raise it; don't warn when there are none
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -9,16 +9,86 @@ class Settings(BaseSettings):
     database_url: str
     log_level: str = "INFO"
     enable_file_logging: bool = False
+    # "api" pool; see emberlog_api/app/db/pool.py for the named pools
     pool_min_size: int = 1
     pool_max_size: int = 5
+    pool_timeout_s: float = 10.0
+    pool_max_waiting: int = 0  # 0 = unbounded queue
+    ingest_pool_min_size: int = 1
+    ingest_pool_max_size: int = 3
+    ingest_pool_timeout_s: float = 30.0
+    ingest_pool_max_waiting: int = 0
+    background_pool_min_size: int = 1
+    background_pool_max_size: int = 2
+    background_pool_timeout_s: float = 30.0
+    background_pool_max_waiting: int = 0
+    db_pool_isolation: bool = True
+    # optional streaming replica for read-only API paths (emberlog_api/app/db/replica.py)
+    database_read_url: str | None = None
+    read_pool_min_size: int = 1
+    read_pool_max_size: int = 5
+    read_pool_timeout_s: float = 10.0
+    read_pool_max_waiting: int = 0
+    read_replica_max_lag_s: float = 5.0
+    read_replica_lag_check_interval_s: float = 1.0
+    read_your_writes_s: float = 5.0
+    run_background_workers: bool = True
+    mqtt_leader_election: bool = True
+    leader_retry_interval_s: float = 10.0
+    worker_http_port: int | None = 8081
+
     notifier_base_url: str = "http://localhost:8090"
+    notifier_max_concurrency: int = 5
+    notifier_rate_per_s: float | None = None
+    notifier_rate_burst: int = 5
+    notifier_breaker_failure_threshold: int | None = 5
+    notifier_breaker_reset_s: float = 30.0
+    notifier_batch_enabled: bool = False
+    notifier_max_connections: int = 20
+    notifier_max_keepalive_connections: int = 10
+    notifier_keepalive_expiry_s: float = 30.0
+    notifier_http2: bool = False
+    notifier_connect_timeout_s: float = 2.0
+    notifier_read_timeout_s: float = 5.0
+    notifier_write_timeout_s: float = 5.0
+    notifier_pool_timeout_s: float = 2.0
+    outbox_batch_size: int = 5
+    outbox_max_concurrency: int = 5
+    outbox_replay_rate_per_s: float = 5.0
+    outbox_replay_max_rows: int = 1000
     mqtt_host: str = "mosquitto.pi-rack.com"
     mqtt_port: int = 1883
     mqtt_topic_prefix: str = "emberlog/trunkrecorder"
     mqtt_username: str | None = None
     mqtt_password: str | None = None
+    # also subscribe {prefix}/+/{suffix}; the instance id comes from the topic
+    mqtt_topic_wildcard: bool = False
+    # MQTT v5 shared subscription group ($share/<group>/...) to split load across replicas
+    mqtt_shared_group: str | None = None
+    mqtt_writer_concurrency: int = 2
+    mqtt_queue_max_keys: int = 256
+    mqtt_snapshot_freshness_s: float = 30.0
+    # per-instance ingest lag gauge series; instance ids beyond this are not labelled
+    mqtt_lag_max_instances: int = 32
+
+    decode_history_enabled: bool = False
+    decode_history_raw_retention_days: int = 7
+    decode_history_1m_retention_days: int = 3
+    decode_history_5m_retention_days: int = 30
+    decode_history_1h_retention_days: int = 365
+    decode_history_partitions_ahead_days: int = 3
+    decode_history_maintenance_interval_s: float = 3600.0
+
+    json_codec: str = "auto"  # auto | orjson | msgspec | stdlib
 
     max_decoderate: float = 40.0
+    traffic_state_enabled: bool = True
+    traffic_state_max_age_s: float = 2.0
+    traffic_cache_max_age_s: int = 2  # Cache-Control max-age on /traffic responses
+    traffic_response_cache_enabled: bool = True
+    traffic_response_cache_max_entries: int = 256
+    talkgroup_catalog_enabled: bool = True
+    talkgroup_catalog_max_age_s: float = 60.0
     rates_topic_suffix: str = "rates"
     recorders_topic_suffix: str = "recorders"
     calls_active_topic_suffix: str = "calls_active"
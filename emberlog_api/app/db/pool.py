@@ -1,16 +1,87 @@
 from fastapi import Request
 from psycopg_pool import AsyncConnectionPool
 
-def build_pool() -> AsyncConnectionPool:
+# Workloads get separate pools so an MQTT burst or a drain backlog queues on its
+# own connections instead of behind (or in front of) API requests:
+#   api        - HTTP request handlers
+#   ingest     - MQTT consumer snapshot/history writes
+#   background - outbox drain and maintenance jobs
+#   read       - read replica (DATABASE_READ_URL), see replica.py
+POOL_NAMES = ("api", "ingest", "background", "read")
+
+
+def _pool_kwargs(name: str) -> dict:
+    from emberlog_api.app.core.settings import settings
+
+    if name == "api":
+        # POOL_MIN_SIZE/POOL_MAX_SIZE predate the named pools and size the API one
+        return {
+            "min_size": settings.pool_min_size,
+            "max_size": settings.pool_max_size,
+            "timeout": settings.pool_timeout_s,
+            "max_waiting": settings.pool_max_waiting,
+        }
+    if name not in POOL_NAMES:
+        raise ValueError(f"unknown pool {name!r}; expected one of {POOL_NAMES}")
+    return {
+        "min_size": getattr(settings, f"{name}_pool_min_size"),
+        "max_size": getattr(settings, f"{name}_pool_max_size"),
+        "timeout": getattr(settings, f"{name}_pool_timeout_s"),
+        "max_waiting": getattr(settings, f"{name}_pool_max_waiting"),
+    }
+
+
+def build_pool(name: str = "api") -> AsyncConnectionPool:
     from emberlog_api.app.core.settings import settings
 
+    if name == "read":
+        if not settings.database_read_url:
+            raise ValueError("the read pool needs DATABASE_READ_URL")
+        conninfo = settings.database_read_url
+    else:
+        conninfo = settings.database_url
     return AsyncConnectionPool(
-        settings.database_url,
-        min_size=settings.pool_min_size,
-        max_size=settings.pool_max_size,
+        conninfo,
+        name=name,
         max_idle=60,
+        open=False,  # callers open explicitly (``await pool.open(wait=True)``)
+        **_pool_kwargs(name),
     )
 
 
+class Pools:
+    """The named pools one process needs, opened and closed together.
+
+    With DB_POOL_ISOLATION=false every primary pool name maps to a single shared
+    pool; ``read`` always has its own, since it connects to another server.
+    """
+
+    def __init__(self, names: tuple[str, ...] | list[str]):
+        from emberlog_api.app.core.settings import settings
+
+        if settings.db_pool_isolation:
+            self._pools = {name: build_pool(name) for name in names}
+        else:
+            shared = build_pool("api")
+            self._pools = {
+                name: build_pool(name) if name == "read" else shared for name in names
+            }
+
+    def __getitem__(self, name: str) -> AsyncConnectionPool:
+        return self._pools[name]
+
+    def _distinct(self) -> list[AsyncConnectionPool]:
+        return list({id(pool): pool for pool in self._pools.values()}.values())
+
+    async def open(self) -> None:
+        for pool in self._distinct():
+            # an unreachable replica degrades reads to the primary, not startup
+            await pool.open(wait=pool.name != "read")
+
+    async def close(self) -> None:
+        for pool in self._distinct():
+            await pool.close()
+
+
 def get_pool(request: Request) -> AsyncConnectionPool:
     return request.app.state.pool
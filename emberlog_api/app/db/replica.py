@@ -0,0 +1,170 @@
+"""
+Read-replica routing for read-only API paths (incident list/detail, /traffic reads).
+
+Reads go to the ``read`` pool (DATABASE_READ_URL) while the replica's replay lag
+is under READ_REPLICA_MAX_LAG_S, and to the primary otherwise. Lag is sampled at
+most every READ_REPLICA_LAG_CHECK_INTERVAL_S, shared by all requests.
+
+Read-your-writes: a request that writes marks the response with a short-lived
+cookie, and reads carrying it stay on the primary until it expires.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from fastapi import Depends, Request, Response
+from psycopg_pool import AsyncConnectionPool
+
+from emberlog_api.app.core.metrics import Counter, Gauge
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.pool import get_pool
+
+log = logging.getLogger("emberlog_api.db.replica")
+
+PRIMARY_STICKY_COOKIE = "emberlog_primary_until"
+# a dead replica must not hold requests for the pool's full checkout timeout
+LAG_CHECK_TIMEOUT_S = 1.0
+
+DB_READS = Counter(
+    "emberlog_db_reads_total",
+    "Read-path requests by target pool and reason",
+    ["target", "reason"],
+)
+REPLICA_LAG_SECONDS = Gauge(
+    "emberlog_db_replica_lag_seconds",
+    "Last measured replay lag of the read replica; -1 when unknown",
+)
+
+SQL_REPLICA_STATUS = """
+SELECT
+    pg_is_in_recovery(),
+    COALESCE(
+        (SELECT status = 'streaming' FROM pg_stat_wal_receiver), false
+    ),
+    pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn(),
+    EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+"""
+
+
+def replica_lag_from_status(
+    in_recovery: bool,
+    streaming: bool,
+    replayed_all: bool | None,
+    replay_age_s: float | None,
+) -> float | None:
+    """Lag in seconds from a ``SQL_REPLICA_STATUS`` row; None = do not read from it."""
+    if not in_recovery:
+        # promoted (or pointed at a primary): it may have diverged from ours
+        return None
+    if streaming and replayed_all:
+        # connected and caught up: no lag, even if the primary has been idle
+        # and the last replayed transaction is old
+        return 0.0
+    # disconnected receivers freeze the receive LSN, so equal LSNs prove nothing;
+    # the age of the last replayed transaction keeps growing instead
+    if replay_age_s is None:
+        return None  # nothing replayed yet
+    return max(float(replay_age_s), 0.0)
+
+
+class ReadRouter:
+    def __init__(
+        self,
+        replica: AsyncConnectionPool,
+        *,
+        max_lag_s: float,
+        check_interval_s: float,
+    ):
+        self.replica = replica
+        self.max_lag_s = max_lag_s
+        self.check_interval_s = check_interval_s
+        self.lag_s: float | None = None
+        self.healthy = False
+        self._checked_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def _measure_lag(self) -> float | None:
+        try:
+            async with self.replica.connection(timeout=LAG_CHECK_TIMEOUT_S) as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(SQL_REPLICA_STATUS)
+                    row = await cur.fetchone()
+        except Exception:
+            log.warning("read replica lag check failed", exc_info=True)
+            return None
+        if row is None:
+            return None
+        return replica_lag_from_status(*row)
+
+    async def replica_lag(self) -> float | None:
+        """Replay lag in seconds (None = unreachable/unknown), cached for check_interval_s."""
+        if (
+            self._checked_at is not None
+            and time.monotonic() - self._checked_at < self.check_interval_s
+        ):
+            return self.lag_s
+        if self._lock.locked():
+            # one probe per interval; everyone else uses the last reading
+            return self.lag_s
+        async with self._lock:
+            self.lag_s = await self._measure_lag()
+            self._checked_at = time.monotonic()
+        REPLICA_LAG_SECONDS.set(self.lag_s if self.lag_s is not None else -1)
+        healthy = self.lag_s is not None and self.lag_s <= self.max_lag_s
+        if healthy != self.healthy:
+            log.info(
+                "reads moved to replica" if healthy else "reads falling back to primary",
+                extra={"replica_lag_s": self.lag_s, "max_lag_s": self.max_lag_s},
+            )
+            self.healthy = healthy
+        return self.lag_s
+
+    async def pool_for(
+        self, request: Request, primary: AsyncConnectionPool
+    ) -> AsyncConnectionPool:
+        if _sticky_to_primary(request):
+            DB_READS.inc(target="primary", reason="recent_write")
+            return primary
+        lag = await self.replica_lag()
+        if lag is None or lag > self.max_lag_s:
+            DB_READS.inc(target="primary", reason="replica_lag")
+            return primary
+        DB_READS.inc(target="replica", reason="ok")
+        return self.replica
+
+
+def _sticky_to_primary(request: Request) -> bool:
+    value = request.cookies.get(PRIMARY_STICKY_COOKIE)
+    if value is None:
+        return False
+    try:
+        return float(value) > time.time()
+    except ValueError:
+        return False
+
+
+def remember_write(request: Request, response: Response) -> None:
+    """Keep this client's reads on the primary for READ_YOUR_WRITES_S."""
+    if getattr(request.app.state, "read_router", None) is None:
+        return
+    window_s = settings.read_your_writes_s
+    response.set_cookie(
+        PRIMARY_STICKY_COOKIE,
+        f"{time.time() + window_s:.3f}",
+        max_age=max(int(window_s), 1),
+        httponly=True,
+        samesite="lax",
+    )
+
+
+async def get_read_pool(
+    request: Request, primary: AsyncConnectionPool = Depends(get_pool)
+) -> AsyncConnectionPool:
+    """Pool for read-only queries: the replica when configured and fresh enough."""
+    router: ReadRouter | None = getattr(request.app.state, "read_router", None)
+    if router is None:
+        return primary
+    return await router.pool_for(request, primary)
@@ -0,0 +1,283 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+from psycopg import sql
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+HISTORY_TABLE = "tr_decode_rate_history"
+# catches samples for days without a partition (see the migration)
+HISTORY_DEFAULT_PARTITION = f"{HISTORY_TABLE}_default"
+
+# resolution -> (rollup table, bucket width)
+ROLLUPS: dict[str, tuple[str, timedelta]] = {
+    "1m": ("tr_decode_rate_rollup_1m", timedelta(minutes=1)),
+    "5m": ("tr_decode_rate_rollup_5m", timedelta(minutes=5)),
+    "1h": ("tr_decode_rate_rollup_1h", timedelta(hours=1)),
+}
+
+
+def _rollup_upsert(table: str, bucket_param: str) -> str:
+    return f"""
+    INSERT INTO {table} AS r (
+        instance_id,
+        sys_num,
+        bucket_start,
+        sys_name,
+        min_pct,
+        max_pct,
+        sum_pct,
+        sample_count
+    )
+    SELECT
+        %(instance_id)s,
+        s.sys_num,
+        %({bucket_param})s,
+        s.sys_name,
+        s.decoderate_pct,
+        s.decoderate_pct,
+        s.decoderate_pct,
+        1
+    FROM samples AS s
+    ON CONFLICT (instance_id, sys_num, bucket_start) DO UPDATE
+    SET
+        sys_name = EXCLUDED.sys_name,
+        min_pct = LEAST(r.min_pct, EXCLUDED.min_pct),
+        max_pct = GREATEST(r.max_pct, EXCLUDED.max_pct),
+        sum_pct = r.sum_pct + EXCLUDED.sum_pct,
+        sample_count = r.sample_count + 1
+    """
+
+
+# raw insert and all three rollups in one statement (one round trip)
+SQL_INSERT_DECODE_HISTORY = f"""
+WITH samples AS (
+    SELECT u.sys_num, u.sys_name, u.decoderate_pct
+    FROM unnest(
+        %(sys_num)s::integer[],
+        %(sys_name)s::text[],
+        %(decoderate_pct)s::double precision[]
+    ) AS u(sys_num, sys_name, decoderate_pct)
+),
+raw AS (
+    INSERT INTO {HISTORY_TABLE} (
+        instance_id,
+        sys_num,
+        sys_name,
+        decoderate_pct,
+        recorded_at
+    )
+    SELECT %(instance_id)s, s.sys_num, s.sys_name, s.decoderate_pct, %(recorded_at)s
+    FROM samples AS s
+),
+rollup_1m AS ({_rollup_upsert(ROLLUPS["1m"][0], "bucket_1m")}),
+rollup_5m AS ({_rollup_upsert(ROLLUPS["5m"][0], "bucket_5m")})
+{_rollup_upsert(ROLLUPS["1h"][0], "bucket_1h")}
+"""
+
+SQL_SELECT_DECODE_ROLLUP = {
+    resolution: f"""
+SELECT
+    sys_num,
+    sys_name,
+    bucket_start,
+    min_pct,
+    max_pct,
+    sum_pct / sample_count AS avg_pct,
+    sample_count
+FROM {table}
+WHERE instance_id = %(instance_id)s
+  AND bucket_start >= %(from_at)s
+  AND bucket_start < %(to_at)s
+  AND (%(sys_names)s::text[] IS NULL OR sys_name = ANY(%(sys_names)s::text[]))
+ORDER BY sys_num, bucket_start
+"""
+    for resolution, (table, _width) in ROLLUPS.items()
+}
+
+SQL_DELETE_DECODE_ROLLUP_BEFORE = {
+    resolution: f"DELETE FROM {table} WHERE bucket_start < %(before)s"
+    for resolution, (table, _width) in ROLLUPS.items()
+}
+
+SQL_LIST_DECODE_HISTORY_PARTITIONS = """
+SELECT c.relname
+FROM pg_inherits AS i
+JOIN pg_class AS c ON c.oid = i.inhrelid
+WHERE i.inhparent = %(parent)s::regclass
+"""
+
+
+def bucket_start(value: datetime, width: timedelta) -> datetime:
+    """Floor ``value`` to a multiple of ``width`` since the Unix epoch (UTC)."""
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return epoch + ((value - epoch) // width) * width
+
+
+def partition_name(day: date) -> str:
+    return f"{HISTORY_TABLE}_p{day:%Y%m%d}"
+
+
+def _partition_day(name: str) -> date | None:
+    prefix = f"{HISTORY_TABLE}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix):], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+async def insert_decode_history(
+    pool: AsyncConnectionPool,
+    *,
+    instance_id: str,
+    rates: list[dict[str, Any]],
+    recorded_at: datetime,
+) -> None:
+    """Append raw samples and fold them into the 1m/5m/1h rollups.
+
+    Duplicate sys_num entries keep the last one, since ON CONFLICT cannot touch
+    the same rollup row twice in one statement.
+    """
+    by_sys_num = {int(rate["sys_num"]): rate for rate in rates}
+    if not by_sys_num:
+        return
+    rows = list(by_sys_num.values())
+    params = {
+        "instance_id": instance_id,
+        "recorded_at": recorded_at,
+        "sys_num": [int(r["sys_num"]) for r in rows],
+        "sys_name": [r["sys_name"] for r in rows],
+        "decoderate_pct": [r["decoderate_pct"] for r in rows],
+        **{
+            f"bucket_{resolution}": bucket_start(recorded_at, width)
+            for resolution, (_table, width) in ROLLUPS.items()
+        },
+    }
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SQL_INSERT_DECODE_HISTORY, params)
+
+
+async def list_decode_rollup(
+    pool: AsyncConnectionPool,
+    *,
+    instance_id: str,
+    resolution: str,
+    from_at: datetime,
+    to_at: datetime,
+    sys_names: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Rollup buckets in [from_at, to_at) ordered by system then time."""
+    params = {
+        "instance_id": instance_id,
+        "from_at": from_at,
+        "to_at": to_at,
+        "sys_names": sys_names or None,
+    }
+
+    async with pool.connection() as conn:
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(SQL_SELECT_DECODE_ROLLUP[resolution], params)
+            return list(await cur.fetchall())
+
+
+async def ensure_decode_history_partitions(
+    pool: AsyncConnectionPool,
+    *,
+    start: date,
+    days: int,
+) -> None:
+    """Create the daily raw-history partitions for [start, start + days).
+
+    Samples that already landed in the default partition for a day (maintenance
+    fell behind) are moved into the new partition before it is attached.
+    """
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                SQL_LIST_DECODE_HISTORY_PARTITIONS, {"parent": HISTORY_TABLE}
+            )
+            existing = {row[0] for row in await cur.fetchall()}
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            name = partition_name(day)
+            if name in existing:
+                continue
+            lower = datetime.combine(day, time.min, tzinfo=timezone.utc)
+            upper = lower + timedelta(days=1)
+            params = {
+                "partition": sql.Identifier(name),
+                "parent": sql.Identifier(HISTORY_TABLE),
+                "default": sql.Identifier(HISTORY_DEFAULT_PARTITION),
+                "lower": sql.Literal(lower),
+                "upper": sql.Literal(upper),
+            }
+            async with conn.transaction():
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        sql.SQL(
+                            "CREATE TABLE {partition} (LIKE {parent} INCLUDING DEFAULTS)"
+                        ).format(**params)
+                    )
+                    await cur.execute(
+                        sql.SQL(
+                            "WITH moved AS ("
+                            "DELETE FROM {default} "
+                            "WHERE recorded_at >= {lower} AND recorded_at < {upper} "
+                            "RETURNING instance_id, sys_num, sys_name, decoderate_pct, recorded_at"
+                            ") INSERT INTO {partition} SELECT * FROM moved"
+                        ).format(**params)
+                    )
+                    await cur.execute(
+                        sql.SQL(
+                            "ALTER TABLE {parent} ATTACH PARTITION {partition} "
+                            "FOR VALUES FROM ({lower}) TO ({upper})"
+                        ).format(**params)
+                    )
+
+
+async def drop_decode_history_partitions(
+    pool: AsyncConnectionPool,
+    *,
+    before: date,
+) -> list[str]:
+    """Drop raw-history partitions whose whole day is before ``before``."""
+    dropped: list[str] = []
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                SQL_LIST_DECODE_HISTORY_PARTITIONS, {"parent": HISTORY_TABLE}
+            )
+            names = [row[0] for row in await cur.fetchall()]
+            for name in sorted(names):
+                day = _partition_day(name)
+                if day is None or day >= before:
+                    continue
+                await cur.execute(
+                    sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(name))
+                )
+                dropped.append(name)
+            # stragglers from days that never got a partition
+            await cur.execute(
+                sql.SQL("DELETE FROM {} WHERE recorded_at < {}").format(
+                    sql.Identifier(HISTORY_DEFAULT_PARTITION),
+                    sql.Literal(datetime.combine(before, time.min, tzinfo=timezone.utc)),
+                )
+            )
+    return dropped
+
+
+async def delete_decode_rollup_before(
+    pool: AsyncConnectionPool,
+    *,
+    resolution: str,
+    before: datetime,
+) -> int:
+    """Delete rollup buckets older than ``before``; returns the row count."""
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SQL_DELETE_DECODE_ROLLUP_BEFORE[resolution], {"before": before})
+            return cur.rowcount
@@ -0,0 +1,160 @@
+import logging
+from datetime import datetime
+from typing import Any
+
+from psycopg.rows import dict_row
+
+from emberlog_api.models.outbox import OutboxRowOut
+
+log = logging.getLogger("emberlog_api.v1.db.repositories.outbox")
+
+
+def _dead_filters(
+    *,
+    ids: list[int] | None = None,
+    event_type: str | None,
+    error_search: str | None,
+    from_created_at: datetime | None,
+    to_created_at: datetime | None,
+) -> tuple[list[str], dict[str, Any]]:
+    filters: list[str] = ["status = 'dead'"]
+    params: dict[str, Any] = {}
+
+    if ids:
+        filters.append("id = ANY(%(ids)s)")
+        params["ids"] = ids
+
+    if event_type:
+        filters.append("event_type = %(event_type)s")
+        params["event_type"] = event_type
+
+    if error_search:
+        filters.append("last_error ILIKE %(error_search)s")
+        params["error_search"] = f"%{error_search}%"
+
+    if from_created_at:
+        filters.append("created_at >= %(from_created_at)s")
+        params["from_created_at"] = from_created_at
+
+    if to_created_at:
+        filters.append("created_at <= %(to_created_at)s")
+        params["to_created_at"] = to_created_at
+
+    return filters, params
+
+
+async def list_dead_outbox(
+    pool,
+    *,
+    event_type: str | None,
+    error_search: str | None,
+    from_created_at: datetime | None,
+    to_created_at: datetime | None,
+    include_payload: bool,
+    limit: int,
+    offset: int,
+) -> tuple[list[OutboxRowOut], int]:
+    filters, params = _dead_filters(
+        event_type=event_type,
+        error_search=error_search,
+        from_created_at=from_created_at,
+        to_created_at=to_created_at,
+    )
+    params.update({"limit": limit, "offset": offset})
+    where_clause = f" WHERE {' AND '.join(filters)}"
+    payload_column = "payload" if include_payload else "NULL AS payload"
+
+    sql_select = f"""
+    SELECT id, incident_id, event_type, status, attempts, last_error,
+           created_at, available_at, {payload_column}
+    FROM incident_outbox{where_clause}
+    ORDER BY id
+    LIMIT %(limit)s OFFSET %(offset)s
+    """
+
+    sql_count = f"""
+    SELECT COUNT(*)
+    FROM incident_outbox{where_clause}
+    """
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql_count, params)
+            count_row = await cur.fetchone()
+            total = count_row[0] if count_row else 0
+
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(sql_select, params)
+            rows = await cur.fetchall()
+
+    return [OutboxRowOut(**row) for row in rows], total
+
+
+async def requeue_dead_outbox(
+    pool,
+    *,
+    ids: list[int] | None,
+    event_type: str | None,
+    error_search: str | None,
+    from_created_at: datetime | None,
+    to_created_at: datetime | None,
+    limit: int,
+    rate_per_s: float,
+) -> list[int]:
+    """Move up to `limit` dead rows back to pending with attempts reset.
+
+    Rows are staggered `1 / rate_per_s` seconds apart through available_at, so
+    the drain picks them up gradually instead of all at once. The stagger starts
+    after the last row of earlier replays that is still waiting (pending, attempts
+    reset, last_error kept), so back-to-back requeues queue up instead of overlapping.
+    """
+    filters, params = _dead_filters(
+        ids=ids,
+        event_type=event_type,
+        error_search=error_search,
+        from_created_at=from_created_at,
+        to_created_at=to_created_at,
+    )
+    params.update({"limit": limit, "rate_per_s": rate_per_s})
+
+    sql = f"""
+    WITH picked AS (
+        SELECT id
+        FROM incident_outbox
+        WHERE {' AND '.join(filters)}
+        ORDER BY id
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    ),
+    numbered AS (
+        SELECT id, row_number() OVER (ORDER BY id) - 1 AS n
+        FROM picked
+    ),
+    queue_end AS (
+        SELECT GREATEST(
+            now(),
+            max(available_at) + make_interval(secs => 1 / %(rate_per_s)s::double precision)
+        ) AS start_at
+        FROM incident_outbox
+        WHERE status = 'pending'
+            AND attempts = 0
+            AND last_error IS NOT NULL
+    )
+    UPDATE incident_outbox o
+    SET status = 'pending',
+        attempts = 0,
+        available_at = queue_end.start_at
+            + make_interval(secs => numbered.n / %(rate_per_s)s::double precision)
+    FROM numbered, queue_end
+    WHERE o.id = numbered.id
+    RETURNING o.id
+    """
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params)
+            rows = await cur.fetchall()
+
+    requeued = sorted(row[0] for row in rows)
+    log.info("Requeued %d dead outbox rows", len(requeued))
+    return requeued
@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Any
+
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+SQL_UPSERT_TALKGROUPS = """
+INSERT INTO tr_talkgroups AS t (
+    instance_id,
+    sys_num,
+    talkgroup,
+    sys_name,
+    alpha_tag,
+    description,
+    talkgroup_group,
+    talkgroup_tag,
+    updated_at
+)
+SELECT %(instance_id)s, u.*, %(updated_at)s
+FROM unnest(
+    %(sys_num)s::integer[],
+    %(talkgroup)s::integer[],
+    %(sys_name)s::text[],
+    %(alpha_tag)s::text[],
+    %(description)s::text[],
+    %(talkgroup_group)s::text[],
+    %(talkgroup_tag)s::text[]
+) AS u
+ON CONFLICT (instance_id, sys_num, talkgroup) DO UPDATE
+SET
+    sys_name = EXCLUDED.sys_name,
+    alpha_tag = EXCLUDED.alpha_tag,
+    description = EXCLUDED.description,
+    talkgroup_group = EXCLUDED.talkgroup_group,
+    talkgroup_tag = EXCLUDED.talkgroup_tag,
+    updated_at = EXCLUDED.updated_at
+WHERE t.updated_at <= EXCLUDED.updated_at
+"""
+
+SQL_SELECT_TALKGROUPS = """
+SELECT
+    instance_id,
+    sys_num,
+    talkgroup,
+    sys_name,
+    alpha_tag,
+    description,
+    talkgroup_group,
+    talkgroup_tag,
+    updated_at
+FROM tr_talkgroups
+"""
+
+
+async def upsert_talkgroups(
+    pool: AsyncConnectionPool,
+    *,
+    instance_id: str,
+    talkgroups: list[dict[str, Any]],
+    updated_at: datetime,
+) -> None:
+    """Insert or refresh catalog rows; one statement for the whole batch."""
+    if not talkgroups:
+        return
+    params = {
+        "instance_id": instance_id,
+        "updated_at": updated_at,
+        **{
+            column: [tg[column] for tg in talkgroups]
+            for column in (
+                "sys_num",
+                "talkgroup",
+                "sys_name",
+                "alpha_tag",
+                "description",
+                "talkgroup_group",
+                "talkgroup_tag",
+            )
+        },
+    }
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SQL_UPSERT_TALKGROUPS, params)
+
+
+async def select_talkgroups(pool: AsyncConnectionPool) -> list[dict[str, Any]]:
+    async with pool.connection() as conn:
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(SQL_SELECT_TALKGROUPS)
+            return list(await cur.fetchall())
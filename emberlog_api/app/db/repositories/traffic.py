@@ -34,6 +34,55 @@ SET
     decoderate_interval_s = EXCLUDED.decoderate_interval_s,
     control_channel_hz = EXCLUDED.control_channel_hz,
     updated_at = EXCLUDED.updated_at
+-- an older message (reordered by the broker or a shared subscription) never wins
+WHERE tr_decode_rate_latest.updated_at <= EXCLUDED.updated_at
+"""
+
+SQL_UPSERT_DECODE_RATES = """
+INSERT INTO tr_decode_rate_latest (
+    instance_id,
+    sys_num,
+    sys_name,
+    decoderate_raw,
+    decoderate_pct,
+    decoderate_interval_s,
+    control_channel_hz,
+    updated_at
+)
+SELECT
+    %(instance_id)s,
+    u.sys_num,
+    u.sys_name,
+    u.decoderate_raw,
+    u.decoderate_pct,
+    u.decoderate_interval_s,
+    u.control_channel_hz,
+    %(updated_at)s
+FROM unnest(
+    %(sys_num)s::integer[],
+    %(sys_name)s::text[],
+    %(decoderate_raw)s::double precision[],
+    %(decoderate_pct)s::double precision[],
+    %(decoderate_interval_s)s::double precision[],
+    %(control_channel_hz)s::bigint[]
+) AS u(
+    sys_num,
+    sys_name,
+    decoderate_raw,
+    decoderate_pct,
+    decoderate_interval_s,
+    control_channel_hz
+)
+ON CONFLICT (instance_id, sys_num) DO UPDATE
+SET
+    sys_name = EXCLUDED.sys_name,
+    decoderate_raw = EXCLUDED.decoderate_raw,
+    decoderate_pct = EXCLUDED.decoderate_pct,
+    decoderate_interval_s = EXCLUDED.decoderate_interval_s,
+    control_channel_hz = EXCLUDED.control_channel_hz,
+    updated_at = EXCLUDED.updated_at
+-- an older message (reordered by the broker or a shared subscription) never wins
+WHERE tr_decode_rate_latest.updated_at <= EXCLUDED.updated_at
 """
 
 SQL_UPSERT_RECORDERS_SNAPSHOT = """
@@ -63,26 +112,47 @@ SET
     idle_count = EXCLUDED.idle_count,
     available_count = EXCLUDED.available_count,
     updated_at = EXCLUDED.updated_at
+-- an older message (reordered by the broker or a shared subscription) never wins
+WHERE tr_recorders_snapshot_latest.updated_at <= EXCLUDED.updated_at
 """
 
 SQL_UPSERT_CALLS_ACTIVE_SNAPSHOT = """
 INSERT INTO tr_calls_active_snapshot_latest (
     instance_id,
     calls_json,
+    calls_normalized_json,
     active_calls_count,
     updated_at
 )
 VALUES (
     %(instance_id)s,
     %(calls_json)s,
+    %(calls_normalized_json)s,
     %(active_calls_count)s,
     %(updated_at)s
 )
 ON CONFLICT (instance_id) DO UPDATE
 SET
     calls_json = EXCLUDED.calls_json,
+    calls_normalized_json = EXCLUDED.calls_normalized_json,
     active_calls_count = EXCLUDED.active_calls_count,
     updated_at = EXCLUDED.updated_at
+-- an older message (reordered by the broker or a shared subscription) never wins
+WHERE tr_calls_active_snapshot_latest.updated_at <= EXCLUDED.updated_at
+"""
+
+SQL_TOUCH_RECORDERS_SNAPSHOT = """
+UPDATE tr_recorders_snapshot_latest
+SET updated_at = %(updated_at)s
+WHERE instance_id = %(instance_id)s
+  AND updated_at < %(updated_at)s
+"""
+
+SQL_TOUCH_CALLS_ACTIVE_SNAPSHOT = """
+UPDATE tr_calls_active_snapshot_latest
+SET updated_at = %(updated_at)s
+WHERE instance_id = %(instance_id)s
+  AND updated_at < %(updated_at)s
 """
 
 
@@ -115,6 +185,39 @@ async def upsert_decode_rate(
             await cur.execute(SQL_UPSERT_DECODE_RATE, params)
 
 
+async def upsert_decode_rates(
+    pool: AsyncConnectionPool,
+    *,
+    instance_id: str,
+    rates: list[dict[str, Any]],
+    updated_at: datetime,
+) -> None:
+    """Upsert the decode rates of every system in one statement (one round trip).
+
+    Each rate is a dict with the keyword arguments of `upsert_decode_rate`
+    (minus instance_id/updated_at). Duplicate sys_num entries keep the last one,
+    since ON CONFLICT cannot touch the same row twice in one statement.
+    """
+    by_sys_num = {int(rate["sys_num"]): rate for rate in rates}
+    if not by_sys_num:
+        return
+    rows = list(by_sys_num.values())
+    params = {
+        "instance_id": instance_id,
+        "updated_at": updated_at,
+        "sys_num": [int(r["sys_num"]) for r in rows],
+        "sys_name": [r["sys_name"] for r in rows],
+        "decoderate_raw": [r["decoderate_raw"] for r in rows],
+        "decoderate_pct": [r["decoderate_pct"] for r in rows],
+        "decoderate_interval_s": [r.get("decoderate_interval_s") for r in rows],
+        "control_channel_hz": [r.get("control_channel_hz") for r in rows],
+    }
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SQL_UPSERT_DECODE_RATES, params)
+
+
 async def upsert_recorders_snapshot(
     pool: AsyncConnectionPool,
     *,
@@ -125,8 +228,8 @@ async def upsert_recorders_snapshot(
     idle_count: int,
     available_count: int,
     updated_at: datetime,
-) -> None:
-    """Insert or update the latest recorders snapshot for an instance."""
+) -> bool:
+    """Insert or update the latest recorders snapshot; False when a newer row won."""
     params = {
         "instance_id": instance_id,
         "recorders_json": Json(recorders_json),
@@ -140,6 +243,7 @@ async def upsert_recorders_snapshot(
     async with pool.connection() as conn:
         async with conn.cursor() as cur:
             await cur.execute(SQL_UPSERT_RECORDERS_SNAPSHOT, params)
+            return cur.rowcount > 0
 
 
 async def upsert_calls_active_snapshot(
@@ -149,11 +253,15 @@ async def upsert_calls_active_snapshot(
     calls_json: dict,
     active_calls_count: int,
     updated_at: datetime,
-) -> None:
-    """Insert or update the latest active-calls snapshot for an instance."""
+    calls_normalized: list[dict[str, Any]] | None = None,
+) -> bool:
+    """Insert or update the latest active-calls snapshot; False when a newer row won."""
     params = {
         "instance_id": instance_id,
         "calls_json": Json(calls_json),
+        "calls_normalized_json": (
+            Json(calls_normalized) if calls_normalized is not None else None
+        ),
         "active_calls_count": active_calls_count,
         "updated_at": updated_at,
     }
@@ -161,6 +269,38 @@ async def upsert_calls_active_snapshot(
     async with pool.connection() as conn:
         async with conn.cursor() as cur:
             await cur.execute(SQL_UPSERT_CALLS_ACTIVE_SNAPSHOT, params)
+            return cur.rowcount > 0
+
+
+async def touch_recorders_snapshot(
+    pool: AsyncConnectionPool,
+    *,
+    instance_id: str,
+    updated_at: datetime,
+) -> bool:
+    """Bump updated_at of an unchanged recorders snapshot without rewriting its JSONB."""
+    params = {"instance_id": instance_id, "updated_at": updated_at}
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SQL_TOUCH_RECORDERS_SNAPSHOT, params)
+            return cur.rowcount > 0
+
+
+async def touch_calls_active_snapshot(
+    pool: AsyncConnectionPool,
+    *,
+    instance_id: str,
+    updated_at: datetime,
+) -> bool:
+    """Bump updated_at of an unchanged active-calls snapshot without rewriting its JSONB."""
+    params = {"instance_id": instance_id, "updated_at": updated_at}
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SQL_TOUCH_CALLS_ACTIVE_SNAPSHOT, params)
+            return cur.rowcount > 0
+
 
 SQL_LIST_DECODE_RATE_LATEST = """
 SELECT
@@ -187,7 +327,9 @@ WHERE instance_id = %(instance_id)s
 
 SQL_SELECT_CALLS_ACTIVE_SNAPSHOT_LATEST = """
 SELECT
-    calls_json,
+    -- the raw payload only for legacy rows written before normalize-at-ingest
+    CASE WHEN calls_normalized_json IS NULL THEN calls_json END AS calls_json,
+    calls_normalized_json,
     active_calls_count,
     updated_at
 FROM tr_calls_active_snapshot_latest
@@ -238,3 +380,101 @@ async def select_calls_active_snapshot_latest(
             await cur.execute(SQL_SELECT_CALLS_ACTIVE_SNAPSHOT_LATEST, params)
             row = await cur.fetchone()
             return dict(row) if row else None
+
+
+# instance_ids = NULL selects every instance
+SQL_LIST_DECODE_RATE_LATEST_MANY = """
+SELECT
+    instance_id,
+    sys_num,
+    sys_name,
+    decoderate_pct,
+    decoderate_interval_s,
+    control_channel_hz,
+    updated_at
+FROM tr_decode_rate_latest
+WHERE %(instance_ids)s::text[] IS NULL OR instance_id = ANY(%(instance_ids)s::text[])
+"""
+
+SQL_LIST_RECORDERS_SNAPSHOT_LATEST_MANY = """
+SELECT
+    instance_id,
+    total_count,
+    recording_count,
+    idle_count,
+    available_count,
+    updated_at
+FROM tr_recorders_snapshot_latest
+WHERE %(instance_ids)s::text[] IS NULL OR instance_id = ANY(%(instance_ids)s::text[])
+"""
+
+SQL_LIST_CALLS_ACTIVE_SNAPSHOT_LATEST_MANY = """
+SELECT
+    instance_id,
+    -- the raw payload only for legacy rows written before normalize-at-ingest
+    CASE WHEN calls_normalized_json IS NULL THEN calls_json END AS calls_json,
+    calls_normalized_json,
+    active_calls_count,
+    updated_at
+FROM tr_calls_active_snapshot_latest
+WHERE %(instance_ids)s::text[] IS NULL OR instance_id = ANY(%(instance_ids)s::text[])
+"""
+
+SQL_LIST_CALLS_ACTIVE_COUNT_LATEST_MANY = """
+SELECT
+    instance_id,
+    active_calls_count,
+    updated_at
+FROM tr_calls_active_snapshot_latest
+WHERE %(instance_ids)s::text[] IS NULL OR instance_id = ANY(%(instance_ids)s::text[])
+"""
+
+
+async def select_traffic_latest(
+    pool: AsyncConnectionPool,
+    *,
+    instance_ids: list[str] | None = None,
+    include_calls: bool = True,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    """Decode rates, recorders and calls rows for many instances (None = all).
+
+    The three selects are pipelined on one connection: one checkout, one round
+    trip. ``include_calls=False`` returns only the calls counts, not the JSONB.
+    """
+    params = {"instance_ids": instance_ids}
+    calls_sql = (
+        SQL_LIST_CALLS_ACTIVE_SNAPSHOT_LATEST_MANY
+        if include_calls
+        else SQL_LIST_CALLS_ACTIVE_COUNT_LATEST_MANY
+    )
+    async with pool.connection() as conn:
+        async with (
+            conn.cursor(row_factory=dict_row) as decode_cur,
+            conn.cursor(row_factory=dict_row) as recorders_cur,
+            conn.cursor(row_factory=dict_row) as calls_cur,
+        ):
+            async with conn.pipeline():
+                await decode_cur.execute(SQL_LIST_DECODE_RATE_LATEST_MANY, params)
+                await recorders_cur.execute(SQL_LIST_RECORDERS_SNAPSHOT_LATEST_MANY, params)
+                await calls_cur.execute(calls_sql, params)
+            return (
+                list(await decode_cur.fetchall()),
+                list(await recorders_cur.fetchall()),
+                list(await calls_cur.fetchall()),
+            )
+
+
+async def select_traffic_summary_latest(
+    pool: AsyncConnectionPool,
+    *,
+    instance_id: str,
+) -> tuple[list[dict[str, Any]], dict[str, Any] | None, dict[str, Any] | None]:
+    """Decode rows, recorders row and calls count row of one instance in one round trip."""
+    decode_rows, recorders_rows, calls_rows = await select_traffic_latest(
+        pool, instance_ids=[instance_id], include_calls=False
+    )
+    return (
+        decode_rows,
+        recorders_rows[0] if recorders_rows else None,
+        calls_rows[0] if calls_rows else None,
+    )
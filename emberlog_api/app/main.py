@@ -2,19 +2,26 @@ import logging
 
 from fastapi import Depends, FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from psycopg_pool import AsyncConnectionPool
 
-from emberlog_api.app.api.v1.routers import incidents, sse, traffic
+from emberlog_api.app.api.v1.routers import incidents, outbox, sse, traffic
 from emberlog_api.app.db.pool import get_pool
 from emberlog_api.app.core.lifespan import lifespan
+from emberlog_api.app.core.metrics import CONTENT_TYPE_LATEST, REGISTRY
+from emberlog_api.utils.jsoncodec import CodecJSONResponse
 from emberlog_api.utils.loggersetup import configure_logging
 
 
 configure_logging()
 log = logging.getLogger("emberlog_api.app.main")
 
-app = FastAPI(lifespan=lifespan, title="Emberlog API", version="1.0.0")
+app = FastAPI(
+    lifespan=lifespan,
+    title="Emberlog API",
+    version="1.0.0",
+    default_response_class=CodecJSONResponse,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # tighten in prod
@@ -25,6 +32,7 @@ app.add_middleware(
 app.include_router(incidents.router, prefix="/api/v1")
 app.include_router(sse.router, prefix="/api/v1")
 app.include_router(traffic.router, prefix="/api/v1")
+app.include_router(outbox.router, prefix="/api/v1")
 
 
 async def check_db_connectivity(pool: AsyncConnectionPool) -> bool:
@@ -54,3 +62,9 @@ async def get_readyz(pool: AsyncConnectionPool = Depends(get_pool)) -> JSONRespo
         status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         content={"status": "not_ready", "reason": "db_unavailable"},
     )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """Prometheus text exposition of in-process metrics."""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
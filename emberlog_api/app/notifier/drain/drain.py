@@ -3,14 +3,69 @@ from __future__ import annotations
 import asyncio
 import logging
 import random
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Protocol
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 from psycopg.rows import dict_row
 from psycopg_pool import AsyncConnectionPool
 
+from emberlog_api.app.core.metrics import Counter, Gauge, Histogram
+
 log = logging.getLogger("emberlog_api.db.drain.OutboxDrain")
 
+T = TypeVar("T")
+
+OUTBOX_STATUSES = ("pending", "processing", "dead")
+LAG_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+OUTBOX_ROWS = Gauge(
+    "emberlog_outbox_rows", "incident_outbox rows by status", ["status"]
+)
+OUTBOX_CLAIM_SECONDS = Histogram(
+    "emberlog_outbox_claim_seconds", "Duration of the outbox claim query"
+)
+OUTBOX_CLAIMED_ROWS = Counter(
+    "emberlog_outbox_claimed_rows_total", "Rows claimed by the drain"
+)
+OUTBOX_HANDLER_SECONDS = Histogram(
+    "emberlog_outbox_handler_seconds",
+    "Delivery handler latency (one observation per call, batch or single)",
+    ["event_type"],
+)
+OUTBOX_DELIVERED = Counter(
+    "emberlog_outbox_delivered_total", "Rows delivered and deleted", ["event_type"]
+)
+OUTBOX_RETRIES = Counter(
+    "emberlog_outbox_retries_total", "Failed deliveries scheduled for retry", ["event_type"]
+)
+OUTBOX_DEAD = Counter(
+    "emberlog_outbox_dead_total", "Rows moved to the dead-letter state", ["event_type"]
+)
+OUTBOX_DEFERRED = Counter(
+    "emberlog_outbox_deferred_total",
+    "Rows put back without using a retry",
+    ["event_type", "reason"],
+)
+OUTBOX_DELIVERY_LAG_SECONDS = Histogram(
+    "emberlog_outbox_delivery_lag_seconds",
+    "Outbox created_at to successful delivery",
+    ["event_type"],
+    buckets=LAG_BUCKETS,
+)
+
 # ------------- Delivery Interface -------------------------------------------
 
 
@@ -18,20 +73,265 @@ class DeliveryError(Exception):
     """Raised by delivery handlers on non-transient errors (still retried up to max)."""
 
 
+class RouteDeferred(Exception):
+    """Raised by the Router when a route cannot take a row right now.
+
+    This is not a delivery failure: the drain puts the row back to pending
+    without consuming one of its retries.
+    """
+
+    def __init__(
+        self, event_type: str, reason: str, retry_after_s: Optional[float] = None
+    ):
+        super().__init__(f"route {event_type} deferred ({reason})")
+        self.event_type = event_type
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
 class DeliveryHandler(Protocol):
     async def __call__(self, event_type: str, payload: Dict[str, Any], /) -> None: ...
 
 
+class BatchDeliveryHandler(Protocol):
+    """Delivers many events in one call.
+
+    Returns one result per item, in order: None when delivered, otherwise the
+    exception for that item (it is retried on its own). Raising fails the whole batch.
+    """
+
+    async def __call__(
+        self, items: List[Tuple[str, Dict[str, Any]]], /
+    ) -> List[Optional[Exception]]: ...
+
+
+@dataclass
+class RoutePolicy:
+    """Per-event-type limits, so one slow channel cannot starve the others."""
+
+    max_concurrency: int = 5
+    rate_per_s: Optional[float] = None  # None = no rate limit
+    burst: int = 1
+    failure_threshold: Optional[int] = None  # None = no circuit breaker
+    reset_timeout_s: float = 30.0
+
+
+class TokenBucket:
+    def __init__(self, rate_per_s: float, burst: int):
+        self.rate_per_s = rate_per_s
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate_per_s
+        )
+        self._updated = now
+
+    def _needed(self, n: int) -> float:
+        # a batch larger than the burst waits for a full bucket and then runs
+        # the balance negative, so the long-run rate still holds
+        return min(float(n), self.capacity)
+
+    def try_take(self, n: int = 1) -> bool:
+        self._refill()
+        if self._tokens >= self._needed(n):
+            self._tokens -= n
+            return True
+        return False
+
+    def time_until_available(self, n: int = 1) -> float:
+        self._refill()
+        needed = self._needed(n)
+        if self._tokens >= needed:
+            return 0.0
+        return (needed - self._tokens) / self.rate_per_s
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures; open -> half_open after the
+    reset timeout, letting exactly one probe through; the probe closes or re-opens it."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout_s: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def retry_after_s(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout_s - time.monotonic())
+
+    def blocked(self) -> bool:
+        """True when allow() would refuse; has no side effects."""
+        if self.state == self.OPEN:
+            return self.retry_after_s() > 0.0
+        if self.state == self.HALF_OPEN:
+            return self._probe_in_flight
+        return False
+
+    def allow(self) -> bool:
+        if self.blocked():
+            return False
+        if self.state == self.OPEN:
+            self.state = self.HALF_OPEN
+            log.info("circuit %s half-open, probing", self.name)
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            log.info("circuit %s closed", self.name)
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_cancelled(self) -> None:
+        """The call never finished: no verdict, so let the next request probe."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                log.warning(
+                    "circuit %s open for %.1fs after %d failures",
+                    self.name,
+                    self.reset_timeout_s,
+                    self._failures,
+                )
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class _RouteState:
+    def __init__(self, event_type: str, policy: RoutePolicy):
+        self.policy = policy
+        self.sem = asyncio.Semaphore(policy.max_concurrency)
+        self.bucket = (
+            TokenBucket(policy.rate_per_s, policy.burst)
+            if policy.rate_per_s
+            else None
+        )
+        self.breaker = (
+            CircuitBreaker(event_type, policy.failure_threshold, policy.reset_timeout_s)
+            if policy.failure_threshold
+            else None
+        )
+
+    def saturated(self) -> bool:
+        if self.sem.locked():
+            return True
+        if self.breaker is not None and self.breaker.blocked():
+            return True
+        return self.bucket is not None and self.bucket.time_until_available() > 0.0
+
+
 # Example multiplexer for event types -> concrete channels
 class Router:
-    def __init__(self, routes: Dict[str, DeliveryHandler]):
+    def __init__(
+        self,
+        routes: Dict[str, DeliveryHandler],
+        policies: Optional[Dict[str, RoutePolicy]] = None,
+        batch_routes: Optional[Dict[str, BatchDeliveryHandler]] = None,
+    ):
         self.routes = routes
+        self.batch_routes = batch_routes or {}
+        self._states: Dict[str, _RouteState] = {
+            event_type: _RouteState(event_type, policy)
+            for event_type, policy in (policies or {}).items()
+        }
+
+    def unavailable_event_types(self) -> List[str]:
+        """Event types that cannot take another row right now (skip when claiming)."""
+        return [et for et, state in self._states.items() if state.saturated()]
+
+    def has_batch(self, event_type: str) -> bool:
+        return event_type in self.batch_routes
 
     async def deliver(self, event_type: str, payload: Dict[str, Any]) -> None:
         handler = self.routes.get(event_type)
         if not handler:
             raise DeliveryError(f"No handler for event_type={event_type}")
-        await handler(event_type, payload)
+        await self._guarded(event_type, lambda: handler(event_type, payload))
+
+    async def deliver_batch(
+        self, event_type: str, payloads: List[Dict[str, Any]]
+    ) -> List[Optional[Exception]]:
+        """Deliver several rows of one event type; a batch takes one slot and a token per row."""
+        handler = self.batch_routes.get(event_type)
+        if not handler:
+            raise DeliveryError(f"No batch handler for event_type={event_type}")
+        items = [(event_type, payload) for payload in payloads]
+        results = await self._guarded(
+            event_type, lambda: handler(items), tokens=len(items)
+        )
+        if len(results) != len(items):
+            raise DeliveryError(
+                f"batch handler returned {len(results)} results for {len(items)} items"
+            )
+        return results
+
+    async def _guarded(
+        self, event_type: str, call: Callable[[], Awaitable[T]], tokens: int = 1
+    ) -> T:
+        state = self._states.get(event_type)
+        if state is None:
+            return await call()
+
+        # Check and acquire without awaiting in between, so a saturated route
+        # never parks a row (and a drain slot) behind its semaphore.
+        if state.sem.locked():
+            raise RouteDeferred(event_type, "concurrency")
+        if state.bucket is not None and state.bucket.time_until_available(tokens) > 0.0:
+            raise RouteDeferred(
+                event_type, "rate", state.bucket.time_until_available(tokens)
+            )
+        breaker = state.breaker
+        if breaker is not None and not breaker.allow():
+            raise RouteDeferred(event_type, "circuit_open", breaker.retry_after_s())
+        if state.bucket is not None:
+            state.bucket.try_take(tokens)
+
+        async with state.sem:
+            try:
+                result = await call()
+            except DeliveryError:
+                # non-transient, says nothing about the channel's health
+                if breaker is not None and breaker.state == CircuitBreaker.HALF_OPEN:
+                    breaker.record_success()
+                raise
+            except Exception as e:
+                if breaker is None:
+                    raise
+                breaker.record_failure()
+                if breaker.state == CircuitBreaker.OPEN:
+                    # the channel is down: don't burn this row's retries on it
+                    raise RouteDeferred(
+                        event_type, "circuit_open", breaker.retry_after_s()
+                    ) from e
+                raise
+            except BaseException:
+                # cancelled (e.g. drain shutdown): a half-open probe must not
+                # stay "in flight" and block the route forever
+                if breaker is not None:
+                    breaker.record_cancelled()
+                raise
+            if breaker is not None:
+                breaker.record_success()
+            return result
 
 
 # ------------- Concrete Handlers (stubs you can wire up) --------------------
@@ -65,6 +365,8 @@ class OutboxDrainConfig:
     max_concurrency: int = 5
     batch_size: int = 5
     jitter_s: float = 0.5
+    defer_s: float = 0.5  # re-check delay for rows of a saturated route
+    stats_interval_s: float = 15.0  # how often the backlog gauges are refreshed
 
 
 class OutboxDrain:
@@ -76,6 +378,8 @@ class OutboxDrain:
         self._log = logging.getLogger("emberlog_api.notifier.drain.OutboxDrain")
         self._sem = asyncio.Semaphore(self.cfg.max_concurrency)
         self._task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._next_stats_at = 0.0
         self.router = router
 
     async def start(self) -> None:
@@ -94,30 +398,73 @@ class OutboxDrain:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        # let claimed rows finish so they are not left in 'processing'
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
         self._log.info("Outbox drain stopped")
 
     async def _main_loop(self) -> None:
         try:
             while not self._stop.is_set():
-                rows = await self._claim_rows(limit=self.cfg.batch_size)
+                if time.monotonic() >= self._next_stats_at:
+                    await self._refresh_backlog_stats()
+                free = self.cfg.max_concurrency - len(self._inflight)
+                if free <= 0:
+                    await asyncio.wait(
+                        self._inflight, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    continue
+                rows = await self._claim_rows(
+                    limit=min(self.cfg.batch_size, free),
+                    skip_event_types=self.router.unavailable_event_types(),
+                )
                 if not rows:
                     await asyncio.sleep(self.cfg.poll_sleep_s)
                     continue
-                tasks = [asyncio.create_task(self._process_row(row)) for row in rows]
-                await asyncio.gather(*tasks)
+                # Don't wait for the whole batch: a slow route must not hold
+                # back claiming rows for the fast ones.
+                batches: Dict[str, List[Dict[str, Any]]] = {}
+                for row in rows:
+                    if self.router.has_batch(row["event_type"]):
+                        batches.setdefault(row["event_type"], []).append(row)
+                    else:
+                        self._spawn(self._process_row(row))
+                for event_type, batch in batches.items():
+                    self._spawn(self._process_batch(event_type, batch))
         except asyncio.CancelledError:
             self._log.info("Outbound Drain Loop Cancelled")
         except Exception:
             self._log.exception("Drain Loop Crashed")
             raise
 
-    async def _claim_rows(self, limit: int):
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _refresh_backlog_stats(self) -> None:
+        self._next_stats_at = time.monotonic() + self.cfg.stats_interval_s
+        try:
+            async with self._pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        "SELECT status, count(*) FROM incident_outbox GROUP BY status;"
+                    )
+                    counts = dict(await cur.fetchall())
+        except Exception:
+            self._log.exception("failed to read outbox backlog counts")
+            return
+        for status in OUTBOX_STATUSES:
+            OUTBOX_ROWS.set(counts.get(status, 0), status=status)
+
+    async def _claim_rows(self, limit: int, skip_event_types: List[str]):
         sql = """
             WITH cte AS (
                 SELECT id
                 FROM incident_outbox
                 WHERE status = 'pending'
                     AND available_at <= now()
+                    AND event_type <> ALL(%s::text[])
                 ORDER BY id
                 FOR UPDATE SKIP LOCKED
                 LIMIT %s
@@ -126,36 +473,120 @@ class OutboxDrain:
             SET status = 'processing'
             FROM cte
             WHERE o.id = cte.id
-            RETURNING o.id, o.event_type, o.payload, o.attempts;
+            RETURNING o.id, o.event_type, o.payload, o.attempts, o.created_at;
         """
+        started = time.perf_counter()
         async with self._pool.connection() as conn:
             async with conn.cursor(row_factory=dict_row) as cur:
-                await cur.execute(sql, (limit,))
-                return await cur.fetchall()
+                await cur.execute(sql, (skip_event_types, limit))
+                rows = await cur.fetchall()
+        OUTBOX_CLAIM_SECONDS.observe(time.perf_counter() - started)
+        OUTBOX_CLAIMED_ROWS.inc(len(rows))
+        return rows
 
     async def _process_row(self, row: Dict[str, Any]) -> None:
         async with self._sem:
-            oid = row["id"]
             event_type = row["event_type"]
             payload = row["payload"]
-            retry_count = row["attempts"]
+            started = time.perf_counter()
             try:
                 await self.router.deliver(event_type, payload)
+            except RouteDeferred as e:
+                await self._on_deferred([row], e)
+                return
+            except Exception as e:
+                OUTBOX_HANDLER_SECONDS.observe(
+                    time.perf_counter() - started, event_type=event_type
+                )
+                await self._on_failure(row, e)
+                return
+            OUTBOX_HANDLER_SECONDS.observe(
+                time.perf_counter() - started, event_type=event_type
+            )
+            await self._on_success([row])
+
+    async def _process_batch(
+        self, event_type: str, rows: List[Dict[str, Any]]
+    ) -> None:
+        async with self._sem:
+            started = time.perf_counter()
+            try:
+                results = await self.router.deliver_batch(
+                    event_type, [row["payload"] for row in rows]
+                )
+            except RouteDeferred as e:
+                await self._on_deferred(rows, e)
+                return
             except Exception as e:
-                await self._on_failure(oid, retry_count, e)
+                OUTBOX_HANDLER_SECONDS.observe(
+                    time.perf_counter() - started, event_type=event_type
+                )
+                for row in rows:
+                    await self._on_failure(row, e)
                 return
-            await self._on_success(oid)
+            OUTBOX_HANDLER_SECONDS.observe(
+                time.perf_counter() - started, event_type=event_type
+            )
+
+            delivered = [row for row, err in zip(rows, results) if err is None]
+            if delivered:
+                await self._on_success(delivered)
+            for row, err in zip(rows, results):
+                if err is not None:
+                    await self._on_failure(row, err)
 
-    async def _on_success(self, oid: int) -> None:
+    async def _on_success(self, rows: List[Dict[str, Any]]) -> None:
+        oids = [row["id"] for row in rows]
         async with self._pool.connection() as conn:
             async with conn.cursor() as cur:
-                await cur.execute("DELETE FROM incident_outbox WHERE id = %s;", (oid,))
-        self._log.debug("outbox %s delivered -> deleted", oid)
+                await cur.execute(
+                    "DELETE FROM incident_outbox WHERE id = ANY(%s);", (oids,)
+                )
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            OUTBOX_DELIVERED.inc(event_type=row["event_type"])
+            created_at = row.get("created_at")
+            if isinstance(created_at, datetime):
+                OUTBOX_DELIVERY_LAG_SECONDS.observe(
+                    (now - created_at).total_seconds(), event_type=row["event_type"]
+                )
+        self._log.debug("outbox %s delivered -> deleted", oids)
+
+    async def _on_deferred(
+        self, rows: List[Dict[str, Any]], deferred: RouteDeferred
+    ) -> None:
+        # back to pending without touching attempts / last_error
+        oids = [row["id"] for row in rows]
+        OUTBOX_DEFERRED.inc(
+            len(rows), event_type=deferred.event_type, reason=deferred.reason
+        )
+        delay = max(deferred.retry_after_s or 0.0, self.cfg.defer_s)
+        async with self._pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    UPDATE incident_outbox
+                       SET status='pending',
+                           available_at = now() + make_interval(secs => %s)
+                     WHERE id = ANY(%s);
+                    """,
+                    (delay, oids),
+                )
+        self._log.debug(
+            "outbox %s deferred %.2fs (%s %s)",
+            oids,
+            delay,
+            deferred.event_type,
+            deferred.reason,
+        )
 
-    async def _on_failure(self, oid: int, retry_count: int, err: Exception) -> None:
+    async def _on_failure(self, row: Dict[str, Any], err: Exception) -> None:
+        oid = row["id"]
+        retry_count = row["attempts"]
         next_retry = retry_count + 1
         # dead-letter
         if next_retry > self.cfg.max_retries:
+            OUTBOX_DEAD.inc(event_type=row["event_type"])
             async with self._pool.connection() as conn:
                 async with conn.cursor() as cur:
                     await cur.execute(
@@ -167,6 +598,7 @@ class OutboxDrain:
             )
             return
 
+        OUTBOX_RETRIES.inc(event_type=row["event_type"])
         delay = self._compute_backoff(next_retry)
         async with self._pool.connection() as conn:
             async with conn.cursor() as cur:
@@ -1,32 +1,82 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from emberlog_api.app.core.metrics import Histogram
 from emberlog_api.app.core.settings import settings
+from emberlog_api.app.notifier.drain.drain import DeliveryError
 
 import httpx
 
 log = logging.getLogger("emberlog_api.notifier.client")
 
+NOTIFIER_REQUEST_SECONDS = Histogram(
+    "emberlog_notifier_request_seconds",
+    "Notifier HTTP request latency",
+    ["path", "status"],
+)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
 
 class NotifierClient:
-    def __init__(self):
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        http2 = settings.notifier_http2
+        if http2 and not _http2_available():
+            log.warning("NOTIFIER_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+            http2 = False
         self._client = httpx.AsyncClient(
             base_url=settings.notifier_base_url,
             headers={
                 "Accept": "application/json",
                 "Content-Type": "application/json",
             },
+            limits=httpx.Limits(
+                max_connections=settings.notifier_max_connections,
+                max_keepalive_connections=settings.notifier_max_keepalive_connections,
+                keepalive_expiry=settings.notifier_keepalive_expiry_s,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.notifier_connect_timeout_s,
+                read=settings.notifier_read_timeout_s,
+                write=settings.notifier_write_timeout_s,
+                pool=settings.notifier_pool_timeout_s,
+            ),
+            http2=http2,
+            transport=transport,
         )
 
     async def close(self) -> None:
         await self._client.aclose()
 
+    async def _post(self, path: str, body: Any) -> httpx.Response:
+        started = time.perf_counter()
+        status: int | str = "error"
+        try:
+            r = await self._client.post(path, json=body)
+            status = r.status_code
+            return r
+        finally:
+            elapsed_s = time.perf_counter() - started
+            elapsed_ms = elapsed_s * 1000.0
+            NOTIFIER_REQUEST_SECONDS.observe(elapsed_s, path=path, status=status)
+            log.debug(
+                "notifier request",
+                extra={"path": path, "status": status, "latency_ms": round(elapsed_ms, 2)},
+            )
+
     async def on_new_incident(self, event_type: str, payload: Dict[str, Any]):
         log.debug("Notifier Calls for new incident (Type:%s)", event_type)
         try:
             log.debug("Posting to Notifier Service")
-            r = await self._client.post("/api/v1/events/new_incident", json=payload)
+            r = await self._post("/api/v1/events/new_incident", payload)
             r.raise_for_status()
             log.debug("Status: %s", r.status_code)
         except httpx.HTTPStatusError as e:
@@ -36,3 +86,38 @@ class NotifierClient:
         data = r.json()
         log.debug("Result: %s", data)
 
+    async def on_new_incidents(
+        self, items: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Optional[Exception]]:
+        """Post several events in one request; one result per item, in order."""
+        log.debug("Notifier batch call for %d events", len(items))
+        body = {
+            "events": [
+                {"event_type": event_type, "payload": payload}
+                for event_type, payload in items
+            ]
+        }
+        try:
+            r = await self._post("/api/v1/events/new_incident/batch", body)
+            r.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            detail = e.response.text
+            log.error("API Error %s:%s", e.response.status_code, detail)
+            raise
+        results = r.json().get("results")
+        if not isinstance(results, list) or len(results) != len(items):
+            raise DeliveryError("notifier batch response does not match request")
+
+        out: List[Optional[Exception]] = []
+        for result in results:
+            if isinstance(result, dict) and result.get("ok"):
+                out.append(None)
+            else:
+                error = result.get("error") if isinstance(result, dict) else None
+                out.append(DeliveryError(error or "notifier rejected event"))
+        log.debug(
+            "Batch result: %d delivered, %d failed",
+            out.count(None),
+            len(out) - out.count(None),
+        )
+        return out
@@ -0,0 +1,55 @@
+"""
+Local stand-in for emberlog-notifier, for exercising the outbox drain.
+
+    uvicorn emberlog_api.app.notifier.stub:app --port 8090
+
+Events whose payload has an incident_id listed in ``fail_incident_ids`` are
+rejected, so per-item batch failures can be tested.
+"""
+
+import logging
+from typing import Any
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+log = logging.getLogger("emberlog_api.notifier.stub")
+
+app = FastAPI(title="Emberlog Notifier Stub")
+
+received: list[dict[str, Any]] = []
+fail_incident_ids: set[Any] = set()
+
+
+class StubEvent(BaseModel):
+    event_type: str
+    payload: dict[str, Any]
+
+
+class StubBatchIn(BaseModel):
+    events: list[StubEvent]
+
+
+def _accept(event_type: str, payload: dict[str, Any]) -> dict[str, Any]:
+    incident_id = payload.get("incident_id") or payload.get("id")
+    if incident_id is not None and incident_id in fail_incident_ids:
+        return {"ok": False, "error": f"stub rejected incident {incident_id}"}
+    received.append({"event_type": event_type, "payload": payload})
+    return {"ok": True}
+
+
+@app.post("/api/v1/events/new_incident")
+async def new_incident(payload: dict[str, Any]) -> dict[str, Any]:
+    return _accept("incident.created", payload)
+
+
+@app.post("/api/v1/events/new_incident/batch")
+async def new_incident_batch(batch: StubBatchIn) -> dict[str, Any]:
+    results = [_accept(event.event_type, event.payload) for event in batch.events]
+    log.info("stub batch: %d events", len(results))
+    return {"results": results}
+
+
+@app.get("/stub/events")
+async def list_received() -> dict[str, Any]:
+    return {"events": received}
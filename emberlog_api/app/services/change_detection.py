@@ -0,0 +1,48 @@
+"""
+Change detection for latest-only traffic snapshots.
+
+Trunk Recorder republishes ``recorders`` and ``calls_active`` every few seconds
+even when nothing changed. The consumer hashes each payload (minus its
+timestamp) and compares it with the last one it stored for that instance:
+
+- changed            -> "write" the full row
+- unchanged, fresh   -> "skip" (the stored row was written < freshness_s ago)
+- unchanged, stale   -> "touch" updated_at only, so last-seen times keep moving
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from typing import Any, Dict, Iterable, Literal, Tuple
+
+WriteMode = Literal["write", "touch", "skip"]
+
+
+def payload_digest(payload: dict[str, Any], ignore: Iterable[str] = ("timestamp",)) -> bytes:
+    ignored = set(ignore)
+    body = {k: v for k, v in payload.items() if k not in ignored}
+    encoded = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).digest()
+
+
+class SnapshotChangeDetector:
+    def __init__(self, freshness_s: float):
+        self.freshness_s = freshness_s
+        self._last: Dict[Tuple[str, str], Tuple[bytes, float]] = {}
+
+    def classify(self, kind: str, instance_id: str, digest: bytes) -> WriteMode:
+        previous = self._last.get((kind, instance_id))
+        if previous is None or previous[0] != digest:
+            return "write"
+        if time.monotonic() - previous[1] < self.freshness_s:
+            return "skip"
+        return "touch"
+
+    def record(self, kind: str, instance_id: str, digest: bytes) -> None:
+        """Remember what is now stored; call only after the write succeeded."""
+        self._last[(kind, instance_id)] = (digest, time.monotonic())
+
+    def clear(self) -> None:
+        self._last.clear()
@@ -0,0 +1,59 @@
+"""
+Keyed keep-latest queue between the MQTT receive loop and the DB writers.
+
+The traffic tables only hold the latest snapshot per (topic, instance), so when
+writers fall behind an older pending message is simply replaced by the newer
+one. A key that is being written is not handed to a second writer until
+``done()`` is called, which keeps writes for one key in order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, Generic, Hashable, Literal, Set, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+PutResult = Literal["queued", "coalesced", "dropped"]
+
+
+class CoalescingQueue(Generic[K, V]):
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._pending: Dict[K, V] = {}
+        self._ready: asyncio.Queue[K] = asyncio.Queue()
+        self._inflight: Set[K] = set()
+        self.coalesced = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, key: K, value: V) -> PutResult:
+        """Store the newest value for ``key``; never blocks.
+
+        "coalesced" means an older pending value was replaced; "dropped" means a
+        new key arrived while ``max_keys`` keys were already pending.
+        """
+        if key in self._pending:
+            self._pending[key] = value
+            self.coalesced += 1
+            return "coalesced"
+        if len(self._pending) >= self.max_keys:
+            self.dropped += 1
+            return "dropped"
+        self._pending[key] = value
+        if key not in self._inflight:
+            self._ready.put_nowait(key)
+        return "queued"
+
+    async def get(self) -> Tuple[K, V]:
+        key = await self._ready.get()
+        self._inflight.add(key)
+        return key, self._pending.pop(key)
+
+    def done(self, key: K) -> None:
+        self._inflight.discard(key)
+        if key in self._pending:
+            self._ready.put_nowait(key)
@@ -0,0 +1,91 @@
+"""
+Decode-rate history: sink for rates messages plus partition/retention upkeep.
+
+Raw samples live in daily partitions of ``tr_decode_rate_history`` and are kept
+for ``decode_history_raw_retention_days``; charts read the 1m/5m/1h rollups,
+each with its own retention. Maintenance is a leader-elected background job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from psycopg_pool import AsyncConnectionPool
+
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.repositories import decode_history as history_repo
+
+log = logging.getLogger("emberlog_api.services.decode_history")
+
+
+def rollup_retention() -> dict[str, timedelta]:
+    return {
+        "1m": timedelta(days=settings.decode_history_1m_retention_days),
+        "5m": timedelta(days=settings.decode_history_5m_retention_days),
+        "1h": timedelta(days=settings.decode_history_1h_retention_days),
+    }
+
+
+async def record_decode_history(
+    pool: AsyncConnectionPool,
+    *,
+    instance_id: str,
+    rates: list[dict[str, Any]],
+    recorded_at: datetime,
+) -> None:
+    """Append one rates message to the history; failures are logged, not raised."""
+    if not settings.decode_history_enabled or not rates:
+        return
+    try:
+        await history_repo.insert_decode_history(
+            pool, instance_id=instance_id, rates=rates, recorded_at=recorded_at
+        )
+    except Exception:
+        log.exception(
+            "failed to record decode rate history",
+            extra={"instance_id": instance_id, "rates_count": len(rates)},
+        )
+
+
+async def maintain_decode_history(
+    pool: AsyncConnectionPool, *, now: datetime | None = None
+) -> None:
+    """Create upcoming partitions and apply raw and rollup retention."""
+    now = now or datetime.now(timezone.utc)
+    today = now.date()
+
+    await history_repo.ensure_decode_history_partitions(
+        pool,
+        start=today - timedelta(days=1),
+        days=settings.decode_history_partitions_ahead_days + 2,
+    )
+    dropped = await history_repo.drop_decode_history_partitions(
+        pool,
+        before=today - timedelta(days=settings.decode_history_raw_retention_days),
+    )
+
+    deleted: dict[str, int] = {}
+    for resolution, keep in rollup_retention().items():
+        deleted[resolution] = await history_repo.delete_decode_rollup_before(
+            pool, resolution=resolution, before=now - keep
+        )
+
+    log.info(
+        "decode history maintenance complete",
+        extra={"dropped_partitions": dropped, "deleted_rollup_rows": deleted},
+    )
+
+
+async def run_decode_history_maintenance(pool: AsyncConnectionPool) -> None:
+    """Run maintenance now and then every ``decode_history_maintenance_interval_s``."""
+    while True:
+        try:
+            await maintain_decode_history(pool)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("decode history maintenance failed")
+        await asyncio.sleep(settings.decode_history_maintenance_interval_s)
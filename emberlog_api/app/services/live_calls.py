@@ -0,0 +1,102 @@
+"""
+Normalization of Trunk Recorder ``calls_active`` payloads into live-call records.
+
+Runs once per snapshot in the MQTT consumer; the records (plain dicts with the
+``TrafficLiveCallOut`` fields) are stored next to the raw payload so the
+``/traffic/live-calls`` endpoint only filters them.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Any
+
+
+def to_iso_z(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    dt = value.astimezone(UTC)
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def group_from_sys_name(sys_name: str) -> str:
+    return sys_name.split("-", 1)[0] if sys_name else ""
+
+
+def _int_or_none(value: Any) -> int | None:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _str_or_none(value: Any) -> str | None:
+    return str(value) if value is not None else None
+
+
+def normalize_live_call(call: dict[str, Any]) -> dict[str, Any]:
+    """One raw call -> live-call record, plus ``started_at_epoch`` for sorting."""
+    sys_name = str(call.get("sys_name") or "")
+
+    started_at_epoch: float | None = None
+    started_at: str | None = None
+    start_epoch_raw = call.get("start_time")
+    if start_epoch_raw is not None:
+        try:
+            started_at_epoch = float(start_epoch_raw)
+            started_at = to_iso_z(datetime.fromtimestamp(started_at_epoch, tz=UTC))
+        except (TypeError, ValueError, OSError):
+            started_at_epoch = None
+            started_at = None
+
+    freq_raw = call.get("freq")
+    try:
+        freq_mhz = float(freq_raw) / 1_000_000.0 if freq_raw is not None else None
+    except (TypeError, ValueError):
+        freq_mhz = None
+
+    src_num = _int_or_none(call.get("src_num"))
+    rec_num = _int_or_none(call.get("rec_num"))
+
+    return {
+        "id": str(call.get("id") or ""),
+        "started_at": started_at,
+        "started_at_epoch": started_at_epoch,
+        "elapsed_s": _int_or_none(call.get("elapsed")) or 0,
+        "sys_num": _int_or_none(call.get("sys_num")),
+        "sys_name": sys_name,
+        "group": group_from_sys_name(sys_name),
+        "talkgroup_id": _int_or_none(call.get("talkgroup")),
+        "talkgroup": _str_or_none(call.get("talkgroup_alpha_tag")),
+        "description": _str_or_none(call.get("talkgroup_description")),
+        "category": _str_or_none(call.get("talkgroup_group")),
+        "tag": _str_or_none(call.get("talkgroup_tag")),
+        "freq_mhz": freq_mhz,
+        "encrypted": bool(call.get("encrypted", False)),
+        "emergency": bool(call.get("emergency", False)),
+        "phase2_tdma": bool(call.get("phase2_tdma", False)),
+        "tdma_slot": _int_or_none(call.get("tdma_slot")),
+        "unit": _int_or_none(call.get("unit")),
+        "src_num": src_num,
+        "rec_num": rec_num,
+        "recorder_id": (
+            f"{src_num}_{rec_num}" if src_num is not None and rec_num is not None else None
+        ),
+    }
+
+
+def normalize_live_calls(calls: list[Any]) -> list[dict[str, Any]]:
+    """Normalize a snapshot's calls, newest first (started_at, else elapsed)."""
+    records = [normalize_live_call(call) for call in calls if isinstance(call, dict)]
+    records.sort(
+        key=lambda item: (
+            item["started_at_epoch"] is not None,
+            item["started_at_epoch"]
+            if item["started_at_epoch"] is not None
+            else float(item["elapsed_s"]),
+        ),
+        reverse=True,
+    )
+    return records
@@ -1,26 +1,140 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
+import time
+from dataclasses import asdict, replace
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from psycopg_pool import AsyncConnectionPool
 
+from emberlog_api.app.core.metrics import Counter, Gauge, Histogram
 from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.repositories import talkgroups as talkgroups_repo
 from emberlog_api.app.db.repositories import traffic as traffic_repo
+from emberlog_api.app.services.change_detection import (
+    SnapshotChangeDetector,
+    payload_digest,
+)
+from emberlog_api.app.services.coalescing import CoalescingQueue
+from emberlog_api.app.services.decode_history import record_decode_history
+from emberlog_api.app.services.live_calls import normalize_live_calls
+from emberlog_api.app.services.mqtt_topics import build_topic_routes
+from emberlog_api.app.services.talkgroup_catalog import talkgroup_catalog
+from emberlog_api.app.services.traffic_state import traffic_state
+from emberlog_api.utils import jsoncodec
 
 log = logging.getLogger("emberlog_api.services.mqtt_consumer")
 
-def _topic(topic_suffix: str) -> str:
-    return f"{settings.mqtt_topic_prefix}/{topic_suffix}"
+MQTT_MESSAGES = Counter(
+    "emberlog_mqtt_messages_total", "MQTT messages dispatched to a handler", ["kind"]
+)
+MQTT_HANDLER_SECONDS = Histogram(
+    "emberlog_mqtt_handler_seconds", "Time spent in an MQTT message handler", ["kind"]
+)
+MQTT_PARSE_FAILURES = Counter(
+    "emberlog_mqtt_parse_failures_total",
+    "MQTT messages rejected before reaching the database",
+    ["reason"],
+)
+MQTT_UPSERT_FAILURES = Counter(
+    "emberlog_mqtt_upsert_failures_total", "Failed snapshot writes by kind", ["kind"]
+)
+MQTT_RECONNECTS = Counter(
+    "emberlog_mqtt_reconnects_total", "MQTT broker connections lost or refused"
+)
+MQTT_RECONNECT_BACKOFF_SECONDS = Gauge(
+    "emberlog_mqtt_reconnect_backoff_seconds",
+    "Current delay before the next broker reconnect; 0 while connected",
+)
+# instance_id comes from the payload, so it is not a label (unbounded series)
+MQTT_INGEST_LAG_SECONDS = Histogram(
+    "emberlog_mqtt_ingest_lag_seconds",
+    "Wall clock minus payload timestamp when a message is handled",
+    ["kind"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+# ...and the latest lag per instance, for at most MQTT_LAG_MAX_INSTANCES of them
+MQTT_INSTANCE_INGEST_LAG_SECONDS = Gauge(
+    "emberlog_mqtt_instance_ingest_lag_seconds",
+    "Wall clock minus payload timestamp of the last message handled, per instance",
+    ["instance_id"],
+)
+_lag_instance_ids: set[str] = set()
+MQTT_COALESCED = Counter(
+    "emberlog_mqtt_coalesced_total",
+    "MQTT messages replaced by a newer one before being written",
+)
+MQTT_DROPPED = Counter(
+    "emberlog_mqtt_dropped_total", "MQTT messages dropped because the write queue was full"
+)
+MQTT_SNAPSHOT_WRITES = Counter(
+    "emberlog_mqtt_snapshot_writes_total",
+    "Snapshot messages by outcome: full write, updated_at touch, or skipped as unchanged",
+    ["kind", "mode"],
+)
+
+change_detector = SnapshotChangeDetector(settings.mqtt_snapshot_freshness_s)
+
+topic_routes = build_topic_routes(
+    settings.mqtt_topic_prefix,
+    {
+        "rates": settings.rates_topic_suffix,
+        "recorders": settings.recorders_topic_suffix,
+        "calls_active": settings.calls_active_topic_suffix,
+    },
+    wildcard=settings.mqtt_topic_wildcard,
+    shared_group=settings.mqtt_shared_group,
+)
 
 
 def _updated_at_from_timestamp(timestamp: Any) -> datetime:
     return datetime.fromtimestamp(float(timestamp), tz=timezone.utc)
 
 
+async def _suppress_unchanged(
+    kind: str,
+    instance_id: str,
+    digest: bytes,
+    touch: Callable[[], Awaitable[bool]],
+    touch_state: Callable[[], None],
+) -> bool:
+    """Skip or touch an unchanged snapshot; True when the full write is not needed.
+
+    ``touch`` moves updated_at in Postgres and returns False when no row was
+    updated; ``touch_state`` moves it in this process's traffic state only.
+    """
+    if settings.mqtt_shared_group:
+        # other replicas write this instance too, so "unchanged since my last
+        # write" says nothing about what Postgres holds: always write
+        return False
+    mode = change_detector.classify(kind, instance_id, digest)
+    if mode == "write":
+        return False
+    if mode == "touch":
+        try:
+            touched = await touch()
+        except Exception:
+            MQTT_UPSERT_FAILURES.inc(kind=kind)
+            log.exception(
+                "failed to touch %s snapshot", kind, extra={"instance_id": instance_id}
+            )
+            return True
+        if not touched:
+            # the row is gone or the guard rejected it: rewrite it in full
+            return False
+        change_detector.record(kind, instance_id, digest)
+    # skipped or not, last-seen times and validators follow the message
+    touch_state()
+    MQTT_SNAPSHOT_WRITES.inc(kind=kind, mode=mode)
+    log.debug(
+        "unchanged snapshot suppressed",
+        extra={"instance_id": instance_id, "kind": kind, "mode": mode},
+    )
+    return True
+
+
 def _decode_rate_pct(decoderate: float) -> float:
     decode_pct = (decoderate / settings.max_decoderate) * 100.0 if settings.max_decoderate > 1.0 else decoderate
     return decode_pct
@@ -35,6 +149,7 @@ async def handle_rates_message(pool: AsyncConnectionPool, payload: dict[str, Any
         log.error("rates payload missing list field", extra={"instance_id": instance_id})
         return
 
+    valid_rates: list[dict[str, Any]] = []
     for item in rates:
         if not isinstance(item, dict):
             log.error("rates item is not an object", extra={"instance_id": instance_id})
@@ -42,41 +157,74 @@ async def handle_rates_message(pool: AsyncConnectionPool, payload: dict[str, Any
 
         try:
             decoderate_raw = float(item["decoderate"])
-            decoderate_pct = _decode_rate_pct(decoderate_raw)
             control_channel = item.get("control_channel")
-            control_channel_hz = (
-                int(control_channel) if control_channel is not None else None
-            )
-
-            await traffic_repo.upsert_decode_rate(
-                pool,
-                instance_id=instance_id,
-                sys_num=int(item["sys_num"]),
-                sys_name=str(item["sys_name"]),
-                decoderate_raw=decoderate_raw,
-                decoderate_pct=decoderate_pct,
-                decoderate_interval_s=(
-                    float(item["decoderate_interval"])
-                    if item.get("decoderate_interval") is not None
-                    else None
-                ),
-                control_channel_hz=control_channel_hz,
-                updated_at=updated_at,
-            )
-            log.debug(
-                "processed rates message",
-                extra={
-                    "instance_id": instance_id,
+            valid_rates.append(
+                {
+                    "sys_num": int(item["sys_num"]),
                     "sys_name": str(item["sys_name"]),
-                    "decode_rate_pct": decoderate_pct,
-                },
+                    "decoderate_raw": decoderate_raw,
+                    "decoderate_pct": _decode_rate_pct(decoderate_raw),
+                    "decoderate_interval_s": (
+                        float(item["decoderate_interval"])
+                        if item.get("decoderate_interval") is not None
+                        else None
+                    ),
+                    "control_channel_hz": (
+                        int(control_channel) if control_channel is not None else None
+                    ),
+                }
             )
         except Exception:
             log.exception(
-                "failed to upsert decode rate",
+                "skipping malformed rate item",
                 extra={"instance_id": instance_id, "rate_item": item},
             )
 
+    if not valid_rates:
+        return
+
+    try:
+        await traffic_repo.upsert_decode_rates(
+            pool,
+            instance_id=instance_id,
+            rates=valid_rates,
+            updated_at=updated_at,
+        )
+    except Exception:
+        # isolate the offending row(s) instead of losing the whole message
+        log.exception(
+            "bulk decode rate upsert failed; retrying per item",
+            extra={"instance_id": instance_id, "rates_count": len(valid_rates)},
+        )
+        stored_rates: list[dict[str, Any]] = []
+        for rate in valid_rates:
+            try:
+                await traffic_repo.upsert_decode_rate(
+                    pool, instance_id=instance_id, updated_at=updated_at, **rate
+                )
+            except Exception:
+                MQTT_UPSERT_FAILURES.inc(kind="rates")
+                log.exception(
+                    "failed to upsert decode rate",
+                    extra={"instance_id": instance_id, "rate_item": rate},
+                )
+                continue
+            stored_rates.append(rate)
+        # only rows that reached the latest table go to the store and the history
+        valid_rates = stored_rates
+        if not valid_rates:
+            return
+
+    traffic_state.apply_decode_rates(instance_id, valid_rates, updated_at)
+    await record_decode_history(
+        pool, instance_id=instance_id, rates=valid_rates, recorded_at=updated_at
+    )
+
+    log.debug(
+        "processed rates message",
+        extra={"instance_id": instance_id, "rates_count": len(valid_rates)},
+    )
+
 
 async def handle_recorders_message(
     pool: AsyncConnectionPool, payload: dict[str, Any]
@@ -91,6 +239,21 @@ async def handle_recorders_message(
         )
         return
 
+    async def touch() -> bool:
+        return await traffic_repo.touch_recorders_snapshot(
+            pool, instance_id=instance_id, updated_at=updated_at
+        )
+
+    digest = payload_digest(payload)
+    if await _suppress_unchanged(
+        "recorders",
+        instance_id,
+        digest,
+        touch,
+        lambda: traffic_state.touch_recorders(instance_id, updated_at),
+    ):
+        return
+
     total_count = len(recorders)
     recording_count = sum(
         1
@@ -109,7 +272,7 @@ async def handle_recorders_message(
     )
 
     try:
-        await traffic_repo.upsert_recorders_snapshot(
+        applied = await traffic_repo.upsert_recorders_snapshot(
             pool,
             instance_id=instance_id,
             recorders_json=payload,
@@ -119,11 +282,26 @@ async def handle_recorders_message(
             available_count=available_count,
             updated_at=updated_at,
         )
+        if applied:
+            # a newer row won the guarded upsert: Postgres does not hold this digest
+            change_detector.record("recorders", instance_id, digest)
+        traffic_state.apply_recorders(
+            instance_id,
+            {
+                "total_count": total_count,
+                "recording_count": recording_count,
+                "idle_count": idle_count,
+                "available_count": available_count,
+                "updated_at": updated_at,
+            },
+        )
+        MQTT_SNAPSHOT_WRITES.inc(kind="recorders", mode="write")
         log.debug(
             "processed recorders message",
             extra={"instance_id": instance_id, "total_count": total_count},
         )
     except Exception:
+        MQTT_UPSERT_FAILURES.inc(kind="recorders")
         log.exception("failed to upsert recorders snapshot", extra={"instance_id": instance_id})
 
 
@@ -140,16 +318,44 @@ async def handle_calls_active_message(
         )
         return
 
+    async def touch() -> bool:
+        return await traffic_repo.touch_calls_active_snapshot(
+            pool, instance_id=instance_id, updated_at=updated_at
+        )
+
+    digest = payload_digest(payload)
+    if await _suppress_unchanged(
+        "calls_active",
+        instance_id,
+        digest,
+        touch,
+        lambda: traffic_state.touch_calls_active(instance_id, updated_at),
+    ):
+        return
+
     active_calls_count = len(calls)
+    calls_normalized = normalize_live_calls(calls)
 
     try:
-        await traffic_repo.upsert_calls_active_snapshot(
+        applied = await traffic_repo.upsert_calls_active_snapshot(
             pool,
             instance_id=instance_id,
             calls_json=payload,
             active_calls_count=active_calls_count,
             updated_at=updated_at,
+            calls_normalized=calls_normalized,
+        )
+        if applied:
+            change_detector.record("calls_active", instance_id, digest)
+        traffic_state.apply_calls_active(
+            instance_id,
+            {
+                "calls_normalized_json": calls_normalized,
+                "active_calls_count": active_calls_count,
+                "updated_at": updated_at,
+            },
         )
+        MQTT_SNAPSHOT_WRITES.inc(kind="calls_active", mode="write")
         log.debug(
             "processed calls_active message",
             extra={
@@ -158,61 +364,193 @@ async def handle_calls_active_message(
             },
         )
     except Exception:
+        MQTT_UPSERT_FAILURES.inc(kind="calls_active")
         log.exception(
             "failed to upsert calls_active snapshot", extra={"instance_id": instance_id}
         )
 
+    if settings.talkgroup_catalog_enabled:
+        await _update_talkgroup_catalog(pool, instance_id, calls_normalized, updated_at)
 
-async def process_mqtt_message(
-    pool: AsyncConnectionPool, topic: str, payload_bytes: bytes
+
+async def _update_talkgroup_catalog(
+    pool: AsyncConnectionPool,
+    instance_id: str,
+    calls_normalized: list[dict[str, Any]],
+    updated_at: datetime,
 ) -> None:
-    """Parse and dispatch a single MQTT message by topic."""
+    """Persist talkgroups that are new or changed; most snapshots have none."""
+    changed = [
+        replace(talkgroup, updated_at=updated_at)
+        for talkgroup in talkgroup_catalog.changes(instance_id, calls_normalized)
+    ]
+    if not changed:
+        return
     try:
-        payload = json.loads(payload_bytes.decode("utf-8"))
+        await talkgroups_repo.upsert_talkgroups(
+            pool,
+            instance_id=instance_id,
+            talkgroups=[asdict(talkgroup) for talkgroup in changed],
+            updated_at=updated_at,
+        )
     except Exception:
-        log.exception("failed to parse mqtt message as JSON", extra={"topic": topic})
+        MQTT_UPSERT_FAILURES.inc(kind="talkgroups")
+        # left out of memory too, so the next changed snapshot retries them
+        log.exception(
+            "failed to upsert talkgroup catalog",
+            extra={"instance_id": instance_id, "talkgroups_count": len(changed)},
+        )
         return
+    talkgroup_catalog.apply(instance_id, changed)
+    log.debug(
+        "talkgroup catalog updated",
+        extra={"instance_id": instance_id, "talkgroups_count": len(changed)},
+    )
+
+
+MESSAGE_HANDLERS: dict[
+    str, Callable[[AsyncConnectionPool, dict[str, Any]], Awaitable[None]]
+] = {
+    "rates": handle_rates_message,
+    "recorders": handle_recorders_message,
+    "calls_active": handle_calls_active_message,
+}
+
+
+def parse_mqtt_payload(topic: str, payload_bytes: bytes) -> dict[str, Any] | None:
+    """Decode an MQTT payload; None (logged) when it is not a JSON object."""
+    try:
+        payload = jsoncodec.loads(payload_bytes)
+    except Exception:
+        MQTT_PARSE_FAILURES.inc(reason="invalid_json")
+        log.exception("failed to parse mqtt message as JSON", extra={"topic": topic})
+        return None
 
     if not isinstance(payload, dict):
+        MQTT_PARSE_FAILURES.inc(reason="not_object")
         log.error("mqtt payload must be a JSON object", extra={"topic": topic})
-        return
+        return None
+    return payload
 
-    try:
-        if topic == _topic(settings.rates_topic_suffix):
-            await handle_rates_message(pool, payload)
-            return
 
-        if topic == _topic(settings.recorders_topic_suffix):
-            await handle_recorders_message(pool, payload)
-            return
+async def process_mqtt_message(
+    pool: AsyncConnectionPool, topic: str, payload_bytes: bytes
+) -> None:
+    """Parse and dispatch a single MQTT message by topic."""
+    payload = parse_mqtt_payload(topic, payload_bytes)
+    if payload is None:
+        return
+    await dispatch_mqtt_payload(pool, topic, payload)
 
-        if topic == _topic(settings.calls_active_topic_suffix):
-            await handle_calls_active_message(pool, payload)
-            return
 
+async def dispatch_mqtt_payload(
+    pool: AsyncConnectionPool, topic: str, payload: dict[str, Any]
+) -> None:
+    """Route a parsed payload to its handler by topic."""
+    route = topic_routes.match(topic)
+    if route is None:
         log.debug("ignoring mqtt message for unsupported topic", extra={"topic": topic})
+        return
+
+    kind, topic_instance_id = route
+    if topic_instance_id is not None:
+        # per-instance topics are authoritative for the instance
+        payload["instance_id"] = topic_instance_id
+    MQTT_MESSAGES.inc(kind=kind)
+    _observe_ingest_lag(kind, payload)
+    started = time.perf_counter()
+    try:
+        await MESSAGE_HANDLERS[kind](pool, payload)
     except KeyError:
+        MQTT_PARSE_FAILURES.inc(reason="missing_field")
         log.exception("mqtt payload missing required field", extra={"topic": topic})
     except Exception:
         log.exception("failed processing mqtt message", extra={"topic": topic})
+    finally:
+        MQTT_HANDLER_SECONDS.observe(time.perf_counter() - started, kind=kind)
+
+
+def _observe_ingest_lag(kind: str, payload: dict[str, Any]) -> None:
+    # measured when the writer picks the message up, so queueing time counts
+    try:
+        lag_s = time.time() - float(payload["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return
+    MQTT_INGEST_LAG_SECONDS.observe(lag_s, kind=kind)
+    instance_id = str(payload.get("instance_id"))
+    if (
+        instance_id in _lag_instance_ids
+        or len(_lag_instance_ids) < settings.mqtt_lag_max_instances
+    ):
+        _lag_instance_ids.add(instance_id)
+        MQTT_INSTANCE_INGEST_LAG_SECONDS.set(lag_s, instance_id=instance_id)
 
 
 async def start_mqtt_consumer(pool: AsyncConnectionPool) -> None:
     """Run a reconnecting MQTT consumer loop for Traffic Monitor topics."""
     try:
-        from aiomqtt import Client, MqttError
+        import aiomqtt  # noqa: F401
     except Exception:
         log.exception("aiomqtt is not available; mqtt consumer cannot start")
         return
 
     reconnect_delay_s = 1.0
     max_reconnect_delay_s = 60.0
-    topics = [
-        _topic(settings.rates_topic_suffix),
-        _topic(settings.recorders_topic_suffix),
-        _topic(settings.calls_active_topic_suffix),
+    topics = list(topic_routes.subscriptions)
+
+    # receive -> keep-latest queue -> writers; a slow DB never stalls the client
+    queue: CoalescingQueue[tuple[str, str], dict[str, Any]] = CoalescingQueue(
+        max_keys=settings.mqtt_queue_max_keys
+    )
+    writers = [
+        asyncio.create_task(_mqtt_writer(pool, queue))
+        for _ in range(max(1, settings.mqtt_writer_concurrency))
     ]
+    try:
+        await _receive_loop(queue, topics, reconnect_delay_s, max_reconnect_delay_s)
+    finally:
+        for writer in writers:
+            writer.cancel()
+        await asyncio.gather(*writers, return_exceptions=True)
+
+
+async def _mqtt_writer(
+    pool: AsyncConnectionPool,
+    queue: CoalescingQueue[tuple[str, str], dict[str, Any]],
+) -> None:
+    while True:
+        key, payload = await queue.get()
+        try:
+            await dispatch_mqtt_payload(pool, key[0], payload)
+        finally:
+            queue.done(key)
+
+
+def _enqueue_message(
+    queue: CoalescingQueue[tuple[str, str], dict[str, Any]],
+    topic: str,
+    payload_bytes: bytes,
+) -> None:
+    payload = parse_mqtt_payload(topic, payload_bytes)
+    if payload is None:
+        return
+    result = queue.put((topic, str(payload.get("instance_id"))), payload)
+    if result == "coalesced":
+        MQTT_COALESCED.inc()
+    elif result == "dropped":
+        MQTT_DROPPED.inc()
+        log.warning("mqtt write queue full; dropping message", extra={"topic": topic})
+
+
+async def _receive_loop(
+    queue: CoalescingQueue[tuple[str, str], dict[str, Any]],
+    topics: list[str],
+    reconnect_delay_s: float,
+    max_reconnect_delay_s: float,
+) -> None:
+    from aiomqtt import Client, MqttError, ProtocolVersion
 
+    shared = bool(settings.mqtt_shared_group)
     while True:
         try:
             async with Client(
@@ -220,6 +558,8 @@ async def start_mqtt_consumer(pool: AsyncConnectionPool) -> None:
                 port=settings.mqtt_port,
                 username=settings.mqtt_username,
                 password=settings.mqtt_password,
+                # shared subscriptions are an MQTT v5 feature
+                protocol=ProtocolVersion.V5 if shared else None,
             ) as client:
                 log.info(
                     "connected to mqtt broker",
@@ -227,19 +567,27 @@ async def start_mqtt_consumer(pool: AsyncConnectionPool) -> None:
                         "host": settings.mqtt_host,
                         "port": settings.mqtt_port,
                         "topic_prefix": settings.mqtt_topic_prefix,
+                        "subscriptions": topics,
                     },
                 )
                 reconnect_delay_s = 1.0
+                MQTT_RECONNECT_BACKOFF_SECONDS.set(0)
 
                 for topic in topics:
                     await client.subscribe(topic)
 
-                async for message in client.messages:
-                    await process_mqtt_message(
-                        pool,
-                        topic=str(message.topic),
-                        payload_bytes=bytes(message.payload),
-                    )
+                # everything we receive from here on also lands in traffic_state,
+                # unless the broker splits the messages across a shared group
+                traffic_state.set_live(not shared)
+                try:
+                    async for message in client.messages:
+                        _enqueue_message(
+                            queue,
+                            topic=str(message.topic),
+                            payload_bytes=bytes(message.payload),
+                        )
+                finally:
+                    traffic_state.set_live(False)
 
         except asyncio.CancelledError:
             log.info("mqtt consumer stopped")
@@ -249,6 +597,8 @@ async def start_mqtt_consumer(pool: AsyncConnectionPool) -> None:
         except Exception:
             log.exception("unexpected mqtt consumer failure")
 
+        MQTT_RECONNECTS.inc()
+        MQTT_RECONNECT_BACKOFF_SECONDS.set(reconnect_delay_s)
         log.info("mqtt reconnect scheduled", extra={"delay_s": reconnect_delay_s})
         await asyncio.sleep(reconnect_delay_s)
         reconnect_delay_s = min(reconnect_delay_s * 2.0, max_reconnect_delay_s)
@@ -0,0 +1,58 @@
+"""
+Precompiled MQTT topic routing for the Traffic Monitor consumer.
+
+Topics are either ``{prefix}/{suffix}`` (instance taken from the payload) or,
+with wildcard subscriptions, ``{prefix}/{instance_id}/{suffix}`` (instance taken
+from the topic). Matching is a dict lookup, not a comparison per handler.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TopicRoutes:
+    prefix: str
+    exact: dict[str, str]  # full topic -> kind
+    by_suffix: dict[str, str]  # wildcard suffix -> kind; empty when disabled
+    subscriptions: tuple[str, ...]
+
+    def match(self, topic: str) -> tuple[str, str | None] | None:
+        """(kind, instance_id from the topic or None), or None when unrouted."""
+        kind = self.exact.get(topic)
+        if kind is not None:
+            return kind, None
+        if not self.by_suffix or not topic.startswith(self.prefix + "/"):
+            return None
+        instance_id, sep, suffix = topic[len(self.prefix) + 1 :].rpartition("/")
+        if not sep or not instance_id or "/" in instance_id:
+            return None
+        kind = self.by_suffix.get(suffix)
+        return (kind, instance_id) if kind is not None else None
+
+
+def build_topic_routes(
+    prefix: str,
+    suffixes: dict[str, str],
+    *,
+    wildcard: bool = False,
+    shared_group: str | None = None,
+) -> TopicRoutes:
+    """Routes for ``{kind: suffix}``; subscriptions include ``$share/`` when grouped."""
+    prefix = prefix.rstrip("/")
+    exact = {f"{prefix}/{suffix}": kind for kind, suffix in suffixes.items()}
+    by_suffix = {suffix: kind for kind, suffix in suffixes.items()} if wildcard else {}
+
+    filters = list(exact)
+    if wildcard:
+        filters.extend(f"{prefix}/+/{suffix}" for suffix in suffixes.values())
+    if shared_group:
+        filters = [f"$share/{shared_group}/{topic}" for topic in filters]
+
+    return TopicRoutes(
+        prefix=prefix,
+        exact=exact,
+        by_suffix=by_suffix,
+        subscriptions=tuple(filters),
+    )
@@ -0,0 +1,196 @@
+"""
+Talkgroup catalog: the talkgroup metadata repeated in every calls_active snapshot,
+kept once per (instance, sys_num, talkgroup) in ``tr_talkgroups`` and in memory.
+
+The MQTT consumer extracts it at ingest and writes only new or changed rows.
+The live-calls ``q`` filter resolves the query against the catalog once per
+request (memoized per catalog version), so matching a call is a dict lookup
+instead of lowercasing and scanning its alpha tag and description.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable
+
+from psycopg_pool import AsyncConnectionPool
+
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.repositories import talkgroups as talkgroups_repo
+
+log = logging.getLogger("emberlog_api.services.talkgroup_catalog")
+
+TalkgroupKey = tuple[int, int]  # (sys_num, talkgroup)
+
+
+@dataclass(frozen=True)
+class Talkgroup:
+    sys_num: int
+    talkgroup: int
+    sys_name: str
+    alpha_tag: str | None
+    description: str | None
+    talkgroup_group: str | None
+    talkgroup_tag: str | None
+    updated_at: datetime | None = field(default=None, compare=False)
+
+    @property
+    def key(self) -> TalkgroupKey:
+        return self.sys_num, self.talkgroup
+
+    @property
+    def search_key(self) -> str:
+        # NUL keeps a query from matching across the two fields
+        return f"{(self.alpha_tag or '').lower()}\0{(self.description or '').lower()}"
+
+    def describes(self, call: dict[str, Any]) -> bool:
+        """True when a live-call record still carries this metadata."""
+        return self.alpha_tag == call["talkgroup"] and self.description == call["description"]
+
+
+def talkgroup_from_call(call: dict[str, Any]) -> Talkgroup | None:
+    """Catalog entry for a normalized live-call record (None without sys/tg ids)."""
+    if call["sys_num"] is None or call["talkgroup_id"] is None:
+        return None
+    return Talkgroup(
+        sys_num=call["sys_num"],
+        talkgroup=call["talkgroup_id"],
+        sys_name=call["sys_name"],
+        alpha_tag=call["talkgroup"],
+        description=call["description"],
+        talkgroup_group=call["category"],
+        talkgroup_tag=call["tag"],
+    )
+
+
+class TalkgroupCatalog:
+    def __init__(self, max_age_s: float, max_cached_queries: int = 256):
+        self.max_age_s = max_age_s
+        self.max_cached_queries = max_cached_queries
+        self._entries: dict[str, dict[TalkgroupKey, Talkgroup]] = {}
+        self._search_keys: dict[str, dict[TalkgroupKey, str]] = {}
+        self._matches: OrderedDict[tuple[str, str], frozenset[TalkgroupKey]] = OrderedDict()
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    # -- writes ----------------------------------------------------------------
+
+    def changes(
+        self, instance_id: str, calls: list[dict[str, Any]]
+    ) -> list[Talkgroup]:
+        """Talkgroups in ``calls`` that are new or differ from the catalog."""
+        entries = self._entries.get(instance_id, {})
+        changed: dict[TalkgroupKey, Talkgroup] = {}
+        for call in calls:
+            talkgroup = talkgroup_from_call(call)
+            if talkgroup is not None and entries.get(talkgroup.key) != talkgroup:
+                changed[talkgroup.key] = talkgroup
+        return list(changed.values())
+
+    def apply(self, instance_id: str, talkgroups: list[Talkgroup]) -> None:
+        if not talkgroups:
+            return
+        entries = self._entries.setdefault(instance_id, {})
+        search_keys = self._search_keys.setdefault(instance_id, {})
+        for talkgroup in talkgroups:
+            entries[talkgroup.key] = talkgroup
+            search_keys[talkgroup.key] = talkgroup.search_key
+        self._invalidate(instance_id)
+
+    def _invalidate(self, instance_id: str) -> None:
+        for cached in [k for k in self._matches if k[0] == instance_id]:
+            del self._matches[cached]
+
+    # -- reads -----------------------------------------------------------------
+
+    async def refresh(self, pool: AsyncConnectionPool) -> None:
+        """Reload from ``tr_talkgroups`` at most every ``max_age_s`` seconds.
+
+        Picks up talkgroups written by a consumer running in another process.
+        """
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.max_age_s:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.max_age_s:
+                return
+            try:
+                await self.load(pool)
+            except Exception:
+                # unknown talkgroups fall back to scanning, so keep serving
+                log.exception("failed to load talkgroup catalog")
+            self._loaded_at = time.monotonic()
+
+    async def load(self, pool: AsyncConnectionPool) -> None:
+        rows = await talkgroups_repo.select_talkgroups(pool)
+        by_instance: dict[str, list[Talkgroup]] = {}
+        for row in rows:
+            instance_id = str(row["instance_id"])
+            talkgroup = Talkgroup(
+                sys_num=int(row["sys_num"]),
+                talkgroup=int(row["talkgroup"]),
+                sys_name=str(row["sys_name"]),
+                alpha_tag=row.get("alpha_tag"),
+                description=row.get("description"),
+                talkgroup_group=row.get("talkgroup_group"),
+                talkgroup_tag=row.get("talkgroup_tag"),
+                updated_at=row.get("updated_at"),
+            )
+            current = self._entries.get(instance_id, {}).get(talkgroup.key)
+            if current is None or (
+                current != talkgroup
+                and current.updated_at is not None
+                and talkgroup.updated_at is not None
+                and talkgroup.updated_at > current.updated_at
+            ):
+                by_instance.setdefault(instance_id, []).append(talkgroup)
+        for instance_id, talkgroups in by_instance.items():
+            self.apply(instance_id, talkgroups)
+        log.debug("talkgroup catalog loaded", extra={"talkgroups_count": len(rows)})
+
+    def search(self, instance_id: str, q_lower: str) -> frozenset[TalkgroupKey]:
+        """Keys of the talkgroups whose alpha tag or description contains ``q_lower``."""
+        cache_key = (instance_id, q_lower)
+        matched = self._matches.get(cache_key)
+        if matched is not None:
+            self._matches.move_to_end(cache_key)
+            return matched
+        matched = frozenset(
+            key
+            for key, search_key in self._search_keys.get(instance_id, {}).items()
+            if q_lower in search_key
+        )
+        self._matches[cache_key] = matched
+        while len(self._matches) > self.max_cached_queries:
+            self._matches.popitem(last=False)
+        return matched
+
+    def matcher(self, instance_id: str, q_lower: str) -> Callable[[dict[str, Any]], bool]:
+        """Per-call ``q`` predicate; the query is resolved against the catalog once."""
+        entries = self._entries.get(instance_id, {})
+        matched = self.search(instance_id, q_lower)
+
+        def matches(call: dict[str, Any]) -> bool:
+            talkgroup = entries.get((call["sys_num"], call["talkgroup_id"]))
+            if talkgroup is not None and talkgroup.describes(call):
+                return talkgroup.key in matched
+            # not in this process's catalog yet, or renamed since
+            return (
+                q_lower in (call["talkgroup"] or "").lower()
+                or q_lower in (call["description"] or "").lower()
+            )
+
+        return matches
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._search_keys.clear()
+        self._matches.clear()
+        self._loaded_at = None
+
+
+talkgroup_catalog = TalkgroupCatalog(max_age_s=settings.talkgroup_catalog_max_age_s)
@@ -0,0 +1,228 @@
+"""
+Process-local copy of the latest traffic snapshots, served by /traffic endpoints.
+
+The MQTT consumer applies every snapshot it has written to Postgres, so while a
+consumer runs in this process (``live``) reads never touch the database. The
+store is warm-started from the ``tr_*_latest`` tables, and in processes without
+a live consumer (API replicas next to a separate worker) it re-reads those
+tables at most every ``max_age_s`` seconds instead of on every poll.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Hashable
+
+from psycopg_pool import AsyncConnectionPool
+
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.repositories import traffic as traffic_repo
+
+log = logging.getLogger("emberlog_api.services.traffic_state")
+
+# process-wide, so versions of different stores (tests, reloads) never collide
+_versions = itertools.count(1)
+
+
+@dataclass
+class InstanceTrafficState:
+    # row shapes match the traffic repository selects
+    decode_rows: dict[int, dict[str, Any]] = field(default_factory=dict)
+    recorders_row: dict[str, Any] | None = None
+    calls_row: dict[str, Any] | None = None
+
+
+def _newer(incoming: dict[str, Any] | None, current: dict[str, Any] | None) -> bool:
+    if incoming is None:
+        return False
+    if current is None:
+        return True
+    incoming_at = incoming.get("updated_at")
+    current_at = current.get("updated_at")
+    if not isinstance(incoming_at, datetime) or not isinstance(current_at, datetime):
+        return True
+    return incoming_at >= current_at
+
+
+def _reloaded(incoming: dict[str, Any], current: dict[str, Any] | None) -> bool:
+    """Like `_newer` for rows read back from Postgres: an equal ``updated_at`` is
+    the row we already hold, so periodic reloads leave the versions alone."""
+    if current is None:
+        return True
+    incoming_at = incoming.get("updated_at")
+    current_at = current.get("updated_at")
+    if not isinstance(incoming_at, datetime) or not isinstance(current_at, datetime):
+        return incoming != current
+    return incoming_at > current_at
+
+
+class TrafficStateStore:
+    def __init__(self, max_age_s: float):
+        self.max_age_s = max_age_s
+        self.live = False
+        # changes whenever any snapshot does (or the set of instances); each
+        # instance also has its own, so one busy recorder does not invalidate
+        # cached responses for the others
+        self.version = next(_versions)
+        self._instances: dict[str, InstanceTrafficState] = {}
+        self._instance_versions: dict[str, int] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def _instance(self, instance_id: str) -> InstanceTrafficState:
+        state = self._instances.get(instance_id)
+        if state is None:
+            state = self._instances[instance_id] = InstanceTrafficState()
+        return state
+
+    def _changed(self, *instance_ids: str) -> None:
+        self.version = next(_versions)
+        for instance_id in instance_ids:
+            self._instance_versions[instance_id] = self.version
+
+    def version_for(self, instance_ids: list[str] | None) -> Hashable:
+        """Changes only when one of ``instance_ids`` does (None = any instance)."""
+        if instance_ids is None:
+            return self.version
+        return tuple(self._instance_versions.get(i, 0) for i in instance_ids)
+
+    # -- writes (MQTT consumer) ------------------------------------------------
+
+    def set_live(self, live: bool) -> None:
+        if live and not self.live:
+            # catch up with anything written while nobody was feeding us
+            self._loaded_at = None
+        self.live = live
+
+    def apply_decode_rates(
+        self, instance_id: str, rates: list[dict[str, Any]], updated_at: datetime
+    ) -> None:
+        state = self._instance(instance_id)
+        for rate in rates:
+            sys_num = int(rate["sys_num"])
+            current = state.decode_rows.get(sys_num)
+            if current is not None and current["updated_at"] > updated_at:
+                continue
+            state.decode_rows[sys_num] = {
+                "sys_num": sys_num,
+                "sys_name": rate["sys_name"],
+                "decoderate_pct": rate["decoderate_pct"],
+                "decoderate_interval_s": rate.get("decoderate_interval_s"),
+                "control_channel_hz": rate.get("control_channel_hz"),
+                "updated_at": updated_at,
+            }
+        self._changed(instance_id)
+
+    def apply_recorders(self, instance_id: str, row: dict[str, Any]) -> None:
+        state = self._instance(instance_id)
+        if _newer(row, state.recorders_row):
+            state.recorders_row = row
+            self._changed(instance_id)
+
+    def apply_calls_active(self, instance_id: str, row: dict[str, Any]) -> None:
+        state = self._instance(instance_id)
+        if _newer(row, state.calls_row):
+            state.calls_row = row
+            self._changed(instance_id)
+
+    def touch_recorders(self, instance_id: str, updated_at: datetime) -> None:
+        state = self._instances.get(instance_id)
+        if state is not None and state.recorders_row is not None:
+            if _newer({"updated_at": updated_at}, state.recorders_row):
+                state.recorders_row = {**state.recorders_row, "updated_at": updated_at}
+                self._changed(instance_id)
+
+    def touch_calls_active(self, instance_id: str, updated_at: datetime) -> None:
+        state = self._instances.get(instance_id)
+        if state is not None and state.calls_row is not None:
+            if _newer({"updated_at": updated_at}, state.calls_row):
+                state.calls_row = {**state.calls_row, "updated_at": updated_at}
+                self._changed(instance_id)
+
+    # -- reads (API) -----------------------------------------------------------
+
+    def _fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        return self.live or time.monotonic() - self._loaded_at < self.max_age_s
+
+    async def _ensure_fresh(self, pool: AsyncConnectionPool) -> None:
+        if not self._fresh():
+            async with self._lock:
+                # concurrent readers wait for the one reload instead of each querying
+                if not self._fresh():
+                    await self.load(pool)
+
+    async def current_version(
+        self, pool: AsyncConnectionPool, instance_ids: list[str] | None = None
+    ) -> Hashable:
+        """Version of the data the next `get`/`get_many` will return for ``instance_ids``."""
+        await self._ensure_fresh(pool)
+        return self.version_for(instance_ids)
+
+    async def get(
+        self, pool: AsyncConnectionPool, instance_id: str
+    ) -> InstanceTrafficState | None:
+        await self._ensure_fresh(pool)
+        return self._instances.get(instance_id)
+
+    async def get_many(
+        self, pool: AsyncConnectionPool, instance_ids: list[str] | None
+    ) -> dict[str, InstanceTrafficState]:
+        """State of the given instances (None = every known instance)."""
+        await self._ensure_fresh(pool)
+        if instance_ids is None:
+            return dict(self._instances)
+        return {i: self._instances[i] for i in instance_ids if i in self._instances}
+
+    async def load(self, pool: AsyncConnectionPool) -> None:
+        """(Re)load every instance from the tr_*_latest tables.
+
+        Entries the consumer updated more recently than the DB rows are kept.
+        """
+        decode_rows, recorders_rows, calls_rows = (
+            await traffic_repo.select_traffic_latest(pool)
+        )
+        changed: set[str] = set()
+        for row in decode_rows:
+            row = dict(row)
+            instance_id = str(row.pop("instance_id"))
+            state = self._instance(instance_id)
+            sys_num = int(row["sys_num"])
+            if _reloaded(row, state.decode_rows.get(sys_num)):
+                state.decode_rows[sys_num] = row
+                changed.add(instance_id)
+        for row in recorders_rows:
+            row = dict(row)
+            instance_id = str(row.pop("instance_id"))
+            state = self._instance(instance_id)
+            if _reloaded(row, state.recorders_row):
+                state.recorders_row = row
+                changed.add(instance_id)
+        for row in calls_rows:
+            row = dict(row)
+            instance_id = str(row.pop("instance_id"))
+            state = self._instance(instance_id)
+            if _reloaded(row, state.calls_row):
+                state.calls_row = row
+                changed.add(instance_id)
+        self._loaded_at = time.monotonic()
+        if changed:
+            self._changed(*changed)
+        log.debug(
+            "traffic state loaded", extra={"instances_count": len(self._instances)}
+        )
+
+    def clear(self) -> None:
+        self._instances.clear()
+        self._loaded_at = None
+        # keep the versions (bumped) so responses cached before the clear miss
+        self._changed(*self._instance_versions)
+
+
+traffic_state = TrafficStateStore(max_age_s=settings.traffic_state_max_age_s)
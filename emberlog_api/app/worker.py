@@ -0,0 +1,95 @@
+"""
+Standalone background worker: outbox drain + MQTT consumer, no HTTP API.
+
+    python -m emberlog_api.app.worker
+
+Run the API with RUN_BACKGROUND_WORKERS=false when using this, so API replicas
+and uvicorn workers don't each start their own drain and consumer. Serves
+/healthz and /metrics on WORKER_HTTP_PORT (unset to disable).
+"""
+
+import asyncio
+import contextlib
+import logging
+import signal
+from typing import Iterator
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+from emberlog_api.app.core.background import BackgroundServices
+from emberlog_api.app.core.metrics import CONTENT_TYPE_LATEST, REGISTRY
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.pool import Pools
+from emberlog_api.utils.jsoncodec import install_json_codec
+from emberlog_api.utils.loggersetup import configure_logging
+
+log = logging.getLogger("emberlog_api.app.worker")
+
+worker_app = FastAPI(title="Emberlog Worker")
+
+
+class _EmbeddedServer(uvicorn.Server):
+    """uvicorn server that leaves SIGINT/SIGTERM to the worker."""
+
+    @contextlib.contextmanager
+    def capture_signals(self) -> Iterator[None]:
+        yield
+
+
+@worker_app.get("/healthz")
+async def get_healthz() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@worker_app.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
+
+
+async def run_worker() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    install_json_codec(settings.json_codec)
+    pools = Pools(BackgroundServices.POOL_NAMES)
+    await pools.open()
+    background = BackgroundServices(pools)
+    await background.start()
+    log.info("worker started")
+
+    server = None
+    server_task = None
+    if settings.worker_http_port:
+        server = _EmbeddedServer(
+            uvicorn.Config(
+                worker_app,
+                host="0.0.0.0",
+                port=settings.worker_http_port,
+                lifespan="off",
+                log_config=None,
+            )
+        )
+        server_task = asyncio.create_task(server.serve())
+
+    try:
+        await stop.wait()
+    finally:
+        log.info("worker stopping")
+        if server is not None and server_task is not None:
+            server.should_exit = True
+            await server_task
+        await background.stop()
+        await pools.close()
+
+
+def main() -> None:
+    configure_logging()
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()
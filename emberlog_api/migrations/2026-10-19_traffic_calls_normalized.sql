@@ -0,0 +1,4 @@
+-- Live calls normalized once at ingest; /traffic/live-calls only filters them.
+-- Rows written before this column existed are normalized on read.
+ALTER TABLE tr_calls_active_snapshot_latest
+    ADD COLUMN IF NOT EXISTS calls_normalized_json JSONB;
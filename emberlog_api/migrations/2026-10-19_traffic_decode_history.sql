@@ -0,0 +1,72 @@
+-- Decode-rate history: raw samples partitioned by day, plus 1m/5m/1h rollups
+-- maintained incrementally on insert. Daily partitions are created ahead of
+-- time and dropped after the raw retention by the decode history maintenance
+-- job (emberlog_api/app/services/decode_history.py). Samples for a day without
+-- a partition land in the DEFAULT one (and are moved out when the day's
+-- partition is created), so inserts and their rollups never fail on it.
+
+CREATE TABLE IF NOT EXISTS tr_decode_rate_history (
+    instance_id TEXT NOT NULL,
+    sys_num INTEGER NOT NULL,
+    sys_name TEXT NOT NULL,
+
+    decoderate_pct DOUBLE PRECISION NOT NULL,
+    recorded_at TIMESTAMPTZ NOT NULL
+) PARTITION BY RANGE (recorded_at);
+
+CREATE INDEX IF NOT EXISTS tr_decode_rate_history_instance_sys_recorded_idx
+    ON tr_decode_rate_history (instance_id, sys_num, recorded_at);
+
+CREATE TABLE IF NOT EXISTS tr_decode_rate_history_default
+    PARTITION OF tr_decode_rate_history DEFAULT;
+
+-- today and the next two days, so the sink works before maintenance first runs
+DO $$
+DECLARE
+    day DATE;
+BEGIN
+    FOR day IN
+        SELECT d::date
+        FROM generate_series(
+            (now() AT TIME ZONE 'UTC')::date,
+            (now() AT TIME ZONE 'UTC')::date + 2,
+            interval '1 day'
+        ) AS d
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF tr_decode_rate_history '
+            'FOR VALUES FROM (%L) TO (%L)',
+            'tr_decode_rate_history_p' || to_char(day, 'YYYYMMDD'),
+            day::timestamp AT TIME ZONE 'UTC',
+            (day + 1)::timestamp AT TIME ZONE 'UTC'
+        );
+    END LOOP;
+END $$;
+
+-- min/max/sum/count rather than avg so each sample folds in with one upsert
+CREATE TABLE IF NOT EXISTS tr_decode_rate_rollup_1m (
+    instance_id TEXT NOT NULL,
+    sys_num INTEGER NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    sys_name TEXT NOT NULL,
+
+    min_pct DOUBLE PRECISION NOT NULL,
+    max_pct DOUBLE PRECISION NOT NULL,
+    sum_pct DOUBLE PRECISION NOT NULL,
+    sample_count INTEGER NOT NULL,
+
+    PRIMARY KEY (instance_id, sys_num, bucket_start)
+);
+
+CREATE TABLE IF NOT EXISTS tr_decode_rate_rollup_5m
+    (LIKE tr_decode_rate_rollup_1m INCLUDING ALL);
+
+CREATE TABLE IF NOT EXISTS tr_decode_rate_rollup_1h
+    (LIKE tr_decode_rate_rollup_1m INCLUDING ALL);
+
+CREATE INDEX IF NOT EXISTS tr_decode_rate_rollup_1m_bucket_idx
+    ON tr_decode_rate_rollup_1m (bucket_start);
+CREATE INDEX IF NOT EXISTS tr_decode_rate_rollup_5m_bucket_idx
+    ON tr_decode_rate_rollup_5m (bucket_start);
+CREATE INDEX IF NOT EXISTS tr_decode_rate_rollup_1h_bucket_idx
+    ON tr_decode_rate_rollup_1h (bucket_start);
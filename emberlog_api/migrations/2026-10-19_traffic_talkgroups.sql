@@ -0,0 +1,20 @@
+-- Talkgroup catalog extracted from calls_active payloads at ingest. Rows change
+-- only when a talkgroup is first seen or its metadata changes; the in-memory
+-- index (emberlog_api/app/services/talkgroup_catalog.py) resolves the
+-- /traffic/live-calls `q` filter against it.
+
+CREATE TABLE IF NOT EXISTS tr_talkgroups (
+    instance_id TEXT NOT NULL,
+    sys_num INTEGER NOT NULL,
+    talkgroup INTEGER NOT NULL,
+    sys_name TEXT NOT NULL,
+
+    alpha_tag TEXT,
+    description TEXT,
+    talkgroup_group TEXT,
+    talkgroup_tag TEXT,
+
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (instance_id, sys_num, talkgroup)
+);
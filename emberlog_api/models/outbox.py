@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class OutboxRowOut(BaseModel):
+    id: int
+    incident_id: int
+    event_type: str
+    status: str
+    attempts: int
+    last_error: Optional[str]
+    created_at: datetime
+    available_at: datetime
+    payload: Optional[Any] = None
+
+
+class OutboxDeadListOut(BaseModel):
+    items: List[OutboxRowOut]
+    total: int
+    page: int
+    page_size: int
+
+
+class OutboxRequeueIn(BaseModel):
+    ids: Optional[List[int]] = None
+    event_type: Optional[str] = None
+    error_search: Optional[str] = None
+    from_created_at: Optional[datetime] = None
+    to_created_at: Optional[datetime] = None
+    limit: int = Field(100, ge=1)
+    rate_per_s: Optional[float] = Field(None, gt=0)
+
+
+class OutboxRequeueOut(BaseModel):
+    requeued: int
+    ids: List[int]
+    spread_s: float
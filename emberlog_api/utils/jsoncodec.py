@@ -0,0 +1,107 @@
+"""
+JSON encoding/decoding backed by the fastest library installed.
+
+orjson is preferred, then msgspec, then the stdlib ``json`` module. The active
+codec is used for MQTT payloads (``loads``), psycopg JSON/JSONB adaptation
+(registered by ``install_json_codec``) and API responses (``CodecJSONResponse``).
+
+Neither fast library is a declared dependency; ``pip install orjson`` into the
+environment (or image) to enable it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+
+log = logging.getLogger("emberlog_api.utils.jsoncodec")
+
+CODEC_PREFERENCE = ("orjson", "msgspec", "stdlib")
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    name: str
+    loads: Callable[[bytes | str], Any]
+    dumps: Callable[[Any], bytes]
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    # compact and NaN/Infinity-free, like orjson and msgspec (and as JSONB requires)
+    return json.dumps(
+        obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _build_codec(name: str) -> JsonCodec | None:
+    if name == "stdlib":
+        return JsonCodec("stdlib", json.loads, _stdlib_dumps)
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError:
+            return None
+        return JsonCodec("orjson", orjson.loads, orjson.dumps)
+    if name == "msgspec":
+        try:
+            import msgspec
+        except ImportError:
+            return None
+        return JsonCodec("msgspec", msgspec.json.decode, msgspec.json.encode)
+    raise ValueError(f"unknown json codec {name!r}; expected one of {CODEC_PREFERENCE}")
+
+
+def available_codecs() -> list[JsonCodec]:
+    """Installed codecs, fastest first."""
+    return [c for c in (_build_codec(n) for n in CODEC_PREFERENCE) if c is not None]
+
+
+def select_codec(name: str = "auto") -> JsonCodec:
+    """The named codec, or the fastest installed one for ``auto``."""
+    if name == "auto":
+        return available_codecs()[0]
+    codec = _build_codec(name)
+    if codec is None:
+        raise ValueError(f"json codec {name!r} is not installed")
+    return codec
+
+
+_codec = select_codec()
+
+
+def current_codec() -> JsonCodec:
+    return _codec
+
+
+def loads(data: bytes | str) -> Any:
+    return _codec.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    return _codec.dumps(obj)
+
+
+def install_json_codec(name: str = "auto") -> JsonCodec:
+    """Make ``name`` the active codec, including for psycopg JSON/JSONB values.
+
+    Called once per process at startup (API lifespan, worker, benchmarks).
+    """
+    from psycopg.types.json import set_json_dumps, set_json_loads
+
+    global _codec
+    _codec = select_codec(name)
+    set_json_loads(_codec.loads)
+    set_json_dumps(_codec.dumps)
+    log.info("json codec installed", extra={"codec": _codec.name})
+    return _codec
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered with the active codec."""
+
+    def render(self, content: Any) -> bytes:
+        return _codec.dumps(content)
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from emberlog_api.app.services.coalescing import CoalescingQueue
+
+
+@pytest.mark.anyio
+async def test_keeps_only_newest_value_per_key():
+    queue: CoalescingQueue[str, int] = CoalescingQueue(max_keys=10)
+    assert queue.put("a", 1) == "queued"
+    assert queue.put("b", 1) == "queued"
+    assert queue.put("a", 2) == "coalesced"
+    assert queue.put("a", 3) == "coalesced"
+
+    assert await queue.get() == ("a", 3)
+    assert await queue.get() == ("b", 1)
+    assert queue.coalesced == 2
+
+
+@pytest.mark.anyio
+async def test_key_in_flight_is_not_handed_to_another_writer():
+    queue: CoalescingQueue[str, int] = CoalescingQueue(max_keys=10)
+    queue.put("a", 1)
+    key, _ = await queue.get()
+    queue.put("a", 2)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(queue.get(), timeout=0.05)
+
+    queue.done(key)
+    assert await queue.get() == ("a", 2)
+
+
+@pytest.mark.anyio
+async def test_drops_new_keys_when_full():
+    queue: CoalescingQueue[str, int] = CoalescingQueue(max_keys=1)
+    assert queue.put("a", 1) == "queued"
+    assert queue.put("b", 1) == "dropped"
+    assert queue.put("a", 2) == "coalesced"
+    assert queue.dropped == 1
@@ -0,0 +1,47 @@
+import pytest
+
+from emberlog_api.app.core.background import BackgroundServices
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.pool import Pools, build_pool
+
+
+def test_named_pools_are_sized_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "ingest_pool_max_size", 7)
+    monkeypatch.setattr(settings, "background_pool_max_waiting", 3)
+
+    pools = Pools(["api", *BackgroundServices.POOL_NAMES])
+
+    assert pools["api"].max_size == settings.pool_max_size
+    assert pools["ingest"].max_size == 7
+    assert pools["ingest"].name == "ingest"
+    assert pools["background"].max_waiting == 3
+    assert len({id(pools[name]) for name in ("api", "ingest", "background")}) == 3
+
+
+def test_pool_isolation_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_isolation", False)
+
+    pools = Pools(["api", "ingest", "background"])
+
+    assert pools["ingest"] is pools["api"] is pools["background"]
+
+
+def test_unknown_pool_name_is_rejected():
+    with pytest.raises(ValueError):
+        build_pool("reports")
+
+
+def test_read_pool_connects_to_replica_even_without_isolation(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_isolation", False)
+    monkeypatch.setattr(settings, "database_read_url", "postgresql://replica/emberlog")
+
+    pools = Pools(["api", "read"])
+
+    assert pools["read"] is not pools["api"]
+    assert pools["read"].conninfo == "postgresql://replica/emberlog"
+
+
+def test_read_pool_requires_read_url(monkeypatch):
+    monkeypatch.setattr(settings, "database_read_url", None)
+    with pytest.raises(ValueError):
+        build_pool("read")
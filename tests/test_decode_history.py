@@ -0,0 +1,72 @@
+from contextlib import asynccontextmanager
+from datetime import date
+
+import pytest
+
+from emberlog_api.app.db.repositories import decode_history as history_repo
+
+
+class RecordingCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+    async def execute(self, query, params=None):
+        text = query if isinstance(query, str) else query.as_string(None)
+        self.conn.executed.append((" ".join(text.split()), self.conn.in_transaction))
+
+    async def fetchall(self):
+        return [(name,) for name in self.conn.partitions]
+
+
+class RecordingConnection:
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.executed: list = []
+        self.in_transaction = False
+
+    def cursor(self, **_kwargs):
+        return RecordingCursor(self)
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.in_transaction = True
+        try:
+            yield
+        finally:
+            self.in_transaction = False
+
+
+class RecordingPool:
+    def __init__(self, partitions):
+        self.conn = RecordingConnection(partitions)
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self.conn
+
+
+@pytest.mark.anyio
+async def test_ensure_partitions_moves_default_rows_into_new_days():
+    pool = RecordingPool(
+        ["tr_decode_rate_history_default", "tr_decode_rate_history_p20261018"]
+    )
+
+    await history_repo.ensure_decode_history_partitions(
+        pool, start=date(2026, 10, 18), days=2
+    )
+
+    statements = pool.conn.executed[1:]
+    # the existing day is left alone; the missing one is created, filled, attached
+    assert [sql.split(" (")[0] for sql, _ in statements] == [
+        'CREATE TABLE "tr_decode_rate_history_p20261019"',
+        "WITH moved AS",
+        'ALTER TABLE "tr_decode_rate_history" ATTACH PARTITION "tr_decode_rate_history_p20261019" FOR VALUES FROM',
+    ]
+    assert all(in_transaction for _, in_transaction in statements)
+    assert 'DELETE FROM "tr_decode_rate_history_default"' in statements[1][0]
@@ -0,0 +1,38 @@
+import pytest
+
+from emberlog_api.utils import jsoncodec
+
+
+@pytest.mark.parametrize("codec", jsoncodec.available_codecs(), ids=lambda c: c.name)
+def test_codecs_round_trip_mqtt_payload(codec):
+    payload = {
+        "calls": [{"id": "1_4499_1771215827", "talkgroup_alpha_tag": "Avondale PD A01", "freq": 770118750}],
+        "timestamp": 1771215831,
+        "instance_id": "trunk-récorder",
+    }
+
+    encoded = codec.dumps(payload)
+
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == payload
+    assert jsoncodec.select_codec("stdlib").loads(encoded) == payload
+
+
+def test_select_codec_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        jsoncodec.select_codec("yaml")
+
+
+def test_codec_response_renders_with_active_codec():
+    response = jsoncodec.CodecJSONResponse({"status": "ok", "count": 2})
+
+    assert jsoncodec.loads(response.body) == {"status": "ok", "count": 2}
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_stdlib_codec_matches_fast_codecs_output():
+    codec = jsoncodec.select_codec("stdlib")
+
+    assert codec.dumps({"a": [1, 2]}) == b'{"a":[1,2]}'
+    with pytest.raises(ValueError):
+        codec.dumps({"decoderate": float("nan")})
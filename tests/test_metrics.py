@@ -0,0 +1,48 @@
+import pytest
+
+from emberlog_api.app.core.metrics import Counter, Histogram, Registry
+from emberlog_api.app.main import app as emberlog_app
+
+
+@pytest.fixture
+def app():
+    return emberlog_app
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    retries = Counter(
+        "test_retries_total", "Retries", ["event_type"], registry=registry
+    )
+    latency = Histogram(
+        "test_latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry
+    )
+
+    retries.inc(event_type="incident.created")
+    retries.inc(2, event_type="incident.created")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3.0)
+
+    text = registry.render()
+    assert "# TYPE test_retries_total counter" in text
+    assert 'test_retries_total{event_type="incident.created"} 3' in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_latency_seconds_count 3" in text
+
+
+def test_metric_rejects_unknown_labels():
+    counter = Counter("test_labels_total", "Labels", ["route"], registry=None)
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_exposes_drain_metrics(async_client):
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE emberlog_outbox_delivery_lag_seconds histogram" in response.text
+    assert "# TYPE emberlog_outbox_rows gauge" in response.text
@@ -3,17 +3,20 @@ from datetime import datetime, timezone
 import pytest
 
 from emberlog_api.app.services import mqtt_consumer
+from emberlog_api.app.services.talkgroup_catalog import TalkgroupCatalog
+from emberlog_api.app.services.traffic_state import TrafficStateStore
 
 
 @pytest.mark.anyio
 async def test_handle_rates_message_calls_repo_upsert(monkeypatch):
     calls: list[dict] = []
 
-    async def fake_upsert_decode_rate(pool, **kwargs):
-        calls.append(kwargs)
+    async def fake_upsert_decode_rates(pool, *, instance_id, rates, updated_at):
+        for rate in rates:
+            calls.append({"instance_id": instance_id, "updated_at": updated_at, **rate})
 
     monkeypatch.setattr(
-        mqtt_consumer.traffic_repo, "upsert_decode_rate", fake_upsert_decode_rate
+        mqtt_consumer.traffic_repo, "upsert_decode_rates", fake_upsert_decode_rates
     )
 
     payload = {
@@ -42,3 +45,433 @@ async def test_handle_rates_message_calls_repo_upsert(monkeypatch):
     assert calls[0]["decoderate_interval_s"] == 3.0
     assert calls[0]["control_channel_hz"] == 769118750
     assert calls[0]["updated_at"] == datetime.fromtimestamp(1771215501, tz=timezone.utc)
+
+
+@pytest.mark.anyio
+async def test_handle_rates_message_bulk_upserts_and_skips_bad_items(monkeypatch):
+    bulk_calls: list[list[dict]] = []
+
+    async def fake_upsert_decode_rates(pool, *, instance_id, rates, updated_at):
+        bulk_calls.append(rates)
+
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo, "upsert_decode_rates", fake_upsert_decode_rates
+    )
+
+    payload = {
+        "rates": [
+            {"sys_num": 1, "sys_name": "PRWC-J", "decoderate": 38.0},
+            {"sys_num": "bogus", "sys_name": "BAD", "decoderate": 1.0},
+            "not-an-object",
+            {"sys_num": 2, "sys_name": "MCSO-WT", "decoderate": 20.0},
+        ],
+        "timestamp": 1771215501,
+        "instance_id": "trunk-recorder",
+    }
+
+    await mqtt_consumer.handle_rates_message(pool=None, payload=payload)
+
+    assert len(bulk_calls) == 1
+    assert [rate["sys_name"] for rate in bulk_calls[0]] == ["PRWC-J", "MCSO-WT"]
+
+
+@pytest.mark.anyio
+async def test_handle_rates_message_falls_back_per_item_when_bulk_fails(
+    monkeypatch, traffic_state
+):
+    single_calls: list[str] = []
+    history_calls: list[list[int]] = []
+
+    async def fake_record_decode_history(pool, *, instance_id, rates, recorded_at):
+        history_calls.append([rate["sys_num"] for rate in rates])
+
+    async def failing_upsert_decode_rates(pool, **kwargs):
+        raise RuntimeError("numeric field overflow")
+
+    async def fake_upsert_decode_rate(pool, **kwargs):
+        if kwargs["sys_num"] == 2:
+            raise RuntimeError("numeric field overflow")
+        single_calls.append(kwargs["sys_name"])
+
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo, "upsert_decode_rates", failing_upsert_decode_rates
+    )
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo, "upsert_decode_rate", fake_upsert_decode_rate
+    )
+    monkeypatch.setattr(
+        mqtt_consumer, "record_decode_history", fake_record_decode_history
+    )
+
+    payload = {
+        "rates": [
+            {"sys_num": 1, "sys_name": "PRWC-J", "decoderate": 38.0},
+            {"sys_num": 2, "sys_name": "MCSO-WT", "decoderate": 20.0},
+            {"sys_num": 3, "sys_name": "TOPAZ", "decoderate": 30.0},
+        ],
+        "timestamp": 1771215501,
+        "instance_id": "trunk-recorder",
+    }
+
+    await mqtt_consumer.handle_rates_message(pool=None, payload=payload)
+
+    assert single_calls == ["PRWC-J", "TOPAZ"]
+    # only rows that reached Postgres are visible to the traffic endpoints
+    state = traffic_state._instances["trunk-recorder"]
+    assert sorted(state.decode_rows) == [1, 3]
+    assert history_calls == [[1, 3]]
+
+
+@pytest.fixture(autouse=True)
+def traffic_state(monkeypatch):
+    store = TrafficStateStore(max_age_s=60.0)
+    monkeypatch.setattr(mqtt_consumer, "traffic_state", store)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def talkgroup_catalog(monkeypatch):
+    catalog = TalkgroupCatalog(max_age_s=60.0)
+    monkeypatch.setattr(mqtt_consumer, "talkgroup_catalog", catalog)
+    return catalog
+
+
+@pytest.fixture
+def change_detector(monkeypatch):
+    detector = mqtt_consumer.SnapshotChangeDetector(freshness_s=30.0)
+    monkeypatch.setattr(mqtt_consumer, "change_detector", detector)
+    return detector
+
+
+def _recorders_payload(timestamp: int, state: str = "IDLE") -> dict:
+    return {
+        "type": "recorders",
+        "recorders": [{"id": "0_0", "rec_state_type": state}],
+        "timestamp": timestamp,
+        "instance_id": "trunk-recorder",
+    }
+
+
+@pytest.mark.anyio
+async def test_unchanged_recorders_snapshot_is_skipped_then_touched(
+    monkeypatch, change_detector
+):
+    writes: list[datetime] = []
+    touches: list[datetime] = []
+
+    async def fake_upsert_recorders_snapshot(pool, **kwargs):
+        writes.append(kwargs["updated_at"])
+        return True
+
+    async def fake_touch_recorders_snapshot(pool, *, instance_id, updated_at):
+        touches.append(updated_at)
+        return True
+
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo,
+        "upsert_recorders_snapshot",
+        fake_upsert_recorders_snapshot,
+    )
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo,
+        "touch_recorders_snapshot",
+        fake_touch_recorders_snapshot,
+    )
+
+    await mqtt_consumer.handle_recorders_message(None, _recorders_payload(100))
+    await mqtt_consumer.handle_recorders_message(None, _recorders_payload(103))
+    assert len(writes) == 1
+    assert touches == []
+
+    change_detector.freshness_s = 0.0
+    await mqtt_consumer.handle_recorders_message(None, _recorders_payload(106))
+    assert len(writes) == 1
+    assert touches == [datetime.fromtimestamp(106, tz=timezone.utc)]
+
+    await mqtt_consumer.handle_recorders_message(
+        None, _recorders_payload(109, state="RECORDING")
+    )
+    assert len(writes) == 2
+
+
+@pytest.mark.anyio
+async def test_skipped_snapshot_still_moves_state_updated_at(
+    monkeypatch, change_detector, traffic_state
+):
+    async def fake_upsert_recorders_snapshot(pool, **kwargs):
+        return True
+
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo,
+        "upsert_recorders_snapshot",
+        fake_upsert_recorders_snapshot,
+    )
+
+    await mqtt_consumer.handle_recorders_message(None, _recorders_payload(100))
+    await mqtt_consumer.handle_recorders_message(None, _recorders_payload(103))
+
+    state = traffic_state._instances["trunk-recorder"]
+    assert state.recorders_row["updated_at"] == datetime.fromtimestamp(103, tz=timezone.utc)
+
+
+@pytest.mark.anyio
+async def test_touch_that_updates_no_row_falls_back_to_full_write(
+    monkeypatch, change_detector
+):
+    writes: list[datetime] = []
+
+    async def fake_upsert_recorders_snapshot(pool, **kwargs):
+        writes.append(kwargs["updated_at"])
+        return True
+
+    async def fake_touch_recorders_snapshot(pool, **kwargs):
+        return False  # row deleted since the last write
+
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo,
+        "upsert_recorders_snapshot",
+        fake_upsert_recorders_snapshot,
+    )
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo,
+        "touch_recorders_snapshot",
+        fake_touch_recorders_snapshot,
+    )
+    change_detector.freshness_s = 0.0
+
+    await mqtt_consumer.handle_recorders_message(None, _recorders_payload(100))
+    await mqtt_consumer.handle_recorders_message(None, _recorders_payload(103))
+
+    assert writes == [
+        datetime.fromtimestamp(100, tz=timezone.utc),
+        datetime.fromtimestamp(103, tz=timezone.utc),
+    ]
+
+
+@pytest.mark.anyio
+async def test_shared_group_always_writes_full_snapshots(monkeypatch, change_detector):
+    # replicas split one instance's messages: A writes X, B writes Y, A gets X again
+    monkeypatch.setattr(mqtt_consumer.settings, "mqtt_shared_group", "emberlog")
+    writes: list[datetime] = []
+
+    async def fake_upsert_recorders_snapshot(pool, **kwargs):
+        writes.append(kwargs["updated_at"])
+        return True
+
+    async def fail_touch(pool, **kwargs):
+        raise AssertionError("touch-only write in shared mode")
+
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo,
+        "upsert_recorders_snapshot",
+        fake_upsert_recorders_snapshot,
+    )
+    monkeypatch.setattr(mqtt_consumer.traffic_repo, "touch_recorders_snapshot", fail_touch)
+    change_detector.freshness_s = 0.0
+
+    for timestamp in (100, 103, 106):
+        await mqtt_consumer.handle_recorders_message(None, _recorders_payload(timestamp))
+
+    assert len(writes) == 3
+
+
+@pytest.mark.anyio
+async def test_digest_not_recorded_when_newer_row_won(monkeypatch, change_detector):
+    applied = False
+    writes: list[datetime] = []
+
+    async def fake_upsert_recorders_snapshot(pool, **kwargs):
+        writes.append(kwargs["updated_at"])
+        return applied
+
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo,
+        "upsert_recorders_snapshot",
+        fake_upsert_recorders_snapshot,
+    )
+
+    # a reordered, older message loses the guarded upsert...
+    await mqtt_consumer.handle_recorders_message(None, _recorders_payload(100))
+    applied = True
+    # ...so the same content arriving again is still written
+    await mqtt_consumer.handle_recorders_message(None, _recorders_payload(103))
+
+    assert len(writes) == 2
+
+
+@pytest.mark.anyio
+async def test_calls_active_normalized_once_at_ingest(monkeypatch, traffic_state):
+    writes: list[dict] = []
+
+    async def fake_upsert_calls_active_snapshot(pool, **kwargs):
+        writes.append(kwargs)
+        return True
+
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo,
+        "upsert_calls_active_snapshot",
+        fake_upsert_calls_active_snapshot,
+    )
+
+    payload = {
+        "calls": [
+            {"id": "old", "start_time": 1771215800, "sys_name": "PRWC-J", "freq": "bad"},
+            {
+                "id": "new",
+                "start_time": 1771215827,
+                "sys_name": "PRWC-J",
+                "talkgroup": 4499,
+                "freq": 770118750,
+                "src_num": 0,
+                "rec_num": 1,
+            },
+            "not-a-call",
+        ],
+        "timestamp": 1771215831,
+        "instance_id": "trunk-recorder",
+    }
+
+    await mqtt_consumer.handle_calls_active_message(None, payload)
+
+    normalized = writes[0]["calls_normalized"]
+    assert writes[0]["active_calls_count"] == 3
+    assert [call["id"] for call in normalized] == ["new", "old"]
+    assert normalized[0]["started_at"] == "2026-02-16T04:23:47Z"
+    assert normalized[0]["freq_mhz"] == 770.11875
+    assert normalized[0]["recorder_id"] == "0_1"
+    assert normalized[1]["freq_mhz"] is None
+
+    row = traffic_state._instances["trunk-recorder"].calls_row
+    assert row["calls_normalized_json"] is normalized
+    assert "calls_json" not in row
+
+
+@pytest.mark.anyio
+async def test_calls_active_writes_only_new_or_changed_talkgroups(
+    monkeypatch, talkgroup_catalog
+):
+    writes: list[list[tuple]] = []
+    fail = False
+
+    async def fake_upsert_calls_active_snapshot(pool, **kwargs):
+        return True
+
+    async def fake_upsert_talkgroups(pool, *, instance_id, talkgroups, updated_at):
+        if fail:
+            raise RuntimeError("relation tr_talkgroups does not exist")
+        writes.append([(tg["talkgroup"], tg["alpha_tag"]) for tg in talkgroups])
+
+    monkeypatch.setattr(
+        mqtt_consumer.traffic_repo,
+        "upsert_calls_active_snapshot",
+        fake_upsert_calls_active_snapshot,
+    )
+    monkeypatch.setattr(
+        mqtt_consumer.talkgroups_repo, "upsert_talkgroups", fake_upsert_talkgroups
+    )
+
+    def payload(timestamp: int, alpha_tag: str) -> dict:
+        return {
+            "calls": [
+                {
+                    "id": "a",
+                    "sys_num": 1,
+                    "talkgroup": 4499,
+                    "talkgroup_alpha_tag": alpha_tag,
+                    "elapsed": timestamp - 100,
+                },
+                {"id": "b", "sys_num": 1, "talkgroup": 4499, "talkgroup_alpha_tag": alpha_tag},
+                {"id": "c", "sys_num": 1, "talkgroup_alpha_tag": "no talkgroup id"},
+            ],
+            "timestamp": timestamp,
+            "instance_id": "trunk-recorder",
+        }
+
+    await mqtt_consumer.handle_calls_active_message(None, payload(100, "Avondale PD A01"))
+    await mqtt_consumer.handle_calls_active_message(None, payload(103, "Avondale PD A01"))
+    fail = True
+    await mqtt_consumer.handle_calls_active_message(None, payload(106, "Avondale PD"))
+    fail = False
+    # retried with the next snapshot that gets written
+    await mqtt_consumer.handle_calls_active_message(None, payload(109, "Avondale PD"))
+
+    assert writes == [[(4499, "Avondale PD A01")], [(4499, "Avondale PD")]]
+    assert talkgroup_catalog.search("trunk-recorder", "avondale pd") == frozenset(
+        {(1, 4499)}
+    )
+
+
+@pytest.mark.anyio
+async def test_dispatch_takes_instance_from_wildcard_topic(monkeypatch):
+    seen: list[dict] = []
+
+    async def fake_handle_rates_message(pool, payload):
+        seen.append(payload)
+
+    monkeypatch.setattr(
+        mqtt_consumer,
+        "topic_routes",
+        mqtt_consumer.build_topic_routes(
+            "emberlog/trunkrecorder", {"rates": "rates"}, wildcard=True
+        ),
+    )
+    monkeypatch.setitem(
+        mqtt_consumer.MESSAGE_HANDLERS, "rates", fake_handle_rates_message
+    )
+
+    await mqtt_consumer.process_mqtt_message(
+        None, "emberlog/trunkrecorder/tr-west/rates", b'{"rates": [], "timestamp": 1}'
+    )
+    await mqtt_consumer.process_mqtt_message(
+        None, "emberlog/trunkrecorder/tr-west/unknown", b'{"timestamp": 1}'
+    )
+
+    assert seen == [{"rates": [], "timestamp": 1, "instance_id": "tr-west"}]
+
+
+@pytest.mark.anyio
+async def test_dispatch_records_ingest_metrics(monkeypatch):
+    async def fake_handle_recorders_message(pool, payload):
+        return None
+
+    monkeypatch.setitem(
+        mqtt_consumer.MESSAGE_HANDLERS, "recorders", fake_handle_recorders_message
+    )
+    topic = "emberlog/trunkrecorder/recorders"
+    messages_before = mqtt_consumer.MQTT_MESSAGES.value(kind="recorders")
+    handled_before = mqtt_consumer.MQTT_HANDLER_SECONDS.count(kind="recorders")
+    invalid_before = mqtt_consumer.MQTT_PARSE_FAILURES.value(reason="invalid_json")
+    lag_before = _lag_buckets()
+    timestamp = datetime.now(timezone.utc).timestamp() - 30
+
+    await mqtt_consumer.process_mqtt_message(
+        None,
+        topic,
+        f'{{"recorders": [], "timestamp": {timestamp}, "instance_id": "tr-lag"}}'.encode(),
+    )
+    await mqtt_consumer.process_mqtt_message(None, topic, b"{not json")
+
+    assert mqtt_consumer.MQTT_MESSAGES.value(kind="recorders") == messages_before + 1
+    assert mqtt_consumer.MQTT_HANDLER_SECONDS.count(kind="recorders") == handled_before + 1
+    assert (
+        mqtt_consumer.MQTT_PARSE_FAILURES.value(reason="invalid_json")
+        == invalid_before + 1
+    )
+    lag_after = _lag_buckets()
+    # ~30s behind: lands in the le=60 bucket, not le=10; no per-instance series
+    assert lag_after['le="60"'] == lag_before.get('le="60"', 0) + 1
+    assert lag_after['le="10"'] == lag_before.get('le="10"', 0)
+    assert all("tr-lag" not in line for line in mqtt_consumer.MQTT_INGEST_LAG_SECONDS.samples())
+    # the per-instance signal lives in its own bounded gauge
+    lag = mqtt_consumer.MQTT_INSTANCE_INGEST_LAG_SECONDS.value(instance_id="tr-lag")
+    assert 29.0 <= lag < 60.0
+
+
+def _lag_buckets() -> dict[str, int]:
+    prefix = 'emberlog_mqtt_ingest_lag_seconds_bucket{kind="recorders",'
+    buckets: dict[str, int] = {}
+    for line in mqtt_consumer.MQTT_INGEST_LAG_SECONDS.samples():
+        if line.startswith(prefix):
+            labels, value = line[len(prefix):].split("} ")
+            buckets[labels] = int(value)
+    return buckets
@@ -0,0 +1,40 @@
+from emberlog_api.app.services.mqtt_topics import build_topic_routes
+
+SUFFIXES = {"rates": "rates", "recorders": "recorders", "calls_active": "calls_active"}
+
+
+def test_exact_routes_take_instance_from_payload():
+    routes = build_topic_routes("emberlog/trunkrecorder", SUFFIXES)
+
+    assert routes.match("emberlog/trunkrecorder/rates") == ("rates", None)
+    assert routes.match("emberlog/trunkrecorder/tr-west/rates") is None
+    assert routes.match("emberlog/trunkrecorder/unknown") is None
+    assert routes.subscriptions == (
+        "emberlog/trunkrecorder/rates",
+        "emberlog/trunkrecorder/recorders",
+        "emberlog/trunkrecorder/calls_active",
+    )
+
+
+def test_wildcard_routes_take_instance_from_topic():
+    routes = build_topic_routes("emberlog/trunkrecorder", SUFFIXES, wildcard=True)
+
+    assert routes.match("emberlog/trunkrecorder/tr-west/calls_active") == (
+        "calls_active",
+        "tr-west",
+    )
+    assert routes.match("emberlog/trunkrecorder/recorders") == ("recorders", None)
+    assert routes.match("emberlog/trunkrecorder/a/b/rates") is None
+    assert routes.match("emberlog/other/tr-west/rates") is None
+    assert "emberlog/trunkrecorder/+/rates" in routes.subscriptions
+
+
+def test_shared_group_prefixes_every_subscription():
+    routes = build_topic_routes(
+        "emberlog/trunkrecorder", SUFFIXES, wildcard=True, shared_group="ingest"
+    )
+
+    assert all(topic.startswith("$share/ingest/") for topic in routes.subscriptions)
+    assert "$share/ingest/emberlog/trunkrecorder/+/rates" in routes.subscriptions
+    # brokers deliver shared messages under the original topic
+    assert routes.match("emberlog/trunkrecorder/tr-west/rates") == ("rates", "tr-west")
@@ -0,0 +1,70 @@
+import logging
+
+import httpx
+import pytest
+
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.notifier import notifier, stub
+from emberlog_api.app.notifier.drain.drain import DeliveryError
+from emberlog_api.app.notifier.notifier import NotifierClient
+
+
+@pytest.fixture(autouse=True)
+def reset_stub():
+    stub.received.clear()
+    stub.fail_incident_ids.clear()
+    yield
+    stub.received.clear()
+    stub.fail_incident_ids.clear()
+
+
+@pytest.mark.anyio
+async def test_on_new_incidents_posts_one_batch_and_maps_results():
+    stub.fail_incident_ids.add(2)
+    client = NotifierClient(transport=httpx.ASGITransport(app=stub.app))
+    try:
+        results = await client.on_new_incidents(
+            [
+                ("incident.created", {"incident_id": 1}),
+                ("incident.created", {"incident_id": 2}),
+                ("incident.created", {"incident_id": 3}),
+            ]
+        )
+    finally:
+        await client.close()
+
+    assert results[0] is None
+    assert isinstance(results[1], DeliveryError)
+    assert results[2] is None
+    assert [event["payload"]["incident_id"] for event in stub.received] == [1, 3]
+
+
+@pytest.fixture
+def client_kwargs(monkeypatch):
+    seen: dict = {}
+
+    class RecordingClient:
+        def __init__(self, **kwargs):
+            seen.update(kwargs)
+
+    monkeypatch.setattr(notifier.httpx, "AsyncClient", RecordingClient)
+    monkeypatch.setattr(settings, "notifier_http2", True)
+    return seen
+
+
+def test_client_uses_http2_when_h2_is_installed(client_kwargs, monkeypatch):
+    monkeypatch.setattr(notifier, "_http2_available", lambda: True)
+
+    NotifierClient()
+
+    assert client_kwargs["http2"] is True
+
+
+def test_client_falls_back_to_http1_without_h2(client_kwargs, monkeypatch, caplog):
+    monkeypatch.setattr(notifier, "_http2_available", lambda: False)
+
+    with caplog.at_level(logging.WARNING, logger="emberlog_api.notifier.client"):
+        NotifierClient()
+
+    assert client_kwargs["http2"] is False
+    assert "h2 is not installed" in caplog.text
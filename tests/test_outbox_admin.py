@@ -0,0 +1,159 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+
+from emberlog_api.app.api.v1.routers import outbox
+from emberlog_api.app.core.settings import settings
+from emberlog_api.app.db.pool import get_pool
+from emberlog_api.app.db.repositories import outbox as outbox_repo
+from emberlog_api.models.outbox import OutboxRowOut
+
+outbox_app = FastAPI()
+outbox_app.include_router(outbox.router, prefix="/api/v1")
+
+DEAD_ROW = OutboxRowOut(
+    id=11,
+    incident_id=4,
+    event_type="incident.created",
+    status="dead",
+    attempts=5,
+    last_error="ConnectError: notifier unreachable",
+    created_at=datetime(2026, 2, 16, 4, 0, tzinfo=timezone.utc),
+    available_at=datetime(2026, 2, 16, 4, 10, tzinfo=timezone.utc),
+)
+
+
+@pytest.fixture(autouse=True)
+def override_dependencies():
+    async def override_pool():
+        return None
+
+    outbox_app.dependency_overrides[get_pool] = override_pool
+    yield
+    outbox_app.dependency_overrides = {}
+
+
+@pytest.fixture
+def app():
+    return outbox_app
+
+
+@pytest.mark.anyio
+async def test_list_dead_outbox_passes_filters(async_client, monkeypatch):
+    seen: dict = {}
+
+    async def fake_list_dead_outbox(pool, **kwargs):
+        seen.update(kwargs)
+        return [DEAD_ROW], 1
+
+    monkeypatch.setattr(outbox_repo, "list_dead_outbox", fake_list_dead_outbox)
+
+    response = await async_client.get(
+        "/api/v1/admin/outbox/dead",
+        params={"event_type": "incident.created", "error_search": "notifier", "page": 2, "page_size": 10},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["total"] == 1
+    assert payload["items"][0]["id"] == 11
+    assert seen["event_type"] == "incident.created"
+    assert seen["error_search"] == "notifier"
+    assert seen["limit"] == 10
+    assert seen["offset"] == 10
+
+
+@pytest.mark.anyio
+async def test_requeue_caps_rate_and_limit(async_client, monkeypatch):
+    seen: dict = {}
+
+    async def fake_requeue_dead_outbox(pool, **kwargs):
+        seen.update(kwargs)
+        return [11, 12, 13]
+
+    monkeypatch.setattr(outbox_repo, "requeue_dead_outbox", fake_requeue_dead_outbox)
+    monkeypatch.setattr(settings, "outbox_replay_rate_per_s", 2.0)
+
+    response = await async_client.post(
+        "/api/v1/admin/outbox/dead/requeue",
+        json={"error_search": "notifier", "limit": 50, "rate_per_s": 100},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"requeued": 3, "ids": [11, 12, 13], "spread_s": 1.0}
+    assert seen["rate_per_s"] == 2.0
+    assert seen["limit"] == 50
+
+    response = await async_client.post(
+        "/api/v1/admin/outbox/dead/requeue",
+        json={"limit": settings.outbox_replay_max_rows + 1},
+    )
+    assert response.status_code == 422
+
+
+class RecordingCursor:
+    def __init__(self, executed: list, returned: list):
+        self.executed = executed
+        self.returned = returned
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+    async def execute(self, query: str, params=None):
+        self.executed.append((" ".join(query.split()), params))
+
+    async def fetchall(self):
+        return [(oid,) for oid in self.returned.pop(0)]
+
+
+class RecordingPool:
+    def __init__(self, returned: list):
+        self.executed: list = []
+        self.returned = returned
+
+    def connection(self):
+        pool = self
+
+        class _Conn:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, exc_type, exc, tb):
+                return None
+
+            def cursor(self, **_kwargs):
+                return RecordingCursor(pool.executed, pool.returned)
+
+        return _Conn()
+
+
+@pytest.mark.anyio
+async def test_back_to_back_requeues_stagger_after_pending_replays():
+    pool = RecordingPool(returned=[[11, 12], [13]])
+    filters = {
+        "ids": None,
+        "event_type": None,
+        "error_search": None,
+        "from_created_at": None,
+        "to_created_at": None,
+        "limit": 10,
+        "rate_per_s": 2.0,
+    }
+
+    first = await outbox_repo.requeue_dead_outbox(pool, **filters)
+    second = await outbox_repo.requeue_dead_outbox(pool, **filters)
+
+    assert (first, second) == ([11, 12], [13])
+    assert len(pool.executed) == 2
+    for sql, params in pool.executed:
+        # each call starts one step after the last replayed row still waiting,
+        # not at now(), so the second batch does not land on top of the first
+        assert (
+            "GREATEST( now(), max(available_at) + make_interval(secs => 1 / %(rate_per_s)s"
+            in sql
+        )
+        assert "status = 'pending' AND attempts = 0 AND last_error IS NOT NULL" in sql
+        assert "available_at = queue_end.start_at + make_interval" in sql
+        assert params["rate_per_s"] == 2.0
@@ -0,0 +1,252 @@
+import asyncio
+
+import pytest
+
+from emberlog_api.app.notifier.drain.drain import (
+    DeliveryError,
+    OutboxDrain,
+    OutboxDrainConfig,
+    RouteDeferred,
+    RoutePolicy,
+    Router,
+)
+
+
+class FakeCursor:
+    def __init__(self, executed: list):
+        self.executed = executed
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+    async def execute(self, query: str, params=None):
+        self.executed.append((" ".join(query.split()), params))
+
+
+class FakeConnection:
+    def __init__(self, executed: list):
+        self.executed = executed
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+    def cursor(self, **_kwargs) -> FakeCursor:
+        return FakeCursor(self.executed)
+
+
+class FakePool:
+    def __init__(self):
+        self.executed: list = []
+
+    def connection(self) -> FakeConnection:
+        return FakeConnection(self.executed)
+
+
+@pytest.mark.anyio
+async def test_router_defers_when_route_concurrency_is_saturated():
+    release = asyncio.Event()
+
+    async def slow_handler(event_type, payload):
+        await release.wait()
+
+    router = Router(
+        {"sms.send": slow_handler},
+        policies={"sms.send": RoutePolicy(max_concurrency=1)},
+    )
+
+    first = asyncio.create_task(router.deliver("sms.send", {}))
+    await asyncio.sleep(0)
+    assert router.unavailable_event_types() == ["sms.send"]
+
+    with pytest.raises(RouteDeferred) as exc_info:
+        await router.deliver("sms.send", {})
+    assert exc_info.value.reason == "concurrency"
+
+    release.set()
+    await first
+    assert router.unavailable_event_types() == []
+
+
+@pytest.mark.anyio
+async def test_router_rate_limit_defers_with_retry_after():
+    delivered: list[str] = []
+
+    async def handler(event_type, payload):
+        delivered.append(event_type)
+
+    router = Router(
+        {"sms.send": handler},
+        policies={"sms.send": RoutePolicy(rate_per_s=0.5, burst=1)},
+    )
+
+    await router.deliver("sms.send", {})
+    with pytest.raises(RouteDeferred) as exc_info:
+        await router.deliver("sms.send", {})
+
+    assert delivered == ["sms.send"]
+    assert exc_info.value.reason == "rate"
+    assert 0.0 < exc_info.value.retry_after_s <= 2.0
+
+
+@pytest.mark.anyio
+async def test_deferred_row_keeps_its_attempts():
+    async def handler(event_type, payload):
+        raise RouteDeferred(event_type, "concurrency")
+
+    pool = FakePool()
+    drain = OutboxDrain(
+        cfg=OutboxDrainConfig(pool=pool, defer_s=0.25),
+        router=Router({"incident.created": handler}),
+    )
+
+    await drain._process_row(
+        {"id": 7, "event_type": "incident.created", "payload": {}, "attempts": 2}
+    )
+
+    assert len(pool.executed) == 1
+    sql, params = pool.executed[0]
+    assert "attempts" not in sql
+    assert "status='pending'" in sql
+    assert params == (0.25, [7])
+
+
+@pytest.mark.anyio
+async def test_circuit_breaker_opens_and_probes_with_single_request():
+    calls: list[int] = []
+    healthy = False
+    release = asyncio.Event()
+
+    async def handler(event_type, payload):
+        calls.append(payload["n"])
+        if not healthy:
+            raise ConnectionError("notifier down")
+        await release.wait()
+
+    router = Router(
+        {"incident.created": handler},
+        policies={
+            "incident.created": RoutePolicy(failure_threshold=2, reset_timeout_s=0.05)
+        },
+    )
+
+    with pytest.raises(ConnectionError):
+        await router.deliver("incident.created", {"n": 1})
+    # the failure that trips the breaker is deferred, not counted as a retry
+    with pytest.raises(RouteDeferred):
+        await router.deliver("incident.created", {"n": 2})
+    with pytest.raises(RouteDeferred) as exc_info:
+        await router.deliver("incident.created", {"n": 3})
+    assert exc_info.value.reason == "circuit_open"
+    assert calls == [1, 2]
+    assert router.unavailable_event_types() == ["incident.created"]
+
+    await asyncio.sleep(0.06)
+    healthy = True
+    probe = asyncio.create_task(router.deliver("incident.created", {"n": 4}))
+    await asyncio.sleep(0)
+    with pytest.raises(RouteDeferred):
+        await router.deliver("incident.created", {"n": 5})
+
+    release.set()
+    await probe
+    await router.deliver("incident.created", {"n": 6})
+    assert calls == [1, 2, 4, 6]
+    assert router.unavailable_event_types() == []
+
+
+@pytest.mark.anyio
+async def test_batch_results_map_back_to_rows():
+    async def batch_handler(items):
+        return [None, DeliveryError("bad payload"), None]
+
+    async def single_handler(event_type, payload):
+        raise AssertionError("batch route should not use the single handler")
+
+    pool = FakePool()
+    drain = OutboxDrain(
+        cfg=OutboxDrainConfig(pool=pool, jitter_s=0.0),
+        router=Router(
+            {"incident.created": single_handler},
+            batch_routes={"incident.created": batch_handler},
+        ),
+    )
+    rows = [
+        {"id": oid, "event_type": "incident.created", "payload": {}, "attempts": 0}
+        for oid in (1, 2, 3)
+    ]
+
+    await drain._process_batch("incident.created", rows)
+
+    assert len(pool.executed) == 2
+    delete_sql, delete_params = pool.executed[0]
+    assert delete_sql.startswith("DELETE FROM incident_outbox")
+    assert delete_params == ([1, 3],)
+    retry_sql, retry_params = pool.executed[1]
+    assert "attempts = attempts + 1" in retry_sql
+    assert retry_params[1:] == ("bad payload", 2)
+
+
+@pytest.mark.anyio
+async def test_batch_takes_one_rate_token_per_row():
+    delivered: list[int] = []
+
+    async def batch_handler(items):
+        delivered.extend(payload["n"] for _, payload in items)
+        return [None] * len(items)
+
+    router = Router(
+        {},
+        policies={"sms.send": RoutePolicy(rate_per_s=0.5, burst=3)},
+        batch_routes={"sms.send": batch_handler},
+    )
+
+    await router.deliver_batch("sms.send", [{"n": 1}, {"n": 2}])
+    # one token left: a two-row batch has to wait for the second
+    with pytest.raises(RouteDeferred) as exc_info:
+        await router.deliver_batch("sms.send", [{"n": 3}, {"n": 4}])
+
+    assert delivered == [1, 2]
+    assert exc_info.value.reason == "rate"
+    assert 0.0 < exc_info.value.retry_after_s <= 2.0
+
+
+@pytest.mark.anyio
+async def test_cancelled_probe_lets_the_next_request_probe():
+    calls: list[int] = []
+    healthy = False
+
+    async def handler(event_type, payload):
+        calls.append(payload["n"])
+        if not healthy:
+            raise ConnectionError("notifier down")
+        if payload["n"] == 2:
+            await asyncio.Event().wait()
+
+    router = Router(
+        {"incident.created": handler},
+        policies={
+            "incident.created": RoutePolicy(failure_threshold=1, reset_timeout_s=0.05)
+        },
+    )
+
+    with pytest.raises(RouteDeferred):
+        await router.deliver("incident.created", {"n": 1})
+    await asyncio.sleep(0.06)
+    healthy = True
+    probe = asyncio.create_task(router.deliver("incident.created", {"n": 2}))
+    await asyncio.sleep(0)
+    assert router.unavailable_event_types() == ["incident.created"]
+
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert router.unavailable_event_types() == []
+    await router.deliver("incident.created", {"n": 3})
+    assert calls == [1, 2, 3]
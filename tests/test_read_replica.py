@@ -0,0 +1,207 @@
+import time
+
+import pytest
+from fastapi import FastAPI, Response
+from starlette.requests import Request
+
+from emberlog_api.app.api.v1.routers import incidents
+from emberlog_api.app.db import replica
+from emberlog_api.app.db.pool import get_pool
+from emberlog_api.app.db.repositories import incidents as incidents_repo
+from emberlog_api.app.db.replica import PRIMARY_STICKY_COOKIE, ReadRouter
+
+PRIMARY = object()
+
+replica_app = FastAPI()
+replica_app.include_router(incidents.router, prefix="/api/v1")
+
+
+class FakeLagPool:
+    """Answers the replica status query for a streaming replica ``lag`` seconds
+    behind (an exception is raised); ``status`` overrides the whole row."""
+
+    def __init__(self, lag):
+        self.lag = lag
+        self.status = None
+        self.checks = 0
+
+    def connection(self, timeout=None):
+        pool = self
+
+        class _Conn:
+            async def __aenter__(self):
+                pool.checks += 1
+                if isinstance(pool.lag, Exception):
+                    raise pool.lag
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def cursor(self):
+                return _Cursor()
+
+        class _Cursor:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, query, params=None):
+                return None
+
+            async def fetchone(self):
+                if pool.status is not None:
+                    return pool.status
+                return (True, True, False, pool.lag)
+
+        return _Conn()
+
+
+@pytest.fixture
+def app():
+    return replica_app
+
+
+@pytest.fixture
+def replica_pool():
+    pool = FakeLagPool(0.2)
+    replica_app.state.read_router = ReadRouter(
+        pool, max_lag_s=5.0, check_interval_s=60.0
+    )
+
+    async def override_pool():
+        return PRIMARY
+
+    replica_app.dependency_overrides[get_pool] = override_pool
+    yield pool
+    replica_app.dependency_overrides = {}
+    replica_app.state.read_router = None
+
+
+@pytest.fixture
+def list_targets(monkeypatch):
+    targets: list[str] = []
+
+    async def fake_list_incidents(pool, **kwargs):
+        targets.append("primary" if pool is PRIMARY else "replica")
+        return [], 0
+
+    monkeypatch.setattr(incidents_repo, "list_incidents", fake_list_incidents)
+    return targets
+
+
+@pytest.mark.anyio
+async def test_lag_is_checked_once_per_interval():
+    pool = FakeLagPool(1.5)
+    router = ReadRouter(pool, max_lag_s=5.0, check_interval_s=60.0)
+
+    assert await router.replica_lag() == 1.5
+    pool.lag = 9.0
+    assert await router.replica_lag() == 1.5
+    assert pool.checks == 1
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("lag", [0.2, 30.0, None, RuntimeError("connection refused")])
+async def test_list_incidents_uses_replica_only_when_fresh(
+    async_client, replica_pool, list_targets, lag
+):
+    replica_pool.lag = lag
+
+    response = await async_client.get("/api/v1/incidents")
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+    assert list_targets == ["replica" if lag == 0.2 else "primary"]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "status",
+    [
+        # WAL receiver gone: receive LSN frozen, replay caught up to it, an hour stale
+        (True, False, True, 3600.0),
+        # promoted / not a standby
+        (False, False, None, None),
+    ],
+)
+async def test_disconnected_or_promoted_replica_is_not_read(
+    async_client, replica_pool, list_targets, status
+):
+    replica_pool.status = status
+
+    await async_client.get("/api/v1/incidents")
+
+    assert list_targets == ["primary"]
+
+
+def test_caught_up_streaming_replica_has_no_lag_when_primary_idle():
+    assert replica.replica_lag_from_status(True, True, True, 3600.0) == 0.0
+    assert replica.replica_lag_from_status(True, True, False, 2.5) == 2.5
+
+
+@pytest.mark.anyio
+async def test_recent_writer_reads_from_primary(async_client, replica_pool, list_targets):
+    async_client.cookies.set(PRIMARY_STICKY_COOKIE, f"{time.time() + 5:.3f}")
+    await async_client.get("/api/v1/incidents")
+
+    async_client.cookies.set(PRIMARY_STICKY_COOKIE, f"{time.time() - 1:.3f}")
+    await async_client.get("/api/v1/incidents")
+
+    assert list_targets == ["primary", "replica"]
+
+
+def test_write_sets_sticky_cookie(monkeypatch):
+    request = Request({"type": "http", "app": replica_app, "headers": []})
+    response = Response()
+    monkeypatch.setattr(replica.settings, "read_your_writes_s", 3.0)
+
+    replica_app.state.read_router = None
+    replica.remember_write(request, response)
+    assert "set-cookie" not in response.headers
+
+    replica_app.state.read_router = ReadRouter(
+        FakeLagPool(0.0), max_lag_s=5.0, check_interval_s=60.0
+    )
+    try:
+        replica.remember_write(request, response)
+    finally:
+        replica_app.state.read_router = None
+    assert response.headers["set-cookie"].startswith(f"{PRIMARY_STICKY_COOKIE}=")
+    assert "Max-Age=3" in response.headers["set-cookie"]
+
+
+@pytest.mark.anyio
+async def test_get_incident_falls_back_to_primary_when_not_replicated(
+    async_client, replica_pool, monkeypatch
+):
+    seen: list[str] = []
+
+    async def fake_select_incident(pool, incident_id):
+        seen.append("primary" if pool is PRIMARY else "replica")
+        if pool is not PRIMARY:
+            raise ValueError(f"Incident {incident_id} not found")
+        return {
+            "id": incident_id,
+            "dispatched_at": "2024-05-01T12:00:00Z",
+            "special_call": False,
+            "units": [],
+            "channel": None,
+            "incident_type": None,
+            "address": None,
+            "source_audio": "audio",
+            "original_text": None,
+            "transcript": None,
+            "parsed": None,
+            "created_at": "2024-05-01T12:00:00Z",
+        }
+
+    monkeypatch.setattr(incidents_repo, "select_incident", fake_select_incident)
+
+    response = await async_client.get("/api/v1/incidents/7")
+
+    assert response.status_code == 200
+    assert response.json()["id"] == 7
+    assert seen == ["replica", "primary"]
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from emberlog_api.app.core.http_cache import snapshot_validator
+from emberlog_api.app.core.response_cache import CachedResponse, ResponseCache
+
+
+def _cached(body: bytes) -> CachedResponse:
+    return CachedResponse(snapshot_validator(("test",), []), lambda: body)
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_share_one_build():
+    cache = ResponseCache(max_entries=4)
+    builds = 0
+    release = asyncio.Event()
+
+    async def build() -> CachedResponse:
+        nonlocal builds
+        builds += 1
+        await release.wait()
+        return _cached(b"{}")
+
+    waiters = [
+        asyncio.create_task(cache.get_or_build(("summary", "tr"), 1, build))
+        for _ in range(50)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert builds == 1
+    assert all(result is results[0] for result in results)
+    # kept until the version moves on
+    assert await cache.get_or_build(("summary", "tr"), 1, build) is results[0]
+    await cache.get_or_build(("summary", "tr"), 2, build)
+    assert builds == 2
+
+
+@pytest.mark.anyio
+async def test_failed_build_reaches_waiters_and_is_not_cached():
+    cache = ResponseCache(max_entries=4)
+    release = asyncio.Event()
+    attempts = 0
+
+    async def build() -> CachedResponse:
+        nonlocal attempts
+        attempts += 1
+        await release.wait()
+        raise RuntimeError("db down")
+
+    waiters = [
+        asyncio.create_task(cache.get_or_build(("summary", "tr"), 1, build))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert attempts == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError):
+        await cache.get_or_build(("summary", "tr"), 1, build)
+    assert attempts == 2
+
+
+@pytest.mark.anyio
+async def test_unversioned_builds_are_not_kept_and_lru_is_bounded():
+    cache = ResponseCache(max_entries=2)
+
+    async def build() -> CachedResponse:
+        return _cached(b"{}")
+
+    first = await cache.get_or_build(("live-calls", "a"), None, build)
+    assert await cache.get_or_build(("live-calls", "a"), None, build) is not first
+
+    for instance in ("a", "b", "c"):
+        await cache.get_or_build(("live-calls", instance), 1, build)
+    assert [key[1] for key in cache._entries] == ["b", "c"]
+
+
+@pytest.mark.anyio
+async def test_cancelling_the_first_request_does_not_cancel_the_build():
+    cache = ResponseCache(max_entries=4)
+    builds = 0
+    release = asyncio.Event()
+
+    async def build() -> CachedResponse:
+        nonlocal builds
+        builds += 1
+        await release.wait()
+        return _cached(b"{}")
+
+    first = asyncio.create_task(cache.get_or_build(("summary", "tr"), 1, build))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(cache.get_or_build(("summary", "tr"), 1, build))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    release.set()
+    result = await second
+    assert builds == 1
+    assert await cache.get_or_build(("summary", "tr"), 1, build) is result
@@ -4,19 +4,30 @@ import pytest
 from fastapi import FastAPI
 
 from emberlog_api.app.api.v1.routers import traffic
+from emberlog_api.app.core.response_cache import ResponseCache
+from emberlog_api.app.core.settings import settings
 from emberlog_api.app.db.pool import get_pool
+from emberlog_api.app.db.repositories import talkgroups as talkgroups_repo
 from emberlog_api.app.db.repositories import traffic as traffic_repo
+from emberlog_api.app.services.live_calls import normalize_live_calls
+from emberlog_api.app.services.talkgroup_catalog import TalkgroupCatalog, talkgroup_from_call
+from emberlog_api.app.services.traffic_state import TrafficStateStore
 
 traffic_app = FastAPI()
 traffic_app.include_router(traffic.router, prefix="/api/v1")
 
 
 @pytest.fixture(autouse=True)
-def override_dependencies():
+def override_dependencies(monkeypatch):
     async def override_pool():
         return None
 
     traffic_app.dependency_overrides[get_pool] = override_pool
+    # read straight from the (patched) repository unless a test opts into the store
+    monkeypatch.setattr(settings, "traffic_state_enabled", False)
+    monkeypatch.setattr(traffic, "response_cache", ResponseCache(max_entries=16))
+    monkeypatch.setattr(settings, "talkgroup_catalog_enabled", False)
+    monkeypatch.setattr(traffic, "talkgroup_catalog", TalkgroupCatalog(max_age_s=60.0))
     yield
     traffic_app.dependency_overrides = {}
 
@@ -60,30 +71,14 @@ async def test_traffic_summary_flattens_and_computes_last_seen(async_client, mon
         "updated_at": datetime(2026, 2, 16, 4, 23, 51, tzinfo=UTC),
     }
 
-    async def fake_list_decode_rate_latest(pool, *, instance_id):
+    async def fake_select_traffic_summary_latest(pool, *, instance_id):
         assert instance_id == "trunk-recorder"
-        return decode_rows
+        return decode_rows, recorders_row, calls_row
 
-    async def fake_select_recorders_snapshot_latest(pool, *, instance_id):
-        assert instance_id == "trunk-recorder"
-        return recorders_row
-
-    async def fake_select_calls_active_snapshot_latest(pool, *, instance_id):
-        assert instance_id == "trunk-recorder"
-        return calls_row
-
-    monkeypatch.setattr(
-        traffic_repo, "list_decode_rate_latest", fake_list_decode_rate_latest
-    )
-    monkeypatch.setattr(
-        traffic_repo,
-        "select_recorders_snapshot_latest",
-        fake_select_recorders_snapshot_latest,
-    )
     monkeypatch.setattr(
         traffic_repo,
-        "select_calls_active_snapshot_latest",
-        fake_select_calls_active_snapshot_latest,
+        "select_traffic_summary_latest",
+        fake_select_traffic_summary_latest,
     )
 
     response = await async_client.get("/api/v1/traffic/summary")
@@ -199,3 +194,480 @@ async def test_traffic_live_calls_normalization_and_filters(async_client, monkey
     assert call["started_at"] == "2026-02-16T04:23:47Z"
     assert call["recorder_id"] == "0_0"
     assert call["encrypted"] is False
+
+
+@pytest.mark.anyio
+async def test_traffic_summary_served_from_state_store(async_client, monkeypatch):
+    store = TrafficStateStore(max_age_s=60.0)
+    monkeypatch.setattr(traffic, "traffic_state", store)
+    monkeypatch.setattr(settings, "traffic_state_enabled", True)
+    loads = 0
+
+    async def fake_select_traffic_latest(pool, **kwargs):
+        nonlocal loads
+        loads += 1
+        return (
+            [],
+            [
+                {
+                    "instance_id": "trunk-recorder",
+                    "total_count": 30,
+                    "recording_count": 2,
+                    "idle_count": 1,
+                    "available_count": 27,
+                    "updated_at": datetime(2026, 2, 16, 4, 23, 46, tzinfo=UTC),
+                }
+            ],
+            [
+                {
+                    "instance_id": "trunk-recorder",
+                    "calls_json": {"calls": []},
+                    "active_calls_count": 0,
+                    "updated_at": datetime(2026, 2, 16, 4, 23, 40, tzinfo=UTC),
+                }
+            ],
+        )
+
+    monkeypatch.setattr(
+        traffic_repo, "select_traffic_latest", fake_select_traffic_latest
+    )
+
+    # the consumer got here before the warm start: its newer row must survive
+    store.apply_calls_active(
+        "trunk-recorder",
+        {
+            "calls_json": {"calls": [{}, {}]},
+            "active_calls_count": 2,
+            "updated_at": datetime(2026, 2, 16, 4, 23, 51, tzinfo=UTC),
+        },
+    )
+    store.apply_decode_rates(
+        "trunk-recorder",
+        [{"sys_num": 1, "sys_name": "PRWC-J", "decoderate_pct": 97.5}],
+        datetime(2026, 2, 16, 4, 23, 41, tzinfo=UTC),
+    )
+
+    for _ in range(3):
+        response = await async_client.get("/api/v1/traffic/summary")
+        assert response.status_code == 200
+    payload = response.json()
+
+    assert loads == 1
+    assert payload["active_calls_count"] == 2
+    assert payload["last_seen_at"] == "2026-02-16T04:23:51Z"
+    assert payload["recorders_total"] == 30
+    assert [site["sys_name"] for site in payload["decode_sites"]] == ["PRWC-J"]
+
+
+@pytest.mark.anyio
+async def test_decode_history_week_reads_hourly_rollup(async_client, monkeypatch):
+    requested: dict = {}
+
+    async def fake_list_decode_rollup(pool, **kwargs):
+        requested.update(kwargs)
+        return [
+            {
+                "sys_num": 1,
+                "sys_name": "PRWC-J",
+                "bucket_start": datetime(2026, 2, 16, 3, 0, tzinfo=UTC),
+                "min_pct": 40.0,
+                "avg_pct": 82.5,
+                "max_pct": 100.0,
+                "sample_count": 1200,
+            },
+            {
+                "sys_num": 1,
+                "sys_name": "PRWC-J",
+                "bucket_start": datetime(2026, 2, 16, 4, 0, tzinfo=UTC),
+                "min_pct": 95.0,
+                "avg_pct": 97.0,
+                "max_pct": 100.0,
+                "sample_count": 1200,
+            },
+        ]
+
+    monkeypatch.setattr(
+        traffic.history_repo, "list_decode_rollup", fake_list_decode_rollup
+    )
+
+    response = await async_client.get(
+        "/api/v1/traffic/decode-history",
+        params={
+            "from_recorded_at": "2026-02-09T05:00:00Z",
+            "to_recorded_at": "2026-02-16T05:00:00Z",
+            "sys_name": "PRWC-J",
+        },
+    )
+    assert response.status_code == 200
+    payload = response.json()
+
+    assert requested["resolution"] == "1h"
+    assert requested["sys_names"] == ["PRWC-J"]
+    assert payload["resolution"] == "1h"
+    assert len(payload["series"]) == 1
+    series = payload["series"][0]
+    assert series["group"] == "PRWC"
+    assert [p["bucket_start"] for p in series["points"]] == [
+        "2026-02-16T03:00:00Z",
+        "2026-02-16T04:00:00Z",
+    ]
+    assert series["points"][0]["min_pct"] == 40.0
+
+
+@pytest.mark.anyio
+async def test_decode_history_rejects_too_many_raw_points(async_client):
+    response = await async_client.get(
+        "/api/v1/traffic/decode-history",
+        params={
+            "from_recorded_at": "2026-02-09T05:00:00Z",
+            "to_recorded_at": "2026-02-16T05:00:00Z",
+            "resolution": "1m",
+        },
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_decode_history_auto_rejects_range_too_long_for_hourly(async_client):
+    # ~2 years of hourly buckets is still over the cap
+    response = await async_client.get(
+        "/api/v1/traffic/decode-history",
+        params={
+            "from_recorded_at": "2024-02-16T05:00:00Z",
+            "to_recorded_at": "2026-02-16T05:00:00Z",
+        },
+    )
+    assert response.status_code == 422
+    assert "resolution 1h" in response.json()["detail"]
+
+
+@pytest.mark.anyio
+async def test_traffic_summary_for_several_instances_in_one_fetch(
+    async_client, monkeypatch
+):
+    fetches: list[dict] = []
+
+    async def fake_select_traffic_latest(pool, **kwargs):
+        fetches.append(kwargs)
+        return (
+            [
+                {
+                    "instance_id": "tr-west",
+                    "sys_num": 1,
+                    "sys_name": "PRWC-J",
+                    "decoderate_pct": 97.5,
+                    "decoderate_interval_s": 3.0,
+                    "control_channel_hz": 769118750,
+                    "updated_at": datetime(2026, 2, 16, 4, 23, 41, tzinfo=UTC),
+                }
+            ],
+            [],
+            [
+                {
+                    "instance_id": "tr-east",
+                    "active_calls_count": 4,
+                    "updated_at": datetime(2026, 2, 16, 4, 23, 51, tzinfo=UTC),
+                }
+            ],
+        )
+
+    monkeypatch.setattr(
+        traffic_repo, "select_traffic_latest", fake_select_traffic_latest
+    )
+
+    response = await async_client.get(
+        "/api/v1/traffic/summary",
+        params={"instance_id": "tr-west,tr-east,tr-north"},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+
+    assert fetches == [
+        {"instance_ids": ["tr-west", "tr-east", "tr-north"], "include_calls": False}
+    ]
+    assert [item["instance_id"] for item in payload["instances"]] == [
+        "tr-west",
+        "tr-east",
+        "tr-north",
+    ]
+    west, east, north = payload["instances"]
+    assert west["decode_sites"][0]["sys_name"] == "PRWC-J"
+    assert east["active_calls_count"] == 4
+    assert north["last_seen_at"] is None
+
+
+@pytest.mark.anyio
+async def test_live_calls_conditional_get_returns_304(async_client, monkeypatch):
+    snapshot_row = {
+        "updated_at": datetime(2026, 2, 16, 4, 23, 51, 250000, tzinfo=UTC),
+        "calls_normalized_json": [],
+    }
+
+    async def fake_select_calls_active_snapshot_latest(pool, *, instance_id):
+        return snapshot_row
+
+    monkeypatch.setattr(
+        traffic_repo,
+        "select_calls_active_snapshot_latest",
+        fake_select_calls_active_snapshot_latest,
+    )
+
+    first = await async_client.get("/api/v1/traffic/live-calls")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"] == "Mon, 16 Feb 2026 04:23:51 GMT"
+    assert first.headers["cache-control"] == f"max-age={settings.traffic_cache_max_age_s}"
+
+    cached = await async_client.get(
+        "/api/v1/traffic/live-calls", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    since = await async_client.get(
+        "/api/v1/traffic/live-calls",
+        headers={"If-Modified-Since": first.headers["last-modified"]},
+    )
+    assert since.status_code == 304
+
+    # other filters are another representation
+    filtered = await async_client.get(
+        "/api/v1/traffic/live-calls",
+        params={"hide_encrypted": "true"},
+        headers={"If-None-Match": etag},
+    )
+    assert filtered.status_code == 200
+    assert filtered.headers["etag"] != etag
+
+    snapshot_row["updated_at"] = datetime(2026, 2, 16, 4, 23, 54, tzinfo=UTC)
+    changed = await async_client.get(
+        "/api/v1/traffic/live-calls", headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("flag", ["traffic_response_cache_enabled", "traffic_state_enabled"])
+async def test_matching_etag_skips_building_without_a_cache_entry(
+    async_client, monkeypatch, flag
+):
+    updated_at = datetime(2026, 2, 16, 4, 23, 51, tzinfo=UTC)
+    monkeypatch.setattr(settings, "traffic_response_cache_enabled", True)
+    monkeypatch.setattr(settings, flag, False)
+    if flag == "traffic_response_cache_enabled":
+        store = TrafficStateStore(max_age_s=60.0)
+        monkeypatch.setattr(traffic, "traffic_state", store)
+        monkeypatch.setattr(settings, "traffic_state_enabled", True)
+        store.apply_calls_active(
+            "trunk-recorder",
+            {"updated_at": updated_at, "active_calls_count": 0, "calls_normalized_json": []},
+        )
+
+        async def fake_select_traffic_latest(pool, **kwargs):
+            return [], [], []
+
+        monkeypatch.setattr(traffic_repo, "select_traffic_latest", fake_select_traffic_latest)
+    else:
+        async def fake_select_traffic_summary_latest(pool, *, instance_id):
+            return [], None, {"updated_at": updated_at, "active_calls_count": 0}
+
+        async def fake_select_calls_active_snapshot_latest(pool, *, instance_id):
+            return {"updated_at": updated_at, "calls_normalized_json": []}
+
+        monkeypatch.setattr(
+            traffic_repo, "select_traffic_summary_latest", fake_select_traffic_summary_latest
+        )
+        monkeypatch.setattr(
+            traffic_repo,
+            "select_calls_active_snapshot_latest",
+            fake_select_calls_active_snapshot_latest,
+        )
+
+    built: list[str] = []
+    build_summary = traffic._build_summary
+    build_live_calls = traffic._build_live_calls
+
+    def counting_build_summary(*args, **kwargs):
+        built.append("summary")
+        return build_summary(*args, **kwargs)
+
+    def counting_build_live_calls(*args, **kwargs):
+        built.append("live-calls")
+        return build_live_calls(*args, **kwargs)
+
+    monkeypatch.setattr(traffic, "_build_summary", counting_build_summary)
+    monkeypatch.setattr(traffic, "_build_live_calls", counting_build_live_calls)
+
+    for path in ("/api/v1/traffic/summary", "/api/v1/traffic/live-calls"):
+        first = await async_client.get(path)
+        assert first.status_code == 200
+        built.clear()
+
+        again = await async_client.get(path, headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
+        assert built == []
+
+
+@pytest.mark.anyio
+async def test_live_calls_sort_limit_offset_and_emergency_only(async_client, monkeypatch):
+    calls = [
+        {"id": "c1", "start_time": 1771215830, "sys_name": "PRWC-J", "elapsed": 1,
+         "talkgroup": 1, "talkgroup_alpha_tag": "Fire Dispatch", "emergency": True},
+        {"id": "c2", "start_time": 1771215820, "sys_name": "MCSO-WT", "elapsed": 11,
+         "talkgroup": 2, "talkgroup_alpha_tag": "alpha Ops"},
+        {"id": "c3", "start_time": 1771215810, "sys_name": "TOPAZ", "elapsed": 21,
+         "talkgroup": 3, "talkgroup_alpha_tag": "Zulu", "emergency": True},
+        {"id": "c4", "start_time": 1771215800, "sys_name": "AZDPS", "elapsed": 31,
+         "talkgroup": 4, "talkgroup_alpha_tag": "Bravo"},
+    ]
+
+    async def fake_select_calls_active_snapshot_latest(pool, *, instance_id):
+        return {
+            "updated_at": datetime(2026, 2, 16, 4, 23, 51, tzinfo=UTC),
+            "calls_normalized_json": normalize_live_calls(calls),
+        }
+
+    monkeypatch.setattr(
+        traffic_repo,
+        "select_calls_active_snapshot_latest",
+        fake_select_calls_active_snapshot_latest,
+    )
+
+    async def ids(**params):
+        response = await async_client.get("/api/v1/traffic/live-calls", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        return body["total_count"], [call["id"] for call in body["calls"]]
+
+    assert await ids() == (4, ["c1", "c2", "c3", "c4"])
+    assert await ids(limit=2, offset=1) == (4, ["c2", "c3"])
+    assert await ids(sort="elapsed", limit=2) == (4, ["c4", "c3"])
+    assert await ids(sort="started_at", order="asc", limit=1) == (4, ["c4"])
+    assert await ids(sort="sys_name") == (4, ["c4", "c2", "c1", "c3"])
+    assert await ids(sort="talkgroup", limit=3, offset=1) == (4, ["c4", "c1", "c3"])
+    assert await ids(emergency_only="true", sort="elapsed", order="asc") == (2, ["c1", "c3"])
+
+    bad = await async_client.get("/api/v1/traffic/live-calls", params={"limit": 0})
+    assert bad.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_summary_built_once_per_snapshot_version(async_client, monkeypatch):
+    store = TrafficStateStore(max_age_s=60.0)
+    monkeypatch.setattr(traffic, "traffic_state", store)
+    monkeypatch.setattr(settings, "traffic_state_enabled", True)
+    builds = 0
+    build_summary = traffic._build_summary
+
+    async def fake_select_traffic_latest(pool, **kwargs):
+        return [], [], []
+
+    def counting_build_summary(*args):
+        nonlocal builds
+        builds += 1
+        return build_summary(*args)
+
+    monkeypatch.setattr(traffic_repo, "select_traffic_latest", fake_select_traffic_latest)
+    monkeypatch.setattr(traffic, "_build_summary", counting_build_summary)
+    store.apply_decode_rates(
+        "trunk-recorder",
+        [{"sys_num": 1, "sys_name": "PRWC-J", "decoderate_pct": 97.5}],
+        datetime(2026, 2, 16, 4, 23, 41, tzinfo=UTC),
+    )
+
+    bodies = [
+        (await async_client.get("/api/v1/traffic/summary")).content for _ in range(3)
+    ]
+    assert builds == 1
+    assert bodies[0] == bodies[1] == bodies[2]
+
+    store.apply_decode_rates(
+        "trunk-recorder",
+        [{"sys_num": 1, "sys_name": "PRWC-J", "decoderate_pct": 12.0}],
+        datetime(2026, 2, 16, 4, 23, 44, tzinfo=UTC),
+    )
+    response = await async_client.get("/api/v1/traffic/summary")
+    assert builds == 2
+    assert response.json()["decode_sites"][0]["decode_rate_pct"] == 12.0
+
+    # another instance changing does not invalidate this one
+    store.apply_decode_rates(
+        "other-recorder",
+        [{"sys_num": 2, "sys_name": "MCSO-WT", "decoderate_pct": 50.0}],
+        datetime(2026, 2, 16, 4, 23, 45, tzinfo=UTC),
+    )
+    await async_client.get("/api/v1/traffic/summary")
+    assert builds == 2
+
+
+@pytest.mark.anyio
+async def test_reloading_unchanged_rows_keeps_versions(monkeypatch):
+    store = TrafficStateStore(max_age_s=60.0)
+    recorders_row = {
+        "instance_id": "trunk-recorder",
+        "total_count": 30,
+        "recording_count": 2,
+        "idle_count": 1,
+        "available_count": 27,
+        "updated_at": datetime(2026, 2, 16, 4, 23, 46, tzinfo=UTC),
+    }
+
+    async def fake_select_traffic_latest(pool, **kwargs):
+        return [], [dict(recorders_row)], []
+
+    monkeypatch.setattr(traffic_repo, "select_traffic_latest", fake_select_traffic_latest)
+
+    await store.load(None)
+    versions = (store.version, store.version_for(["trunk-recorder"]))
+    await store.load(None)
+    assert (store.version, store.version_for(["trunk-recorder"])) == versions
+
+    recorders_row["updated_at"] = datetime(2026, 2, 16, 4, 23, 49, tzinfo=UTC)
+    await store.load(None)
+    assert store.version_for(["trunk-recorder"]) != versions[1]
+
+
+@pytest.mark.anyio
+async def test_live_calls_q_resolved_against_talkgroup_catalog(async_client, monkeypatch):
+    monkeypatch.setattr(settings, "talkgroup_catalog_enabled", True)
+    calls = normalize_live_calls(
+        [
+            {"id": "known", "sys_num": 1, "sys_name": "PRWC-J", "talkgroup": 4499,
+             "talkgroup_alpha_tag": "Avondale PD A01", "talkgroup_description": "A01 Dispatch"},
+            {"id": "other", "sys_num": 1, "sys_name": "PRWC-J", "talkgroup": 4500,
+             "talkgroup_alpha_tag": "Goodyear FD", "talkgroup_description": "Fire Ops"},
+            {"id": "new", "sys_num": 1, "sys_name": "PRWC-J", "talkgroup": 4501,
+             "talkgroup_alpha_tag": "Tolleson PD", "talkgroup_description": "dispatch"},
+        ]
+    )
+    catalog = traffic.talkgroup_catalog
+    # "new" arrived after the catalog was loaded: matched by scanning instead
+    catalog.apply("trunk-recorder", [talkgroup_from_call(call) for call in calls[:2]])
+    loads = 0
+
+    async def fake_select_talkgroups(pool):
+        nonlocal loads
+        loads += 1
+        return []
+
+    async def fake_select_calls_active_snapshot_latest(pool, *, instance_id):
+        return {
+            "updated_at": datetime(2026, 2, 16, 4, 23, 51, tzinfo=UTC),
+            "calls_normalized_json": calls,
+        }
+
+    monkeypatch.setattr(talkgroups_repo, "select_talkgroups", fake_select_talkgroups)
+    monkeypatch.setattr(
+        traffic_repo,
+        "select_calls_active_snapshot_latest",
+        fake_select_calls_active_snapshot_latest,
+    )
+
+    response = await async_client.get(
+        "/api/v1/traffic/live-calls", params={"q": "DISPATCH"}
+    )
+
+    assert [call["id"] for call in response.json()["calls"]] == ["known", "new"]
+    assert catalog.search("trunk-recorder", "dispatch") == frozenset({(1, 4499)})
+    assert loads == 1
@@ -0,0 +1,27 @@
+import pytest
+
+from emberlog_api.app.core.leader import advisory_lock_key
+from emberlog_api.app.worker import worker_app
+
+
+@pytest.fixture
+def app():
+    return worker_app
+
+
+def test_advisory_lock_key_is_stable_signed_bigint():
+    key = advisory_lock_key("mqtt_consumer")
+    assert key == advisory_lock_key("mqtt_consumer")
+    assert key != advisory_lock_key("outbox_drain")
+    assert -(2**63) <= key < 2**63
+
+
+@pytest.mark.anyio
+async def test_worker_health_and_metrics(async_client):
+    response = await async_client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert "emberlog_outbox_rows" in response.text
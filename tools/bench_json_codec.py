@@ -0,0 +1,90 @@
+"""
+Micro-benchmark of the JSON codecs on a realistic 200-call calls_active payload.
+
+    PYTHONPATH=. python tools/bench_json_codec.py [--calls 200] [--number 2000]
+
+Times decode (MQTT payload / JSONB column) and encode (JSONB parameter / API
+response) for every installed codec.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+
+from emberlog_api.utils.jsoncodec import available_codecs
+
+
+def calls_active_payload(calls: int, seed: int = 7) -> dict:
+    rnd = random.Random(seed)
+    systems = [(1, "PRWC-J"), (2, "MCSO-WT"), (3, "TOPAZ"), (4, "RWC-PHX")]
+    now = 1771215831
+    return {
+        "type": "calls_active",
+        "calls": [
+            {
+                "id": f"{sys_num}_{tg}_{now - i}",
+                "call_num": i,
+                "freq": 769_000_000 + rnd.randrange(0, 2_000_000, 6_250),
+                "sys_num": sys_num,
+                "sys_name": sys_name,
+                "talkgroup": tg,
+                "talkgroup_alpha_tag": f"TG {tg} Dispatch",
+                "talkgroup_description": f"Talkgroup {tg} A{i % 9:02d} Dispatch",
+                "talkgroup_group": "Phoenix Police",
+                "talkgroup_tag": "Law Dispatch",
+                "unit": rnd.randrange(1_000_000, 9_999_999),
+                "unit_alpha_tag": "",
+                "elapsed": rnd.randrange(0, 120),
+                "length": round(rnd.random() * 30, 2),
+                "call_state": 1,
+                "call_state_type": "RECORDING",
+                "mon_state": 0,
+                "mon_state_type": "UNSPECIFIED",
+                "rec_num": rnd.randrange(0, 20),
+                "src_num": rnd.randrange(0, 4),
+                "rec_state": 1,
+                "rec_state_type": "RECORDING",
+                "phase2_tdma": bool(i % 2),
+                "tdma_slot": i % 2,
+                "analog": False,
+                "conventional": False,
+                "encrypted": i % 11 == 0,
+                "emergency": i % 47 == 0,
+                "start_time": now - rnd.randrange(0, 120),
+                "stop_time": 0,
+            }
+            for i in range(calls)
+            for sys_num, sys_name in [systems[i % len(systems)]]
+            for tg in [rnd.randrange(1000, 60000)]
+        ],
+        "timestamp": now,
+        "instance_id": "trunk-recorder",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    payload = calls_active_payload(args.calls)
+    codecs = available_codecs()
+    raw = codecs[-1].dumps(payload)
+    print(f"payload: {args.calls} calls, {len(raw)} bytes, {args.number} iterations")
+    print(f"{'codec':<10}{'decode us':>12}{'encode us':>12}")
+
+    for codec in codecs:
+        decode_s = timeit.timeit(lambda: codec.loads(raw), number=args.number)
+        encode_s = timeit.timeit(lambda: codec.dumps(payload), number=args.number)
+        print(
+            f"{codec.name:<10}"
+            f"{decode_s / args.number * 1e6:>12.1f}"
+            f"{encode_s / args.number * 1e6:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
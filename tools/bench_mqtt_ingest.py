@@ -0,0 +1,178 @@
+"""
+Replay recorded or synthetic MQTT messages through the ingest path and report throughput.
+
+    PYTHONPATH=. python tools/bench_mqtt_ingest.py recording.jsonl [--rate 0] [--loops 1]
+    PYTHONPATH=. python tools/bench_mqtt_ingest.py --synthetic 3000 [--db-latency-ms 0.5]
+    PYTHONPATH=. python tools/bench_mqtt_ingest.py recording.jsonl --dsn postgresql://...
+
+Messages go through process_mqtt_message (parse, dispatch, handlers, change
+detection, traffic state). Statements and round trips (a pipeline is one round
+trip) are counted either way: without --dsn the database is an in-memory fake
+that can add a fixed delay per round trip; with --dsn the real pool is wrapped,
+and the COMMIT it sends when a checkout ends inside a transaction counts as one
+more round trip. Recordings come from tools/mqtt_record.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Any
+
+from fakedb import CountingPool, FakePool
+
+
+def load_recording(path: str) -> list[tuple[str, bytes]]:
+    with open(path, encoding="utf-8") as f:
+        return [
+            (row["topic"], row["payload"].encode("utf-8"))
+            for row in (json.loads(line) for line in f if line.strip())
+        ]
+
+
+def synthetic_messages(count: int, prefix: str, instances: int = 3) -> list[tuple[str, bytes]]:
+    from bench_json_codec import calls_active_payload
+
+    rnd = random.Random(11)
+    states = ["RECORDING", "IDLE", "AVAILABLE"]
+    messages: list[tuple[str, bytes]] = []
+    now = int(time.time())
+    for i in range(count):
+        instance_id = f"tr-{i % instances}"
+        timestamp = now + i // instances
+        kind = ("rates", "recorders", "calls_active")[(i // instances) % 3]
+        if kind == "rates":
+            payload = {
+                "rates": [
+                    {
+                        "sys_num": n,
+                        "sys_name": name,
+                        "decoderate": round(rnd.uniform(30.0, 40.0), 2),
+                        "decoderate_interval": 3.0,
+                        "control_channel": 769_118_750 + n * 12_500,
+                    }
+                    for n, name in enumerate(["PRWC-J", "MCSO-WT", "TOPAZ", "RWC-PHX"])
+                ]
+            }
+        elif kind == "recorders":
+            payload = {
+                "recorders": [
+                    {"id": f"0_{r}", "rec_state_type": rnd.choice(states)} for r in range(30)
+                ]
+            }
+        else:
+            payload = calls_active_payload(rnd.randrange(20, 200), seed=i)
+        payload.update(type=kind, timestamp=timestamp, instance_id=instance_id)
+        messages.append((f"{prefix}/{kind}", json.dumps(payload).encode("utf-8")))
+    return messages
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+async def replay(
+    messages: list[tuple[str, bytes]], pool: Any, rate: float, loops: int
+) -> tuple[int, float, dict[str, list[float]]]:
+    from emberlog_api.app.services import mqtt_consumer
+
+    durations: dict[str, list[float]] = defaultdict(list)
+
+    def timed(kind: str, handler):
+        async def wrapper(pool, payload):
+            started = time.perf_counter()
+            try:
+                await handler(pool, payload)
+            finally:
+                durations[kind].append(time.perf_counter() - started)
+
+        return wrapper
+
+    for kind, handler in list(mqtt_consumer.MESSAGE_HANDLERS.items()):
+        mqtt_consumer.MESSAGE_HANDLERS[kind] = timed(kind, handler)
+
+    interval = 1.0 / rate if rate > 0 else 0.0
+    sent = 0
+    started = time.perf_counter()
+    for _ in range(loops):
+        for topic, payload in messages:
+            if interval:
+                delay = started + sent * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await mqtt_consumer.process_mqtt_message(pool, topic, payload)
+            sent += 1
+    return sent, time.perf_counter() - started, durations
+
+
+async def run(args: argparse.Namespace) -> None:
+    from emberlog_api.app.core.settings import settings
+
+    if args.synthetic:
+        messages = synthetic_messages(args.synthetic, settings.mqtt_topic_prefix)
+    else:
+        messages = load_recording(args.recording)
+
+    pool: Any
+    if args.dsn:
+        from emberlog_api.app.db.pool import build_pool
+        from emberlog_api.utils.jsoncodec import install_json_codec
+
+        install_json_codec(settings.json_codec)
+        pool = CountingPool(build_pool())
+        await pool.open(wait=True)
+    else:
+        pool = FakePool(latency_s=args.db_latency_ms / 1000.0)
+
+    try:
+        sent, elapsed, durations = await replay(messages, pool, args.rate, args.loops)
+    finally:
+        if args.dsn:
+            await pool.close()
+
+    print(f"messages: {sent} in {elapsed:.2f}s -> {sent / elapsed:,.0f} msg/s")
+    print(f"{'handler':<14}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for kind, values in sorted(durations.items()):
+        print(
+            f"{kind:<14}{len(values):>8}"
+            f"{percentile(values, 50) * 1000:>10.3f}"
+            f"{percentile(values, 95) * 1000:>10.3f}"
+            f"{percentile(values, 99) * 1000:>10.3f}"
+        )
+    stats = pool.stats
+    print(
+        f"statements/msg: {stats.statements / sent:.2f}  "
+        f"round trips/msg: {stats.round_trips / sent:.2f}  "
+        f"checkouts/msg: {stats.checkouts / sent:.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("recording", nargs="?", help="JSON-lines file from mqtt_record.py")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate N messages instead")
+    parser.add_argument("--rate", type=float, default=0.0, help="messages/s; 0 = as fast as possible")
+    parser.add_argument("--loops", type=int, default=1, help="replay the messages N times")
+    parser.add_argument("--dsn", help="replay against this Postgres instead of the fake pool")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="fake pool delay per round trip")
+    args = parser.parse_args()
+    if not args.recording and not args.synthetic:
+        parser.error("give a recording file or --synthetic N")
+
+    # settings are read at import time
+    os.environ["DATABASE_URL"] = args.dsn or os.environ.get(
+        "DATABASE_URL", "postgresql://bench/unused"
+    )
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
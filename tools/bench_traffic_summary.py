@@ -0,0 +1,128 @@
+"""
+Latency of the /traffic/summary data fetch under pool contention: three sequential
+repository calls (three checkouts) vs select_traffic_summary_latest (one round trip).
+
+    PYTHONPATH=. python tools/bench_traffic_summary.py [--clients 50] [--requests 2000]
+        [--pool-size 5] [--db-latency-ms 1.0] [--busy 2]
+    PYTHONPATH=. python tools/bench_traffic_summary.py --dsn postgresql://... --instance-id trunk-recorder
+
+Without --dsn a fake pool with --pool-size connections and a fixed delay per
+round trip is used. --busy adds tasks that keep connections checked out, like an
+MQTT burst or drain backlog sharing the pool.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable
+
+from fakedb import FakePool
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+async def fetch_sequential(pool: Any, instance_id: str) -> None:
+    from emberlog_api.app.db.repositories import traffic as traffic_repo
+
+    await traffic_repo.list_decode_rate_latest(pool=pool, instance_id=instance_id)
+    await traffic_repo.select_recorders_snapshot_latest(pool=pool, instance_id=instance_id)
+    await traffic_repo.select_calls_active_snapshot_latest(pool=pool, instance_id=instance_id)
+
+
+async def fetch_single(pool: Any, instance_id: str) -> None:
+    from emberlog_api.app.db.repositories import traffic as traffic_repo
+
+    await traffic_repo.select_traffic_summary_latest(pool=pool, instance_id=instance_id)
+
+
+async def keep_busy(pool: Any, hold_s: float) -> None:
+    while True:
+        async with pool.connection():
+            await asyncio.sleep(hold_s)
+
+
+async def measure(
+    fetch: Callable[[Any, str], Awaitable[None]],
+    pool: Any,
+    instance_id: str,
+    clients: int,
+    requests: int,
+) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    remaining = requests
+
+    async def client() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await fetch(pool, instance_id)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace) -> None:
+    pool: Any
+    if args.dsn:
+        from emberlog_api.app.core.settings import settings as app_settings
+        from emberlog_api.app.db.pool import build_pool
+        from emberlog_api.utils.jsoncodec import install_json_codec
+
+        install_json_codec(app_settings.json_codec)
+        pool = build_pool()
+        await pool.open(wait=True)
+        hold_s = 0.005
+    else:
+        pool = FakePool(latency_s=args.db_latency_ms / 1000.0, max_size=args.pool_size)
+        hold_s = args.db_latency_ms * 5 / 1000.0
+
+    busy = [asyncio.create_task(keep_busy(pool, hold_s)) for _ in range(args.busy)]
+    try:
+        print(f"{'mode':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, fetch in (("sequential", fetch_sequential), ("single", fetch_single)):
+            latencies, elapsed = await measure(
+                fetch, pool, args.instance_id, args.clients, args.requests
+            )
+            print(
+                f"{name:<12}{len(latencies) / elapsed:>10,.0f}"
+                f"{percentile(latencies, 50) * 1000:>10.2f}"
+                f"{percentile(latencies, 95) * 1000:>10.2f}"
+                f"{percentile(latencies, 99) * 1000:>10.2f}"
+            )
+    finally:
+        for task in busy:
+            task.cancel()
+        await asyncio.gather(*busy, return_exceptions=True)
+        if args.dsn:
+            await pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=5, help="fake pool connections")
+    parser.add_argument("--db-latency-ms", type=float, default=1.0, help="fake pool delay per round trip")
+    parser.add_argument("--busy", type=int, default=2, help="tasks holding connections meanwhile")
+    parser.add_argument("--instance-id", default="trunk-recorder")
+    parser.add_argument("--dsn", help="measure against this Postgres instead of the fake pool")
+    args = parser.parse_args()
+
+    # settings are read at import time
+    os.environ["DATABASE_URL"] = args.dsn or os.environ.get(
+        "DATABASE_URL", "postgresql://bench/unused"
+    )
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+#!/usr/bin/env bash
+cd /srv/emberlog/emberlog-api
+poetry run uvicorn emberlog_api.app.notifier.stub:app --host 0.0.0.0 --port 8090 --reload
@@ -0,0 +1,3 @@
+#!/usr/bin/env bash
+cd /srv/emberlog/emberlog-api
+doppler run --project emberlog-api --config dev -- poetry run python -m emberlog_api.app.worker
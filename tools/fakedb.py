@@ -0,0 +1,165 @@
+"""
+In-memory stand-in for a psycopg AsyncConnectionPool, used by the tools/ benchmarks.
+
+Counts statements, round trips (a pipeline is one) and checkouts, and can add a
+fixed delay per round trip and cap concurrent checkouts like a real pool.
+Queries return no rows.
+
+CountingPool keeps the same counters around a real pool, for runs against Postgres.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any
+
+
+class FakeStats:
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.statements = 0
+        self.round_trips = 0
+        self.checkouts = 0
+
+    async def round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+
+
+class FakeCursor:
+    rowcount = 1  # every write "applies"
+
+    def __init__(self, conn: "FakeConnection"):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+    async def execute(self, query: Any, params: Any = None) -> "FakeCursor":
+        self.conn.stats.statements += 1
+        if not self.conn.in_pipeline:
+            await self.conn.stats.round_trip()
+        return self
+
+    async def fetchall(self) -> list:
+        return []
+
+    async def fetchone(self) -> None:
+        return None
+
+
+class FakeConnection:
+    def __init__(self, stats: FakeStats):
+        self.stats = stats
+        self.in_pipeline = False
+
+    def cursor(self, **_kwargs) -> FakeCursor:
+        return FakeCursor(self)
+
+    async def execute(self, query: Any, params: Any = None) -> FakeCursor:
+        return await FakeCursor(self).execute(query, params)
+
+    @asynccontextmanager
+    async def pipeline(self):
+        self.in_pipeline = True
+        try:
+            yield
+        finally:
+            self.in_pipeline = False
+            await self.stats.round_trip()
+
+
+class CountingCursor:
+    def __init__(self, cursor: Any, conn: "CountingConnection"):
+        self._cursor = cursor
+        self._conn = conn
+
+    async def __aenter__(self):
+        await self._cursor.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._cursor.__aexit__(exc_type, exc, tb)
+
+    async def execute(self, query: Any, params: Any = None, **kwargs: Any) -> "CountingCursor":
+        await self._cursor.execute(query, params, **kwargs)
+        await self._conn.counted()
+        return self
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+class CountingConnection:
+    def __init__(self, conn: Any, stats: FakeStats):
+        self._conn = conn
+        self.stats = stats
+        self.in_pipeline = False
+
+    async def counted(self) -> None:
+        self.stats.statements += 1
+        if not self.in_pipeline:
+            await self.stats.round_trip()
+
+    def cursor(self, **kwargs) -> CountingCursor:
+        return CountingCursor(self._conn.cursor(**kwargs), self)
+
+    async def execute(self, query: Any, params: Any = None, **kwargs: Any) -> Any:
+        cursor = await self._conn.execute(query, params, **kwargs)
+        await self.counted()
+        return cursor
+
+    @asynccontextmanager
+    async def pipeline(self):
+        self.in_pipeline = True
+        try:
+            async with self._conn.pipeline() as pipeline:
+                yield pipeline
+        finally:
+            self.in_pipeline = False
+            await self.stats.round_trip()  # the sync
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+
+class CountingPool:
+    """A real AsyncConnectionPool with the FakePool counters (``stats``)."""
+
+    def __init__(self, pool: Any):
+        self.pool = pool
+        self.stats = FakeStats(0.0)
+
+    @asynccontextmanager
+    async def connection(self, **kwargs: Any):
+        from psycopg.pq import TransactionStatus
+
+        self.stats.checkouts += 1
+        async with self.pool.connection(**kwargs) as conn:
+            yield CountingConnection(conn, self.stats)
+            if conn.info.transaction_status == TransactionStatus.INTRANS:
+                await self.stats.round_trip()  # the COMMIT the pool sends on return
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool, name)
+
+
+class FakePool:
+    def __init__(self, latency_s: float = 0.0, max_size: int | None = None):
+        self.stats = FakeStats(latency_s)
+        self._slots = asyncio.Semaphore(max_size) if max_size else None
+
+    @asynccontextmanager
+    async def connection(self):
+        self.stats.checkouts += 1
+        if self._slots is None:
+            yield FakeConnection(self.stats)
+            return
+        # like AsyncConnectionPool: wait for a free connection when all are busy
+        async with self._slots:
+            yield FakeConnection(self.stats)
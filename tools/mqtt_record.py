@@ -0,0 +1,75 @@
+"""
+Record Traffic Monitor MQTT messages to a JSON-lines file for replay.
+
+    PYTHONPATH=. python tools/mqtt_record.py out.jsonl [--seconds 300] [--max-messages 0]
+
+Subscribes to the consumer's topics (MQTT_* settings / .env) and writes one
+line per message: {"t": seconds since start, "topic": ..., "payload": ...}.
+Replay with tools/bench_mqtt_ingest.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+# settings require a DSN at import; recording never touches the database
+os.environ.setdefault("DATABASE_URL", "postgresql://record/unused")
+
+from emberlog_api.app.core.settings import settings  # noqa: E402
+from emberlog_api.app.services.mqtt_consumer import topic_routes  # noqa: E402
+
+
+async def record(path: str, seconds: float, max_messages: int) -> int:
+    from aiomqtt import Client
+
+    count = 0
+    started = time.monotonic()
+    async with Client(
+        hostname=settings.mqtt_host,
+        port=settings.mqtt_port,
+        username=settings.mqtt_username,
+        password=settings.mqtt_password,
+    ) as client:
+        # plain subscriptions: a recorder must not take messages from a shared group
+        for topic in topic_routes.subscriptions:
+            await client.subscribe(topic.split("/", 2)[2] if topic.startswith("$share/") else topic)
+
+        with open(path, "w", encoding="utf-8") as out:
+            try:
+                async with asyncio.timeout(seconds):
+                    async for message in client.messages:
+                        out.write(
+                            json.dumps(
+                                {
+                                    "t": round(time.monotonic() - started, 6),
+                                    "topic": str(message.topic),
+                                    "payload": bytes(message.payload).decode("utf-8"),
+                                }
+                            )
+                            + "\n"
+                        )
+                        count += 1
+                        if max_messages and count >= max_messages:
+                            break
+            except TimeoutError:
+                pass
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path")
+    parser.add_argument("--seconds", type=float, default=300.0)
+    parser.add_argument("--max-messages", type=int, default=0)
+    args = parser.parse_args()
+
+    count = asyncio.run(record(args.path, args.seconds, args.max_messages))
+    print(f"recorded {count} messages to {args.path}")
+
+
+if __name__ == "__main__":
+    main()